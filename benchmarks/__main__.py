@@ -0,0 +1,128 @@
+'''
+Runs every benchmark offline and optionally writes the results as JSON, so runs
+from different versions can be compared:
+
+    python -m benchmarks --output before.json
+    python -m benchmarks --output after.json --compare before.json
+
+Times are seconds per call, memory is bytes and throughput is blocks per second.
+--quick runs fewer iterations and leaves out the 1000 transaction cases, to check
+the suite still works.
+'''
+import argparse
+import datetime
+import json
+import platform
+
+import pkg_resources
+
+from benchmarks import (
+    block_signing,
+    formatting,
+    import_time,
+    node_throughput,
+    nonce_allocation,
+    replay,
+    request_overhead,
+    result_memory,
+    trie_root,
+)
+
+SUITES = (
+    ('block_signing', block_signing.run),
+    ('prepare_and_sign_block', block_signing.run_prepare_and_sign_block),
+    ('trie_root', trie_root.run),
+    ('block_formatting', formatting.run),
+    ('receipt_formatting', formatting.run_receipts),
+    ('request_overhead', request_overhead.run),
+    ('result_memory', result_memory.run),
+    ('node_throughput', node_throughput.run),
+    ('nonce_allocation', nonce_allocation.run),
+    ('replay', replay.run),
+    ('import_time', import_time.run),
+)
+
+QUICK_OPTIONS = {
+    'block_signing': {'num_transactions': (0, 10, 100), 'iterations': 20},
+    'prepare_and_sign_block': {'num_transactions': (0, 10, 100), 'iterations': 20},
+    'trie_root': {'num_transactions': (10, 100), 'iterations': 10},
+    'block_formatting': {'num_transactions': (0, 10, 100), 'iterations': 10},
+    'receipt_formatting': {'num_logs': (0, 10, 100), 'iterations': 10},
+    'request_overhead': {'iterations': 200},
+    'result_memory': {'count': 1000},
+    'node_throughput': {'num_blocks': 100},
+    'nonce_allocation': {'iterations': 1000},
+    'replay': {'iterations': 1},
+    'import_time': {'iterations': 3},
+}
+
+
+def helios_web3_version():
+    try:
+        return pkg_resources.get_distribution('helios-web3').version
+    except pkg_resources.DistributionNotFound:
+        return None
+
+
+def run_suites(names=None, quick=False):
+    results = {}
+    for name, run in SUITES:
+        if names and name not in names:
+            continue
+        print("== {0}".format(name))
+        options = QUICK_OPTIONS[name] if quick else {}
+        results[name] = run(**options)
+        print()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'helios_web3': helios_web3_version(),
+            'timestamp': datetime.datetime.utcnow().isoformat(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new):
+    '''
+    Prints the ratio of each result to the one from an earlier run. Above 1 is
+    slower, or more memory, except for throughput where it is faster.
+    '''
+    print("== compared with helios_web3 {0} ({1})".format(
+        old['meta'].get('helios_web3'),
+        old['meta'].get('timestamp'),
+    ))
+    for suite, suite_results in new['results'].items():
+        old_results = old['results'].get(suite, {})
+        for name, value in suite_results.items():
+            old_value = old_results.get(name)
+            if not old_value:
+                continue
+            print("{0:<50} {1:>8.2f}x".format(name, value / old_value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('suites', nargs='*', help="suites to run, all of them by default")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="compare with the results in this JSON file")
+    parser.add_argument('--quick', action='store_true', help="fewer and smaller cases")
+    args = parser.parse_args(argv)
+    unknown_suites = set(args.suites) - {name for name, _ in SUITES}
+    if unknown_suites:
+        parser.error("unknown suites: {0}".format(', '.join(sorted(unknown_suites))))
+
+    report = run_suites(args.suites, args.quick)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as compare_file:
+            compare(json.load(compare_file), report)
+    return report
+
+
+if __name__ == '__main__':
+    main()
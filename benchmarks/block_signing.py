@@ -0,0 +1,104 @@
+'''
+Compares Account.signBlock with a reusable BlockSigner, and times
+prepare_and_sign_block end to end against a canned provider.
+
+    python -m benchmarks.block_signing
+'''
+from eth_keys import (
+    keys,
+)
+from eth_utils import (
+    decode_hex,
+)
+
+from helios_web3 import (
+    HeliosWeb3,
+)
+from helios_web3.account import (
+    Account,
+    BlockSigner,
+)
+from helios_web3.utils.block_creation import (
+    prepare_and_sign_block,
+)
+
+from benchmarks.utils import (
+    TEST_CHAIN_ADDRESS,
+    TEST_PRIVATE_KEY,
+    CannedProvider,
+    print_result,
+    scaled_iterations,
+    time_per_call,
+)
+
+
+def make_header_dict():
+    return {
+        'parentHash': '0x' + '11' * 32,
+        'blockNumber': 1,
+        'chainId': 1,
+    }
+
+
+def make_send_transaction_dicts(count):
+    return [
+        {
+            'to': TEST_CHAIN_ADDRESS,
+            'value': 1000,
+            'gas': 21000,
+            'gasPrice': 10 ** 9,
+            'nonce': nonce,
+            'chainId': 1,
+        }
+        for nonce in range(count)
+    ]
+
+
+def make_transactions(count):
+    return [
+        {'to': TEST_CHAIN_ADDRESS, 'value': 1000, 'chainId': 1}
+        for _ in range(count)
+    ]
+
+
+def run(num_transactions=(0, 10, 100, 1000), iterations=200):
+    signer = BlockSigner(TEST_PRIVATE_KEY, chain_id=1)
+    results = {}
+    for count in num_transactions:
+        send_transaction_dicts = make_send_transaction_dicts(count)
+        count_iterations = scaled_iterations(iterations, count)
+
+        account_time = time_per_call(
+            lambda: Account.signBlock(make_header_dict(), TEST_PRIVATE_KEY, send_transaction_dicts),
+            count_iterations,
+        )
+        signer_time = time_per_call(
+            lambda: signer.signBlock(make_header_dict(), send_transaction_dicts),
+            count_iterations,
+        )
+
+        print_result("Account.signBlock, {0} transactions".format(count), account_time, results)
+        print_result("BlockSigner.signBlock, {0} transactions".format(count), signer_time, results)
+    return results
+
+
+def run_prepare_and_sign_block(num_transactions=(0, 10, 100, 1000), iterations=200):
+    '''
+    prepare_and_sign_block against a canned provider, so this is the signing plus the
+    block creation parameter and gas price requests.
+    '''
+    w3 = HeliosWeb3(CannedProvider())
+    private_key = keys.PrivateKey(decode_hex(TEST_PRIVATE_KEY))
+    results = {}
+    for count in num_transactions:
+        seconds = time_per_call(
+            lambda: prepare_and_sign_block(w3, private_key, make_transactions(count)),
+            scaled_iterations(iterations, count),
+        )
+        print_result("prepare_and_sign_block, {0} transactions".format(count), seconds, results)
+    return results
+
+
+if __name__ == '__main__':
+    run()
+    run_prepare_and_sign_block()
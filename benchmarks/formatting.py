@@ -0,0 +1,141 @@
+'''
+Compares the pythonic block formatter with its compiled equivalent, with raw
+byte addresses, and with lazy formatting on a hls_getBlockByHash response with
+full transactions. The lazy row reads the block hash and number and the hash of
+each transaction. Also times the hls_getTransactionReceipt formatter on receipts
+with many logs.
+
+    python -m benchmarks.formatting
+'''
+from helios_web3.pythonic_middleware import (
+    PYTHONIC_RESULT_FORMATTERS,
+    cached_to_checksum_address,
+    to_address_bytes,
+)
+from helios_web3.utils.formatters import (
+    compile_formatter,
+)
+
+from benchmarks.utils import (
+    TEST_CHAIN_ADDRESS,
+    print_result,
+    scaled_iterations,
+    time_per_call,
+)
+
+
+def make_transaction(index):
+    return {
+        'blockHash': '0x' + '22' * 32,
+        'blockNumber': '0x10',
+        'transactionIndex': hex(index),
+        'nonce': hex(index),
+        'gas': '0x5208',
+        'gasPrice': '0x3b9aca00',
+        'value': '0xde0b6b3a7640000',
+        'from': TEST_CHAIN_ADDRESS.lower(),
+        'to': TEST_CHAIN_ADDRESS.lower(),
+        'hash': '0x' + '{0:064x}'.format(index),
+        'r': '0x' + '33' * 32,
+        's': '0x' + '44' * 32,
+        'v': '0x25',
+    }
+
+
+def make_block(num_transactions):
+    return {
+        'hash': '0x' + '11' * 32,
+        'parentHash': '0x' + '55' * 32,
+        'number': '0x10',
+        'timestamp': '0x5c8a6f2e',
+        'gasLimit': '0x2faf080',
+        'gasUsed': '0x5208',
+        'extraData': '0x',
+        'logsBloom': '0x' + '00' * 256,
+        'receiptsRoot': '0x' + '66' * 32,
+        'transactionsRoot': '0x' + '77' * 32,
+        'stateRoot': '0x' + '88' * 32,
+        'transactions': [make_transaction(index) for index in range(num_transactions)],
+        'receiveTransactions': [],
+    }
+
+
+def make_log_entry(index, log_index):
+    return {
+        'blockHash': '0x' + '22' * 32,
+        'blockNumber': '0x10',
+        'transactionIndex': hex(index),
+        'transactionHash': '0x' + '{0:064x}'.format(index),
+        'logIndex': hex(log_index),
+        'address': TEST_CHAIN_ADDRESS.lower(),
+        'topics': ['0x' + '33' * 32],
+        'data': '0x',
+    }
+
+
+def make_receipt(index, num_logs=1):
+    return {
+        'blockHash': '0x' + '22' * 32,
+        'blockNumber': '0x10',
+        'transactionIndex': hex(index),
+        'transactionHash': '0x' + '{0:064x}'.format(index),
+        'cumulativeGasUsed': '0x5208',
+        'status': '0x1',
+        'gasUsed': '0x5208',
+        'contractAddress': None,
+        'logs': [make_log_entry(index, log_index) for log_index in range(num_logs)],
+        'logsBloom': '0x' + '00' * 256,
+    }
+
+
+def read_lazy_block(block):
+    return block.hash, block.number, [transaction.hash for transaction in block.transactions]
+
+
+def run(num_transactions=(0, 10, 100, 1000), iterations=50):
+    formatter = PYTHONIC_RESULT_FORMATTERS['hls_getBlockByHash']
+    compiled_formatter = compile_formatter(formatter)
+    raw_address_formatter = compile_formatter(formatter, [(cached_to_checksum_address, to_address_bytes)])
+    lazy_formatter = compile_formatter(formatter, lazy=True)
+    results = {}
+    for count in num_transactions:
+        block = make_block(count)
+        assert formatter(block) == compiled_formatter(block)
+        count_iterations = scaled_iterations(iterations, count)
+
+        print_result("block_formatter, {0} transactions".format(count),
+                     time_per_call(lambda: formatter(block), count_iterations),
+                     results)
+        print_result("compiled block_formatter, {0} transactions".format(count),
+                     time_per_call(lambda: compiled_formatter(block), count_iterations),
+                     results)
+        print_result("raw address block_formatter, {0} transactions".format(count),
+                     time_per_call(lambda: raw_address_formatter(block), count_iterations),
+                     results)
+        print_result("lazy block_formatter, {0} transactions".format(count),
+                     time_per_call(lambda: read_lazy_block(lazy_formatter(block)), count_iterations),
+                     results)
+    return results
+
+
+def run_receipts(num_logs=(0, 10, 100, 1000), iterations=50):
+    formatter = PYTHONIC_RESULT_FORMATTERS['hls_getTransactionReceipt']
+    compiled_formatter = compile_formatter(formatter)
+    results = {}
+    for count in num_logs:
+        receipt = make_receipt(0, count)
+        assert formatter(receipt) == compiled_formatter(receipt)
+        count_iterations = scaled_iterations(iterations, count)
+
+        print_result("receipt_formatter, {0} logs".format(count),
+                     time_per_call(lambda: formatter(receipt), count_iterations),
+                     results)
+        print_result("compiled receipt_formatter, {0} logs".format(count),
+                     time_per_call(lambda: compiled_formatter(receipt), count_iterations),
+                     results)
+    return results
+
+
+if __name__ == '__main__':
+    run()
+    run_receipts()
@@ -0,0 +1,46 @@
+'''
+Times ``import helios_web3`` in a fresh interpreter, and checks the VM and signing
+dependencies are still only imported when the first block is signed.
+
+    python -m benchmarks.import_time
+'''
+import statistics
+import subprocess
+import sys
+
+# modules that import helios_web3 shouldn't load
+DEFERRED_MODULES = ('hvm', 'rlp_cython', 'trie')
+
+IMPORT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import helios_web3
+print(time.perf_counter() - start)
+print(','.join(sorted({name.split('.')[0] for name in sys.modules} & set(sys.argv[1:]))))
+'''
+
+
+def time_import():
+    output = subprocess.check_output(
+        [sys.executable, '-c', IMPORT_SCRIPT] + list(DEFERRED_MODULES),
+        universal_newlines=True,
+    )
+    seconds, loaded = output.splitlines()[-2:]
+    return float(seconds), [name for name in loaded.split(',') if name]
+
+
+def run(iterations=10):
+    times = []
+    for _ in range(iterations):
+        seconds, loaded = time_import()
+        if loaded:
+            raise AssertionError("import helios_web3 imported {0}".format(', '.join(loaded)))
+        times.append(seconds)
+
+    seconds = statistics.median(times)
+    print("{0:<50} {1:>12.1f} ms".format("import helios_web3", seconds * 1e3))
+    return {"import helios_web3": seconds}
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,92 @@
+'''
+Blocks per second an InProcessNodeProvider imports through HeliosWeb3, for blocks
+signed in advance and for blocks signed with prepare_and_sign_block as they are
+sent.
+
+    python -m benchmarks.node_throughput
+'''
+import time
+
+from eth_keys import (
+    keys,
+)
+from eth_utils import (
+    decode_hex,
+    to_wei,
+)
+
+from helios_web3 import (
+    HeliosWeb3,
+    InProcessNodeProvider,
+)
+from helios_web3.account import (
+    BlockSigner,
+)
+from helios_web3.utils.block_creation import (
+    ChainHeadTracker,
+    prepare_and_sign_block,
+)
+
+from benchmarks.block_signing import (
+    make_send_transaction_dicts,
+)
+from benchmarks.utils import (
+    TEST_CHAIN_ADDRESS,
+    TEST_PRIVATE_KEY,
+)
+
+
+def make_provider():
+    return InProcessNodeProvider(balances={TEST_CHAIN_ADDRESS: to_wei(10 ** 9, 'ether')})
+
+
+def sign_blocks(num_blocks, transactions_per_block):
+    signer = BlockSigner(TEST_PRIVATE_KEY, chain_id=1)
+    raw_blocks = []
+    parent_hash = b'\x00' * 32
+    for block_number in range(num_blocks):
+        send_transaction_dicts = make_send_transaction_dicts(transactions_per_block)
+        for offset, transaction in enumerate(send_transaction_dicts):
+            transaction['nonce'] = block_number * transactions_per_block + offset
+        signed_block = signer.signBlock({'blockNumber': block_number, 'parentHash': parent_hash},
+                                        send_transaction_dicts)
+        raw_blocks.append(signed_block['rawBlock'])
+        parent_hash = signed_block['hash']
+    return raw_blocks
+
+
+def blocks_per_second(send_block, num_blocks):
+    start = time.perf_counter()
+    for block_number in range(num_blocks):
+        send_block(block_number)
+    return num_blocks / (time.perf_counter() - start)
+
+
+def run(num_blocks=1000, transactions_per_block=(0, 1, 10)):
+    results = {}
+    for count in transactions_per_block:
+        raw_blocks = sign_blocks(num_blocks, count)
+        w3 = HeliosWeb3(make_provider())
+        rate = blocks_per_second(lambda block_number: w3.hls.sendRawBlock(raw_blocks[block_number]), num_blocks)
+        name = "import signed blocks, {0} transactions".format(count)
+        print("{0:<50} {1:>12.0f} blocks/s".format(name, rate))
+        results[name] = rate
+
+    w3 = HeliosWeb3(make_provider())
+    head_tracker = ChainHeadTracker(w3)
+    private_key = keys.PrivateKey(decode_hex(TEST_PRIVATE_KEY))
+
+    def sign_and_send(block_number):
+        transactions = [{'to': TEST_CHAIN_ADDRESS, 'value': 1, 'chainId': 1}]
+        signed_block, _, _ = prepare_and_sign_block(w3, private_key, transactions, head_tracker=head_tracker)
+        w3.hls.sendRawBlock(signed_block['rawBlock'])
+
+    rate = blocks_per_second(sign_and_send, num_blocks)
+    name = "prepare_and_sign_block and send, 1 transaction"
+    print("{0:<50} {1:>12.0f} blocks/s".format(name, rate))
+    results[name] = rate
+    return results
+
+
+if __name__ == '__main__':
+    run()
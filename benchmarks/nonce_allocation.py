@@ -0,0 +1,54 @@
+'''
+Time per nonce from a NonceManager, from one thread and shared by several, against
+asking the node for the transaction count every time.
+
+    python -m benchmarks.nonce_allocation
+'''
+import threading
+import time
+
+from helios_web3 import (
+    HeliosWeb3,
+)
+from helios_web3.utils.nonce import (
+    NonceManager,
+)
+
+from benchmarks.utils import (
+    TEST_CHAIN_ADDRESS,
+    CannedProvider,
+    print_result,
+    time_per_call,
+)
+
+
+def time_per_allocation_from_threads(nonce_manager, num_threads, iterations):
+    def allocate():
+        for _ in range(iterations):
+            nonce_manager.allocate(TEST_CHAIN_ADDRESS)
+
+    threads = [threading.Thread(target=allocate) for _ in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) / (num_threads * iterations)
+
+
+def run(iterations=10000, num_threads=(1, 8)):
+    w3 = HeliosWeb3(CannedProvider())
+    results = {}
+    print_result("hls_getTransactionCount",
+                 time_per_call(lambda: w3.hls.getTransactionCount(TEST_CHAIN_ADDRESS), iterations),
+                 results)
+    for count in num_threads:
+        nonce_manager = NonceManager(w3)
+        seconds = time_per_allocation_from_threads(nonce_manager, count, iterations)
+        assert nonce_manager.stats()['syncs'] == 1
+        print_result("NonceManager.allocate, {0} threads".format(count), seconds, results)
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,75 @@
+'''
+Replays recorded traffic through HeliosWeb3 and times how long the middlewares
+and formatters take for all of it. Without a log, a session of the calls from
+request_overhead is recorded against the canned provider first.
+
+    python -m benchmarks.replay [traffic.jsonl.gz]
+'''
+import os
+import sys
+import tempfile
+
+from helios_web3 import (
+    HeliosWeb3,
+    RecordingProvider,
+    ReplayProvider,
+)
+
+from helios_web3.providers.recording import (
+    NoRecordedResponse,
+)
+
+from benchmarks.request_overhead import (
+    CALLS,
+)
+from benchmarks.utils import (
+    CannedProvider,
+    print_result,
+    time_per_call,
+)
+
+
+def record_canned_session(path, repeat=100):
+    with RecordingProvider(CannedProvider(), path) as provider:
+        w3 = HeliosWeb3(provider)
+        for _ in range(repeat):
+            for _, call in CALLS:
+                call(w3)
+
+
+def run(log_path=None, iterations=5):
+    if log_path is None:
+        directory = tempfile.mkdtemp()
+        log_path = os.path.join(directory, 'canned.jsonl.gz')
+        record_canned_session(log_path)
+
+    provider = ReplayProvider(log_path)
+    w3 = HeliosWeb3(provider)
+    recorded_requests = provider.recorded_requests()
+
+    failures = []
+
+    def replay():
+        failed = 0
+        for method, params in recorded_requests:
+            try:
+                w3.manager.request_blocking(method, params)
+            except NoRecordedResponse:
+                # the log doesn't match what is being replayed, the timings would mean nothing
+                raise
+            except Exception:
+                # requests that failed when they were recorded fail again
+                failed += 1
+        failures.append(failed)
+
+    results = {}
+    print_result("replay {0} requests".format(len(recorded_requests)),
+                 time_per_call(replay, iterations, warmup=1),
+                 results)
+    if failures[-1]:
+        print("{0} of the replayed requests failed, as they did when recorded".format(failures[-1]))
+    return results
+
+
+if __name__ == '__main__':
+    run(*sys.argv[1:2])
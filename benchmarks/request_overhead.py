@@ -0,0 +1,53 @@
+'''
+Measures the per-call overhead of the HeliosWeb3 middlewares against a provider
+that answers instantly, with the standard RequestManager (every request walks every
+middleware) and with HeliosRequestManager (only the layers a method needs).
+
+    python -m benchmarks.request_overhead
+'''
+from web3.manager import (
+    RequestManager,
+)
+
+from helios_web3 import (
+    HeliosWeb3,
+)
+
+from benchmarks.utils import (
+    TEST_CHAIN_ADDRESS,
+    CannedProvider,
+    print_result,
+    time_per_call,
+)
+
+
+class UnfilteredHeliosWeb3(HeliosWeb3):
+    RequestManager = RequestManager
+
+
+CALLS = (
+    ('hls_ping', lambda w3: w3.hls.ping),
+    ('hls_blockNumber', lambda w3: w3.hls.blockNumber(TEST_CHAIN_ADDRESS)),
+    ('hls_getBalance', lambda w3: w3.hls.getBalance(TEST_CHAIN_ADDRESS)),
+    ('hls_sendRawBlock', lambda w3: w3.hls.sendRawBlock(b'\x01' * 100)),
+    ('hls_getBlockCreationParams', lambda w3: w3.hls.getBlockCreationParams(TEST_CHAIN_ADDRESS)),
+)
+
+
+def run(iterations=2000):
+    unfiltered = UnfilteredHeliosWeb3(CannedProvider())
+    filtered = HeliosWeb3(CannedProvider())
+    results = {}
+    for method, call in CALLS:
+        assert call(unfiltered) == call(filtered)
+        print_result("{0}, all middlewares".format(method),
+                     time_per_call(lambda: call(unfiltered), iterations),
+                     results)
+        print_result("{0}, per-method middlewares".format(method),
+                     time_per_call(lambda: call(filtered), iterations),
+                     results)
+    return results
+
+
+if __name__ == '__main__':
+    run()
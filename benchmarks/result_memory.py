@@ -0,0 +1,65 @@
+'''
+Compares the memory held by formatted transactions and receipts as AttributeDicts,
+as today, and as slotted records.
+
+    python -m benchmarks.result_memory
+'''
+import tracemalloc
+
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from helios_web3.pythonic_middleware import (
+    construct_pythonic_middleware,
+)
+
+from benchmarks.formatting import (
+    make_receipt,
+    make_transaction,
+)
+
+
+def formatted_results(method, raw_results, **middleware_options):
+    middleware = construct_pythonic_middleware(**middleware_options)
+    results = iter(raw_results)
+    make_request = middleware(lambda method, params: {'result': next(results)}, None)
+    return [
+        AttributeDict.recursive(make_request(method, ['0x' + '11' * 32])['result'])
+        for _ in range(len(raw_results))
+    ]
+
+
+def measure(method, raw_results, **middleware_options):
+    tracemalloc.start()
+    try:
+        results = formatted_results(method, raw_results, **middleware_options)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return size
+
+
+def run(count=10000):
+    cases = (
+        ('transactions', 'hls_getTransactionByHash', [make_transaction(index) for index in range(count)]),
+        ('receipts', 'hls_getTransactionReceipt', [make_receipt(index) for index in range(count)]),
+    )
+    results = {}
+    for name, method, raw_results in cases:
+        attrdict_size = measure(method, raw_results)
+        slotted_size = measure(method, raw_results, slotted=True)
+        results["{0} {1}, AttributeDict bytes".format(count, name)] = attrdict_size
+        results["{0} {1}, slotted bytes".format(count, name)] = slotted_size
+        print("{0} {1}: {2:>10.1f} KiB as AttributeDict, {3:>10.1f} KiB slotted".format(
+            count,
+            name,
+            attrdict_size / 1024,
+            slotted_size / 1024,
+        ))
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,61 @@
+'''
+Compares hvm's make_trie_root_and_nodes with the root-only make_trie_root used by
+signBlock, on the transaction trie of blocks with 10, 100 and 1000 transactions.
+
+    python -m benchmarks.trie_root
+'''
+from eth_keys import (
+    keys,
+)
+from eth_utils import (
+    decode_hex,
+)
+from hvm.db.trie import (
+    make_trie_root_and_nodes,
+)
+
+from helios_web3.account import (
+    _make_send_transaction,
+)
+from helios_web3.utils.trie import (
+    make_trie_root,
+)
+
+from benchmarks.block_signing import (
+    make_send_transaction_dicts,
+)
+from benchmarks.utils import (
+    TEST_PRIVATE_KEY,
+    print_result,
+    scaled_iterations,
+    time_per_call,
+)
+
+
+def make_send_transactions(count):
+    key_obj = keys.PrivateKey(decode_hex(TEST_PRIVATE_KEY))
+    return [
+        _make_send_transaction(transaction_dict, 1, key_obj, 1)
+        for transaction_dict in make_send_transaction_dicts(count)
+    ]
+
+
+def run(num_transactions=(10, 100, 1000), iterations=100):
+    results = {}
+    for count in num_transactions:
+        transactions = make_send_transactions(count)
+        root_hash, _ = make_trie_root_and_nodes(transactions)
+        assert make_trie_root(transactions) == root_hash
+        count_iterations = scaled_iterations(iterations, count)
+
+        print_result("make_trie_root_and_nodes, {0} transactions".format(count),
+                     time_per_call(lambda: make_trie_root_and_nodes(transactions), count_iterations),
+                     results)
+        print_result("make_trie_root, {0} transactions".format(count),
+                     time_per_call(lambda: make_trie_root(transactions), count_iterations),
+                     results)
+    return results
+
+
+if __name__ == '__main__':
+    run()
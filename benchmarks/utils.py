@@ -0,0 +1,67 @@
+import time
+
+from web3.providers.base import (
+    BaseProvider,
+)
+
+TEST_PRIVATE_KEY = '0x' + '4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318'
+TEST_CHAIN_ADDRESS = '0x2c7536E3605D9C16a7a3D7b1898e529396a65c23'
+
+CANNED_RESULTS = {
+    'hls_ping': True,
+    'hls_gasPrice': '0x1',
+    'hls_getHistoricalGasPrice': [],
+    'hls_blockNumber': '0x10',
+    'hls_getBalance': '0xde0b6b3a7640000',
+    'hls_getTransactionCount': '0x1',
+    'hls_sendRawBlock': True,
+    'hls_getBlockCreationParams': {
+        'block_number': '0x10',
+        'parent_hash': '0x' + '11' * 32,
+        'nonce': '0x1',
+        'receive_transactions': [],
+        'reward_bundle': '0x',
+    },
+}
+
+
+class CannedProvider(BaseProvider):
+    '''
+    Returns a fixed result for each method without any I/O.
+    '''
+    def __init__(self, results=CANNED_RESULTS):
+        self.results = results
+
+    def make_request(self, method, params):
+        return {'jsonrpc': '2.0', 'id': 0, 'result': self.results[method]}
+
+    def isConnected(self):
+        return True
+
+
+def time_per_call(fn, iterations=100, warmup=5):
+    '''
+    Returns the mean number of seconds per call of fn.
+    '''
+    for _ in range(warmup):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def scaled_iterations(iterations, size, min_iterations=5):
+    '''
+    Fewer iterations for cases that work on more than 10 items, so the big cases
+    don't take forever.
+    '''
+    if size <= 10:
+        return iterations
+    return max(min_iterations, iterations * 10 // size)
+
+
+def print_result(name, seconds, results=None):
+    print("{0:<50} {1:>12.1f} us".format(name, seconds * 1e6))
+    if results is not None:
+        results[name] = seconds
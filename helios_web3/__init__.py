@@ -12,7 +12,10 @@ if sys.version_info < (3, 5):
         "Python 3.5 or above is required. "
         "Note that support for Python 3.5 will be removed in web3.py v5")
 
-from helios_web3.main import HeliosWeb3
+from helios_web3.main import (
+    AsyncHeliosWeb3,
+    HeliosWeb3,
+)
 
 from web3.providers.ipc import (  # noqa: E402
     IPCProvider,
@@ -24,12 +27,28 @@ from web3.providers.websocket import (  # noqa: E402
     WebsocketProvider,
 )
 
+from helios_web3.providers import (  # noqa: E402
+    AsyncHTTPProvider,
+    AsyncWebsocketProvider,
+    InProcessNodeProvider,
+    PooledHTTPProvider,
+    RecordingProvider,
+    ReplayProvider,
+)
+
 from helios_web3.account import Account
 
 __all__ = [
     "HeliosWeb3",
+    "AsyncHeliosWeb3",
     "HTTPProvider",
     "IPCProvider",
     "WebsocketProvider",
+    "AsyncHTTPProvider",
+    "AsyncWebsocketProvider",
+    "InProcessNodeProvider",
+    "PooledHTTPProvider",
+    "RecordingProvider",
+    "ReplayProvider",
     "Account",
 ]
\ No newline at end of file
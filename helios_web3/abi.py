@@ -23,6 +23,10 @@ STANDARD_NORMALIZERS = [
 
 RPC_ABIS['personal_importRawKey'] = ['bytes', None]
 
+ABI_REQUEST_FORMATTERS = abi_request_formatters(STANDARD_NORMALIZERS, RPC_ABIS)
+
 abi_middleware = construct_formatting_middleware(
-    request_formatters=abi_request_formatters(STANDARD_NORMALIZERS, RPC_ABIS)
-)
\ No newline at end of file
+    request_formatters=ABI_REQUEST_FORMATTERS
+)
+# HeliosRequestManager skips it for other methods
+abi_middleware.rpc_methods = frozenset(ABI_REQUEST_FORMATTERS)
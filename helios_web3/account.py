@@ -1,4 +1,10 @@
+import copy
+import os
+import sys
 import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
 
 from eth_account import Account as EthAccount
 from eth_utils.curried import (
@@ -10,6 +16,7 @@ from eth_utils.curried import (
 
 from collections import (
     Mapping,
+    deque,
 )
 
 from cytoolz import (
@@ -21,11 +28,20 @@ from typing import (
     Tuple,
     List,
     Dict, Any)
-import rlp_cython as rlp
 from helios_web3.utils.get_version import get_photon_timestamp
-from hvm.constants import GAS_TX
-from hvm.vm.forks.boson.transactions import BosonTransaction
-# fields = [
+from helios_web3.utils.lazy_imports import LazyImports
+from helios_web3.utils.trie import make_trie_root
+
+from eth_account.datastructures import (
+    AttributeDict,
+)
+
+from eth_utils import to_bytes, is_bytes, to_hex, to_wei, is_boolean, to_int, is_integer
+
+# The VM classes blocks are built from. They are only imported when the first block
+# is signed, as they take much longer to import than the rest of helios_web3.
+#
+# BosonTransaction fields = [
 #         ('nonce', big_endian_int),
 #         ('gas_price', big_endian_int),
 #         ('gas', big_endian_int),
@@ -36,39 +52,22 @@ from hvm.vm.forks.boson.transactions import BosonTransaction
 #         ('r', big_endian_int),
 #         ('s', big_endian_int),
 #     ]
-
-from hvm.vm.forks.boson.transactions import BosonReceiveTransaction
-# fields = [
+#
+# BosonReceiveTransaction fields = [
 #         ('sender_block_hash', hash32),
 #         ('send_transaction_hash', hash32),
 #         ('is_refund', boolean),
 #         ('remaining_refund', big_endian_int)
 #     ]
-
-from hvm.vm.forks.boson import BosonMicroBlock
-
-# fields = [
+#
+# BosonMicroBlock fields = [
 #     ('header', MicroBlockHeader),
 #     ('transactions', CountableList(BosonTransaction)),
 #     ('receive_transactions', CountableList(BosonReceiveTransaction)),
 #     ('reward_bundle', StakeRewardBundle),
 # ]
-
-from hvm.rlp.headers import MicroBlockHeader
-
-from hvm.utils.rlp import convert_rlp_to_correct_class
-
-from hvm.db.trie import make_trie_root_and_nodes
-
-from hvm.rlp.headers import (
-    MicroBlockHeader,
-    BlockHeader)
-
-from eth_account.datastructures import (
-    AttributeDict,
-)
-
-# fields = [
+#
+# MicroBlockHeader fields = [
 #     ('chain_address', address),
 #     ('parent_hash', hash32),
 #     ('transaction_root', trie_root),
@@ -81,13 +80,224 @@ from eth_account.datastructures import (
 #     ('r', big_endian_int),
 #     ('s', big_endian_int),
 # ]
-from hvm.rlp.consensus import StakeRewardBundle
+vm = LazyImports({
+    'rlp': 'rlp_cython',
+    'BosonTransaction': 'hvm.vm.forks.boson.transactions:BosonTransaction',
+    'BosonReceiveTransaction': 'hvm.vm.forks.boson.transactions:BosonReceiveTransaction',
+    'BosonMicroBlock': 'hvm.vm.forks.boson:BosonMicroBlock',
+    'BlockHeader': 'hvm.rlp.headers:BlockHeader',
+    'StakeRewardBundle': 'hvm.rlp.consensus:StakeRewardBundle',
+    'PhotonTransaction': ('hvm.vm.forks.photon:PhotonTransaction',
+                          'helios_web3.temp_fork_files.photon:PhotonTransaction'),
+    'PhotonMicroBlock': ('hvm.vm.forks.photon:PhotonMicroBlock',
+                         'helios_web3.temp_fork_files.photon:PhotonMicroBlock'),
+    'PhotonReceiveTransaction': ('hvm.vm.forks.photon:PhotonReceiveTransaction',
+                                 'helios_web3.temp_fork_files.photon:PhotonReceiveTransaction'),
+    # not used here any more, kept so they can still be imported from this module
+    'GAS_TX': 'hvm.constants:GAS_TX',
+    'MicroBlockHeader': 'hvm.rlp.headers:MicroBlockHeader',
+    'convert_rlp_to_correct_class': 'hvm.utils.rlp:convert_rlp_to_correct_class',
+    'make_trie_root_and_nodes': 'hvm.db.trie:make_trie_root_and_nodes',
+})
+
+
+def __getattr__(name):
+    '''
+    The VM names this module used to import eagerly, like ``GAS_TX`` or
+    ``BosonTransaction``, loaded when they are first imported from it.
+    '''
+    try:
+        return getattr(vm, name)
+    except AttributeError:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name)) from None
+
+
+if sys.version_info < (3, 7):
+    # module __getattr__ needs Python 3.7, so on 3.6 they are imported up front
+    globals().update(vm.load_all())
+
+
+def _get_chain_id(header_dict, send_transaction_dicts, default=1):
+    if "chainId" in header_dict:
+        return header_dict['chainId']
+    if len(send_transaction_dicts) > 0:
+        if 'chainId' in send_transaction_dicts[0]:
+            return send_transaction_dicts[0]['chainId']
+    return default
+
+
+def _get_fork_id(timestamp, photon_timestamp):
+    if timestamp < photon_timestamp:
+        return 0
+    else:
+        return 1
+
+
+def _make_send_transaction(transaction_dict, fork_id, key_obj, chain_id):
+    if 'data' in transaction_dict:
+        if not is_bytes(transaction_dict['data']):
+            data = to_bytes(hexstr = transaction_dict['data'])
+        else:
+            data = transaction_dict['data']
+    else:
+        data = b''
+
+    if not is_bytes(transaction_dict['to']):
+        to = to_bytes(hexstr = transaction_dict['to'])
+    else:
+        to = transaction_dict['to']
+
+    if fork_id == 0:
+        tx = vm.BosonTransaction(nonce = transaction_dict['nonce'],
+                                 gas_price = transaction_dict['gasPrice'],
+                                 gas = transaction_dict['gas'],
+                                 to = to,
+                                 value = transaction_dict['value'],
+                                 data = data,
+                                 v = 0,
+                                 r = 0,
+                                 s = 0
+                                 )
+        return tx.get_signed(key_obj, chain_id)
+    elif fork_id == 1:
+        if 'codeAddress' in transaction_dict:
+            if not is_bytes(transaction_dict['codeAddress']):
+                code_address = to_bytes(hexstr=transaction_dict['codeAddress'])
+            else:
+                code_address = transaction_dict['codeAddress']
+        else:
+            code_address = b''
 
-from eth_utils import to_bytes, is_bytes, to_hex, to_wei, is_boolean, to_int, is_integer
-try:
-    from hvm.vm.forks.photon import PhotonTransaction, PhotonMicroBlock, PhotonReceiveTransaction
-except ModuleNotFoundError:
-    from .temp_fork_files.photon import PhotonTransaction, PhotonMicroBlock, PhotonReceiveTransaction
+        if 'executeOnSend' in transaction_dict:
+            execute_on_send = bool(transaction_dict['executeOnSend'])
+        else:
+            execute_on_send = False
+
+
+
+        tx = vm.PhotonTransaction(nonce=transaction_dict['nonce'],
+                                 gas_price=transaction_dict['gasPrice'],
+                                 gas=transaction_dict['gas'],
+                                 to=to,
+                                 value=transaction_dict['value'],
+                                 data=data,
+                                 code_address=code_address,
+                                 execute_on_send=execute_on_send,
+                                 v=0,
+                                 r=0,
+                                 s=0
+                                 )
+        return tx.get_signed(key_obj, chain_id)
+    else:
+        raise Exception("Unknown fork id")
+
+
+def _make_receive_transaction(receive_transaction_dict, fork_id):
+    if not is_bytes(receive_transaction_dict['senderBlockHash']):
+        receive_transaction_dict['senderBlockHash'] = to_bytes(hexstr = receive_transaction_dict['senderBlockHash'])
+
+    if not is_bytes(receive_transaction_dict['sendTransactionHash']):
+        receive_transaction_dict['sendTransactionHash'] = to_bytes(hexstr = receive_transaction_dict['sendTransactionHash'])
+
+    if not is_boolean(receive_transaction_dict['isRefund']):
+        receive_transaction_dict['isRefund'] = False if to_int(hexstr = receive_transaction_dict['isRefund']) == 0 else True
+
+    # We renamed the fourth parameter in the new photon fork
+    fourth_parameter = 0
+    if 'remainingRefund' in receive_transaction_dict:
+        if not is_integer(receive_transaction_dict['remainingRefund']):
+            fourth_parameter = to_int(hexstr=receive_transaction_dict['remainingRefund'])
+        else:
+            fourth_parameter = receive_transaction_dict['remainingRefund']
+    elif 'refundAmount' in receive_transaction_dict:
+        if not is_integer(receive_transaction_dict['refundAmount']):
+            fourth_parameter = to_int(hexstr=receive_transaction_dict['refundAmount'])
+        else:
+            fourth_parameter = receive_transaction_dict['refundAmount']
+
+    if fork_id == 0:
+        receive_transaction_class = vm.BosonReceiveTransaction
+    elif fork_id == 1:
+        receive_transaction_class = vm.PhotonReceiveTransaction
+    else:
+        raise Exception("Unknown fork id")
+
+    return receive_transaction_class(receive_transaction_dict['senderBlockHash'],
+                                     receive_transaction_dict['sendTransactionHash'],
+                                     receive_transaction_dict['isRefund'],
+                                     fourth_parameter)
+
+
+def _sign_block(key_obj,
+                chain_address: bytes,
+                chain_id: int,
+                fork_id: int,
+                timestamp: int,
+                header_dict: dict,
+                send_transaction_dicts: List[dict],
+                receive_transaction_dicts: List[dict]) -> AttributeDict:
+
+    if not is_bytes(header_dict['parentHash']):
+        header_dict['parentHash'] = to_bytes(hexstr=header_dict['parentHash'])
+
+
+    if "extraData" in header_dict:
+        if not is_bytes(header_dict['extraData']):
+            extra_data = to_bytes(hexstr=header_dict['extraData'])
+        else:
+            extra_data = header_dict['extraData']
+    else:
+        extra_data = b''
+
+    send_transactions = [_make_send_transaction(transaction_dict, fork_id, key_obj, chain_id)
+                         for transaction_dict in send_transaction_dicts]
+
+    receive_transactions = [_make_receive_transaction(receive_transaction_dict, fork_id)
+                            for receive_transaction_dict in receive_transaction_dicts]
+
+    send_tx_root_hash = make_trie_root(send_transactions)
+    receive_tx_root_hash = make_trie_root(receive_transactions)
+
+    reward_bundle = vm.StakeRewardBundle()
+
+    header = vm.BlockHeader(chain_address = chain_address,
+                             parent_hash = header_dict['parentHash'],
+                             transaction_root = send_tx_root_hash,
+                             receive_transaction_root = receive_tx_root_hash,
+                             block_number = header_dict['blockNumber'],
+                             timestamp = timestamp,
+                             extra_data = extra_data,
+                             reward_hash = reward_bundle.hash)
+
+    signed_header = header.get_signed(key_obj, chain_id)
+    signed_micro_header = signed_header.to_micro_header()
+
+    if fork_id == 0:
+        micro_block = vm.BosonMicroBlock(header = signed_micro_header,
+                                         transactions = send_transactions,
+                                         receive_transactions = receive_transactions,
+                                         reward_bundle = reward_bundle)
+        rlp_encoded_micro_block = vm.rlp.encode(micro_block, sedes=vm.BosonMicroBlock)
+    elif fork_id == 1:
+        micro_block = vm.PhotonMicroBlock(header=signed_micro_header,
+                                         transactions=send_transactions,
+                                         receive_transactions=receive_transactions,
+                                         reward_bundle=reward_bundle)
+        rlp_encoded_micro_block = vm.rlp.encode(micro_block, sedes=vm.PhotonMicroBlock)
+    else:
+        raise Exception("Unknown fork id")
+
+
+
+    return AttributeDict({
+        'rawBlock': encode_hex(rlp_encoded_micro_block),
+        'hash': signed_header.hash,
+        'send_tx_hashes': [tx.hash for tx in send_transactions],
+        'receive_tx_hashes': [tx.hash for tx in receive_transactions],
+        'r': signed_header.r,
+        's': signed_header.s,
+        'v': signed_header.v,
+    })
 
 
 class Account(EthAccount):
@@ -130,182 +340,128 @@ class Account(EthAccount):
 
         timestamp = int(time.time())
 
-        if not is_bytes(header_dict['parentHash']):
-            header_dict['parentHash'] = to_bytes(hexstr=header_dict['parentHash'])
-
-
-        if "extraData" in header_dict:
-            if not is_bytes(header_dict['extraData']):
-                extra_data = to_bytes(hexstr=header_dict['extraData'])
-            else:
-                extra_data = header_dict['extraData']
-        else:
-            extra_data = b''
-
-        if "chainId" in header_dict:
-            chain_id = header_dict['chainId']
-        else:
-            if len(send_transaction_dicts) > 0:
-                if 'chainId' in send_transaction_dicts[0]:
-                    chain_id = send_transaction_dicts[0]['chainId']
-                else:
-                    chain_id = 1
-            else:
-                chain_id = 1
+        chain_id = _get_chain_id(header_dict, send_transaction_dicts)
 
-        photon_timestamp = get_photon_timestamp(chain_id)
-        if timestamp < photon_timestamp:
-            fork_id = 0
-        else:
-            fork_id = 1
+        fork_id = _get_fork_id(timestamp, get_photon_timestamp(chain_id))
 
         account = self.privateKeyToAccount(private_key)
 
-        send_transactions = []
-        for transaction_dict in send_transaction_dicts:
-            if 'data' in transaction_dict:
-                if not is_bytes(transaction_dict['data']):
-                    data = to_bytes(hexstr = transaction_dict['data'])
-                else:
-                    data = transaction_dict['data']
-            else:
-                data = b''
+        return _sign_block(account._key_obj,
+                           decode_hex(account.address),
+                           chain_id,
+                           fork_id,
+                           timestamp,
+                           header_dict,
+                           send_transaction_dicts,
+                           receive_transaction_dicts)
 
-            if not is_bytes(transaction_dict['to']):
-                to = to_bytes(hexstr = transaction_dict['to'])
-            else:
-                to = transaction_dict['to']
-
-            if fork_id == 0:
-                tx = BosonTransaction(nonce = transaction_dict['nonce'],
-                                      gas_price = transaction_dict['gasPrice'],
-                                      gas = transaction_dict['gas'],
-                                      to = to,
-                                      value = transaction_dict['value'],
-                                      data = data,
-                                      v = 0,
-                                      r = 0,
-                                      s = 0
-                                      )
-                signed_tx = tx.get_signed(account._key_obj, chain_id)
-            elif fork_id == 1:
-                if 'codeAddress' in transaction_dict:
-                    if not is_bytes(transaction_dict['codeAddress']):
-                        code_address = to_bytes(hexstr=transaction_dict['codeAddress'])
-                    else:
-                        code_address = transaction_dict['codeAddress']
-                else:
-                    code_address = b''
-
-                if 'executeOnSend' in transaction_dict:
-                    execute_on_send = bool(transaction_dict['executeOnSend'])
-                else:
-                    execute_on_send = False
-
-
-
-                tx = PhotonTransaction(nonce=transaction_dict['nonce'],
-                                      gas_price=transaction_dict['gasPrice'],
-                                      gas=transaction_dict['gas'],
-                                      to=to,
-                                      value=transaction_dict['value'],
-                                      data=data,
-                                      code_address=code_address,
-                                      execute_on_send=execute_on_send,
-                                      v=0,
-                                      r=0,
-                                      s=0
-                                      )
-                signed_tx = tx.get_signed(account._key_obj, chain_id)
-            else:
-                raise Exception("Unknown fork id")
-
-            send_transactions.append(signed_tx)
-
-        receive_transactions = []
-        for receive_transaction_dict in receive_transaction_dicts:
-
-            if not is_bytes(receive_transaction_dict['senderBlockHash']):
-                receive_transaction_dict['senderBlockHash'] = to_bytes(hexstr = receive_transaction_dict['senderBlockHash'])
-
-            if not is_bytes(receive_transaction_dict['sendTransactionHash']):
-                receive_transaction_dict['sendTransactionHash'] = to_bytes(hexstr = receive_transaction_dict['sendTransactionHash'])
-
-            if not is_boolean(receive_transaction_dict['isRefund']):
-                receive_transaction_dict['isRefund'] = False if to_int(hexstr = receive_transaction_dict['isRefund']) == 0 else True
-
-            # We renamed the fourth parameter in the new photon fork
-            fourth_parameter = 0
-            if 'remainingRefund' in receive_transaction_dict:
-                if not is_integer(receive_transaction_dict['remainingRefund']):
-                    fourth_parameter = to_int(hexstr=receive_transaction_dict['remainingRefund'])
-                else:
-                    fourth_parameter = receive_transaction_dict['remainingRefund']
-            elif 'refundAmount' in receive_transaction_dict:
-                if not is_integer(receive_transaction_dict['refundAmount']):
-                    fourth_parameter = to_int(hexstr=receive_transaction_dict['refundAmount'])
-                else:
-                    fourth_parameter = receive_transaction_dict['refundAmount']
-
-            if fork_id == 0:
-                receive_transaction_class = BosonReceiveTransaction
-            elif fork_id == 1:
-                receive_transaction_class = PhotonReceiveTransaction
-            else:
-                raise Exception("Unknown fork id")
-
-            tx = receive_transaction_class(receive_transaction_dict['senderBlockHash'],
-                                           receive_transaction_dict['sendTransactionHash'],
-                                           receive_transaction_dict['isRefund'],
-                                           fourth_parameter)
-
-            receive_transactions.append(tx)
-
-
-        send_tx_root_hash, _ = make_trie_root_and_nodes(send_transactions)
-        receive_tx_root_hash, _ = make_trie_root_and_nodes(receive_transactions)
-
-        chain_address = account.address
-
-
-
-        reward_bundle = StakeRewardBundle()
-
-        header = BlockHeader(chain_address = decode_hex(chain_address),
-                              parent_hash = header_dict['parentHash'],
-                              transaction_root = send_tx_root_hash,
-                              receive_transaction_root = receive_tx_root_hash,
-                              block_number = header_dict['blockNumber'],
-                              timestamp = timestamp,
-                              extra_data = extra_data,
-                              reward_hash = reward_bundle.hash)
+    @combomethod
+    def signBlocks(self, jobs, workers: int = None, max_pending: int = None):
+        '''
+        Signs many blocks in parallel over a pool of worker processes.
 
-        signed_header = header.get_signed(account._key_obj, chain_id)
-        signed_micro_header = signed_header.to_micro_header()
+        Each job is a dict of ``signBlock`` keyword arguments: ``header_dict``,
+        ``private_key`` and optionally ``send_transaction_dicts`` and
+        ``receive_transaction_dicts``. Results are yielded in job order as they
+        become available. A job that fails yields its exception instead of a
+        signed block, without affecting the other jobs.
 
-        if fork_id == 0:
-            micro_block = BosonMicroBlock(header = signed_micro_header,
-                                          transactions = send_transactions,
-                                          receive_transactions = receive_transactions,
-                                          reward_bundle = reward_bundle)
-            rlp_encoded_micro_block = rlp.encode(micro_block, sedes=BosonMicroBlock)
-        elif fork_id == 1:
-            micro_block = PhotonMicroBlock(header=signed_micro_header,
-                                          transactions=send_transactions,
-                                          receive_transactions=receive_transactions,
-                                          reward_bundle=reward_bundle)
-            rlp_encoded_micro_block = rlp.encode(micro_block, sedes=PhotonMicroBlock)
-        else:
-            raise Exception("Unknown fork id")
+            for signed_block in Account.signBlocks(jobs, workers=8):
+                ...
 
+        Jobs are signed in copies held by the workers, so unlike ``signBlock`` the
+        dicts passed in are not modified.
 
+        :param jobs: iterable of signBlock keyword argument dicts
+        :param workers: number of processes, defaults to the number of cores. With 1
+            the blocks are signed in this process.
+        :param max_pending: maximum number of jobs submitted ahead of the one being
+            yielded, defaults to 4 per worker
+        '''
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if max_pending is None:
+            max_pending = workers * 4
+
+        if workers == 1:
+            for job in jobs:
+                # signBlock fills in the transaction dicts, the workers get copies anyway
+                yield _job_result(_sign_block_job(copy.deepcopy(job)))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for job in jobs:
+                pending.append(executor.submit(_sign_block_job, job))
+                if len(pending) >= max_pending:
+                    yield _future_job_result(pending.popleft())
+            while pending:
+                yield _future_job_result(pending.popleft())
 
-        return AttributeDict({
-            'rawBlock': encode_hex(rlp_encoded_micro_block),
-            'send_tx_hashes': [tx.hash for tx in send_transactions],
-            'receive_tx_hashes': [tx.hash for tx in receive_transactions],
-            'r': signed_header.r,
-            's': signed_header.s,
-            'v': signed_header.v,
-        })
+    @combomethod
+    def blockSigner(self, private_key: str, chain_id: int = 1) -> 'BlockSigner':
+        return BlockSigner(private_key, chain_id)
+
+
+def _sign_block_job(job):
+    # runs in the worker processes, so it returns plain picklable values
+    try:
+        return dict(Account.signBlock(**job))
+    except Exception as e:
+        return e
+
+
+def _job_result(result):
+    if isinstance(result, Exception):
+        return result
+    return AttributeDict(result)
+
+
+def _future_job_result(future):
+    try:
+        result = future.result()
+    except Exception as e:
+        return e
+    return _job_result(result)
+
+
+class BlockSigner:
+    '''
+    Signs blocks for a single private key and chain id. The key object, chain address
+    and photon fork timestamp are worked out once, so long running block producers
+    don't pay for them on every block like ``Account.signBlock`` does. The signed
+    blocks are identical to the ones produced by ``Account.signBlock``.
+
+        signer = BlockSigner(private_key, chain_id=1)
+        signed_block = signer.signBlock(header_dict, send_transaction_dicts)
+    '''
+    def __init__(self, private_key, chain_id: int = 1):
+        account = Account.privateKeyToAccount(private_key)
+        self.address = account.address
+        self.chain_id = chain_id
+        self._key_obj = account._key_obj
+        self._chain_address = decode_hex(account.address)
+        self._photon_timestamp = get_photon_timestamp(chain_id)
+
+    def signBlock(self, header_dict: dict, send_transaction_dicts: List[dict] = [], receive_transaction_dicts: List[dict] = []) -> AttributeDict:
+        timestamp = int(time.time())
 
+        chain_id = _get_chain_id(header_dict, send_transaction_dicts, default=self.chain_id)
+        if chain_id != self.chain_id:
+            raise ValueError(
+                "This signer is bound to chain id {0} but the block is for chain id {1}".format(
+                    self.chain_id,
+                    chain_id,
+                )
+            )
+
+        fork_id = _get_fork_id(timestamp, self._photon_timestamp)
+
+        return _sign_block(self._key_obj,
+                           self._chain_address,
+                           chain_id,
+                           fork_id,
+                           timestamp,
+                           header_dict,
+                           send_transaction_dicts,
+                           receive_transaction_dicts)
@@ -10,4 +10,8 @@ class Admin(Module):
         return self.web3.manager.request_blocking("admin_stopRPC", [password])
 
     def startRPC(self, password):
-        return self.web3.manager.request_blocking("admin_startRPC", [password])
\ No newline at end of file
+        return self.web3.manager.request_blocking("admin_startRPC", [password])
+
+
+class AsyncAdmin(Admin):
+    pass
@@ -0,0 +1,70 @@
+from eth_utils import (
+    is_dict,
+)
+from eth_utils.toolz import (
+    assoc,
+)
+
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from helios_web3.abi import (
+    ABI_REQUEST_FORMATTERS,
+)
+from helios_web3.pythonic_middleware import (
+    PYTHONIC_REQUEST_FORMATTERS,
+    PYTHONIC_RESULT_FORMATTERS,
+)
+
+
+def construct_async_formatting_middleware(
+        request_formatters=None,
+        result_formatters=None,
+        error_formatters=None):
+    '''
+    Coroutine version of web3's construct_formatting_middleware. It takes the same
+    formatter tables, so the async client formats requests and results exactly like
+    HeliosWeb3.
+    '''
+    request_formatters = request_formatters or {}
+    result_formatters = result_formatters or {}
+    error_formatters = error_formatters or {}
+
+    def async_formatting_middleware(make_request, web3):
+        async def middleware(method, params):
+            if method in request_formatters:
+                params = request_formatters[method](params)
+
+            response = await make_request(method, params)
+
+            if 'result' in response and method in result_formatters:
+                return assoc(response, 'result', result_formatters[method](response['result']))
+            elif 'error' in response and method in error_formatters:
+                return assoc(response, 'error', error_formatters[method](response['error']))
+            else:
+                return response
+        return middleware
+    return async_formatting_middleware
+
+
+def async_attrdict_middleware(make_request, web3):
+    async def middleware(method, params):
+        response = await make_request(method, params)
+
+        if 'result' in response:
+            result = response['result']
+            if is_dict(result) and not isinstance(result, AttributeDict):
+                return assoc(response, 'result', AttributeDict.recursive(result))
+        return response
+    return middleware
+
+
+async_pythonic_middleware = construct_async_formatting_middleware(
+    request_formatters=PYTHONIC_REQUEST_FORMATTERS,
+    result_formatters=PYTHONIC_RESULT_FORMATTERS,
+)
+
+async_abi_middleware = construct_async_formatting_middleware(
+    request_formatters=ABI_REQUEST_FORMATTERS,
+)
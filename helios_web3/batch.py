@@ -0,0 +1,254 @@
+import time
+
+from eth_utils import (
+    to_bytes,
+    to_text,
+)
+
+from web3._utils.encoding import (
+    FriendlyJsonSerde,
+)
+from web3._utils.request import (
+    make_post_request,
+)
+from web3.middleware import (
+    combine_middlewares,
+)
+from web3.providers.rpc import (
+    HTTPProvider,
+)
+
+
+class BatchRequestError(Exception):
+    pass
+
+
+class _CapturedRequest(Exception):
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+
+
+class BatchItem:
+    '''
+    Placeholder returned by every call queued on a batch. Once the batch has been
+    executed it holds either the formatted result or the error for this call.
+    '''
+    _unset = object()
+
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+        self._result = self._unset
+        self.error = None
+
+    @property
+    def done(self):
+        return self._result is not self._unset or self.error is not None
+
+    @property
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        if self._result is self._unset:
+            raise BatchRequestError("The batch containing this request has not been executed yet")
+        return self._result
+
+    def __repr__(self):
+        return "BatchItem(method=%r, done=%r)" % (self.method, self.done)
+
+
+class _BatchWeb3:
+    '''
+    Stands in for the web3 object of the modules attached to a batch. Requests are
+    queued on the batch instead of being sent, everything else goes to the real web3.
+    '''
+    def __init__(self, web3, batch):
+        self._web3 = web3
+        self.manager = batch
+
+    def __getattr__(self, attr):
+        return getattr(self._web3, attr)
+
+
+def make_batch_request(provider, requests):
+    '''
+    Sends a list of (method, params) pairs to the provider and returns the raw
+    responses in the same order. Providers that implement ``make_batch_request``
+    are used directly, HTTP providers get a single JSON-RPC array payload and any
+    other provider falls back to one request per call.
+    '''
+    if hasattr(provider, 'make_batch_request'):
+        return provider.make_batch_request(requests)
+
+    if not isinstance(provider, HTTPProvider):
+        return [provider.make_request(method, params) for method, params in requests]
+
+    request_ids, request_data = encode_batch_request(provider, requests)
+    raw_response = make_post_request(
+        provider.endpoint_uri,
+        request_data,
+        **provider.get_request_kwargs()
+    )
+    decoded = FriendlyJsonSerde().json_decode(to_text(raw_response))
+    return match_batch_responses(request_ids, decoded)
+
+
+def encode_batch_request(provider, requests):
+    '''
+    Encodes (method, params) pairs as a JSON-RPC array, numbered with the provider's
+    request counter. Returns the request ids and the encoded payload.
+    '''
+    request_ids = []
+    rpc_dicts = []
+    for method, params in requests:
+        request_id = next(provider.request_counter)
+        request_ids.append(request_id)
+        rpc_dicts.append({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": request_id,
+        })
+
+    return request_ids, to_bytes(text=FriendlyJsonSerde().json_encode(rpc_dicts))
+
+
+def match_batch_responses(request_ids, decoded):
+    # A node that rejects the whole payload answers with a single error object
+    if isinstance(decoded, dict):
+        return [decoded for _ in request_ids]
+
+    responses_by_id = {response.get('id'): response for response in decoded}
+    responses = []
+    for request_id in request_ids:
+        if request_id in responses_by_id:
+            responses.append(responses_by_id[request_id])
+        else:
+            responses.append({'error': "No response for request id {0} in batch".format(request_id)})
+    return responses
+
+
+class BatchRequest:
+    '''
+    Queues Hls and Personal calls and sends them to the node as one JSON-RPC batch.
+
+        batch = w3.hls.batch()
+        balances = [batch.hls.getBalance(address) for address in addresses]
+        results = batch.execute()
+
+    Every call returns a ``BatchItem``. ``execute`` returns the results in the order
+    the calls were queued; calls that failed are returned as the exception instead of
+    failing the whole batch. Results go through the same middleware stack as normal
+    requests, including the provider's middlewares, so they are formatted exactly
+    like the non-batched methods. With instrumentation enabled, every batched call is
+    counted with the latency of the whole batch.
+
+    Only methods that return the result of a single request can be batched.
+    '''
+    def __init__(self, web3):
+        # imported here to avoid a circular import with hls.py
+        from helios_web3.hls import Hls
+        from helios_web3.personal import Personal
+
+        self.web3 = web3
+        self._items = []
+        batch_web3 = _BatchWeb3(web3, self)
+        self.hls = Hls(batch_web3)
+        self.personal = Personal(batch_web3)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None and self._items:
+            self.execute()
+        return False
+
+    def request_blocking(self, method, params):
+        item = BatchItem(method, params)
+        self._items.append(item)
+        return item
+
+    def coro_request(self, method, params):
+        raise NotImplementedError("Batched requests can only be executed with execute()")
+
+    def execute(self):
+        items = [item for item in self._items if not item.done]
+        if not items:
+            return [self._item_output(item) for item in self._items]
+
+        # the provider's own middlewares run innermost, like in RequestManager
+        middlewares = tuple(self.web3.middleware_onion) + tuple(self.web3.provider.middlewares)
+
+        #
+        # Run the request side of the middlewares and capture what they would have sent
+        #
+        def capture_request(method, params):
+            raise _CapturedRequest(method, params)
+
+        capture_fn = combine_middlewares(middlewares, self.web3, capture_request)
+
+        to_send = []
+        for item in items:
+            try:
+                # a middleware may answer without reaching the provider, e.g. a cache
+                response = capture_fn(item.method, item.params)
+            except _CapturedRequest as captured:
+                to_send.append((item, captured.method, captured.params))
+            except Exception as e:
+                item.error = e
+            else:
+                self._set_response(item, response)
+
+        if not to_send:
+            return [self._item_output(item) for item in self._items]
+
+        start = time.perf_counter()
+        responses = make_batch_request(
+            self.web3.provider,
+            [(method, params) for _, method, params in to_send],
+        )
+        elapsed = time.perf_counter() - start
+
+        #
+        # Replay each response through the middlewares so the results are formatted
+        #
+        current_response = {}
+
+        def replay_response(method, params):
+            return current_response['response']
+
+        replay_fn = combine_middlewares(middlewares, self.web3, replay_response)
+
+        for (item, _, _), raw_response in zip(to_send, responses):
+            current_response['response'] = raw_response
+            try:
+                response = replay_fn(item.method, item.params)
+            except Exception as e:
+                item.error = e
+            else:
+                self._set_response(item, response)
+
+        instrumentation = getattr(self.web3.manager, 'instrumentation', None)
+        if instrumentation is not None:
+            for item, _, _ in to_send:
+                instrumentation.record_call(item.method, elapsed, item.error is not None)
+
+        return [self._item_output(item) for item in self._items]
+
+    @staticmethod
+    def _set_response(item, response):
+        if "error" in response:
+            item.error = ValueError(response["error"])
+        else:
+            item._result = response['result']
+
+    @staticmethod
+    def _item_output(item):
+        if item.error is not None:
+            return item.error
+        return item.result
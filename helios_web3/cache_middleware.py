@@ -0,0 +1,118 @@
+import threading
+
+import lru
+
+from eth_utils import (
+    is_bytes,
+    is_hex,
+    is_string,
+    to_hex,
+)
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Methods whose result can never change once it exists, as long as the request
+# doesn't depend on the state of the chain head.
+IMMUTABLE_RESULT_RPC_METHODS = frozenset({
+    'hls_getBlockByHash',
+    'hls_getBlockTransactionCountByHash',
+    'hls_getTransactionByBlockHashAndIndex',
+    'hls_getTransactionByHash',
+    'hls_getTransactionReceipt',
+    'hls_getReceiveTransactionOfSendTransaction',
+    'hls_getCode',
+})
+
+
+def is_block_hash(value):
+    if is_bytes(value):
+        return len(value) == 32
+    elif is_string(value):
+        return len(value) == 66 and is_hex(value)
+    return False
+
+
+def is_immutable_result(method, params, result):
+    if result is None:
+        return False
+
+    if method == 'hls_getCode':
+        # only code looked up at a specific block hash is fixed, 'latest' and
+        # block numbers can change under us
+        return len(params) > 1 and is_block_hash(params[1])
+
+    if method in ('hls_getTransactionByHash', 'hls_getTransactionReceipt'):
+        # not yet in a block
+        if hasattr(result, 'get') and result.get('blockHash', True) is None:
+            return False
+
+    return True
+
+
+def _freeze_param(value):
+    if is_bytes(value):
+        return to_hex(value)
+    elif is_string(value):
+        return value.lower() if is_hex(value) else value
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze_param(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((key, _freeze_param(item)) for key, item in value.items()))
+    return value
+
+
+class ImmutableResultCache:
+    '''
+    Opt-in middleware that keeps the responses of immutable lookups in a size bounded
+    LRU cache. Null results, errors and anything relative to the chain head are never
+    cached.
+
+        cache = ImmutableResultCache(cache_size=4096)
+        w3.middleware_onion.add(cache, 'immutable_result_cache')
+        ...
+        cache.stats()
+
+    Added as the outermost layer, cached results are returned already formatted.
+    '''
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, rpc_methods=IMMUTABLE_RESULT_RPC_METHODS):
+        self.cache_size = cache_size
+        self.rpc_methods = frozenset(rpc_methods)
+        self.hits = 0
+        self.misses = 0
+        self._cache = lru.LRU(cache_size)
+        self._lock = threading.Lock()
+
+    def __call__(self, make_request, web3):
+        def middleware(method, params):
+            if method not in self.rpc_methods:
+                return make_request(method, params)
+
+            cache_key = (method, _freeze_param(params))
+            with self._lock:
+                response = self._cache.get(cache_key)
+                if response is not None:
+                    self.hits += 1
+                    return response
+                self.misses += 1
+
+            response = make_request(method, params)
+            if 'result' in response and is_immutable_result(method, params, response['result']):
+                with self._lock:
+                    self._cache[cache_key] = response
+            return response
+        return middleware
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'capacity': self.cache_size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,209 @@
+from collections.abc import (
+    Mapping,
+)
+
+from web3.datastructures import (
+    AttributeDict,
+)
+
+
+def to_attrdict(value):
+    '''
+    Like AttributeDict.recursive, but leaves AttributeDicts alone so lazy results
+    nested inside a value aren't formatted as a side effect.
+    '''
+    if isinstance(value, AttributeDict):
+        return value
+    elif isinstance(value, Mapping):
+        return AttributeDict({key: to_attrdict(item) for key, item in value.items()})
+    elif isinstance(value, list):
+        return [to_attrdict(item) for item in value]
+    elif isinstance(value, tuple):
+        return tuple(to_attrdict(item) for item in value)
+    return value
+
+
+class LazyAttributeDict(AttributeDict):
+    '''
+    An AttributeDict over a raw JSON-RPC result which only formats a field the first
+    time it is read, by attribute or by key. Fields without a formatter are returned
+    as they are, with any dicts in them turned into AttributeDicts.
+
+    Iterating over keys, ``len`` and ``in`` don't format anything. Anything that reads
+    every value (``dict(result)``, ``==``, ``hash``, ``repr``) formats every field.
+    '''
+    __slots__ = ('_raw', '_formatters')
+
+    def __init__(self, raw, formatters):
+        object.__setattr__(self, '__dict__', {})
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_formatters', formatters)
+
+    def _format_field(self, key):
+        value = self._raw[key]
+        formatter = self._formatters.get(key)
+        if formatter is not None:
+            try:
+                value = formatter(value)
+            except (TypeError, ValueError) as exc:
+                raise type(exc)("Could not format value %r as field %r" % (value, key)) from exc
+        # another thread may have got here first, keep whichever value was stored
+        return self.__dict__.setdefault(key, to_attrdict(value))
+
+    def _format_all(self):
+        for key in self._raw:
+            if key not in self.__dict__:
+                self._format_field(key)
+
+    def _formatted_dict(self):
+        return {key: self[key] for key in self._raw}
+
+    def __getattr__(self, attr):
+        # only called when attr isn't in __dict__ yet
+        if attr.startswith('__') or attr not in self._raw:
+            raise AttributeError(
+                "%r object has no attribute %r" % (self.__class__.__name__, attr)
+            )
+        return self._format_field(attr)
+
+    def __getitem__(self, key):
+        try:
+            return self.__dict__[key]
+        except KeyError:
+            if key not in self._raw:
+                raise
+        return self._format_field(key)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __contains__(self, key):
+        return key in self._raw
+
+    def __eq__(self, other):
+        self._format_all()
+        return super().__eq__(other)
+
+    __hash__ = AttributeDict.__hash__
+
+    def __repr__(self):
+        return self.__class__.__name__ + "(%r)" % self._formatted_dict()
+
+    def _repr_pretty_(self, builder, cycle):
+        builder.text(self.__class__.__name__ + "(")
+        if cycle:
+            builder.text("<cycle>")
+        else:
+            builder.pretty(self._formatted_dict())
+        builder.text(")")
+
+    def __reduce__(self):
+        return (AttributeDict, (self._formatted_dict(),))
+
+
+class Record:
+    '''
+    Base for compact, read-only result records. Subclasses list their fields in
+    ``__slots__``, so a record takes far less memory than a dict in an AttributeDict.
+    Any other fields in a result are kept in an ``_extra`` dict.
+
+    Records support attribute and key access, ``keys``, ``values``, ``items`` and
+    ``get``, and ``dict(record)`` gives a plain dict. They are deliberately not
+    Mappings, so attrdict_middleware leaves them as they are.
+    '''
+    __slots__ = ('_extra',)
+    _field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.__slots__)
+
+    def __init__(self, dictionary):
+        extra = None
+        field_set = self._field_set
+        for key, value in dictionary.items():
+            if key in field_set:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, '_extra', extra)
+
+    def __getattr__(self, attr):
+        # only called for unset slots and names that aren't slots
+        extra = object.__getattribute__(self, '_extra')
+        if extra is not None and attr in extra:
+            return extra[attr]
+        raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, attr))
+
+    def __setattr__(self, attr, val):
+        raise TypeError('This data is immutable -- create a copy instead of modifying')
+
+    def __delattr__(self, key):
+        raise TypeError('This data is immutable -- create a copy instead of modifying')
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    # not iterable, so it isn't mistaken for a collection by AttributeDict.recursive
+    __iter__ = None
+
+    def keys(self):
+        keys = []
+        for key in self.__slots__:
+            try:
+                object.__getattribute__(self, key)
+            except AttributeError:
+                # a field that wasn't in the result
+                continue
+            keys.append(key)
+        if self._extra is not None:
+            keys.extend(self._extra)
+        return keys
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Mapping, Record)):
+            return dict(self.items()) == dict(other.items())
+        return False
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.items())))
+
+    def __repr__(self):
+        return self.__class__.__name__ + "(%r)" % dict(self.items())
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+
+from eth_utils import (
+    to_wei,
+)
+
+DEFAULT_GAS_PRICE_TTL = 60
+# gwei added to the minimum gas price, like prepare_and_sign_block does
+DEFAULT_GAS_PRICE_PREMIUM = 1
+
+
+def rpc_gas_price_strategy(web3, transaction_params=None):
+    '''
+    The minimum gas price from hls_gasPrice plus one gwei, in wei. What
+    prepare_and_sign_block uses when no strategy is set.
+    '''
+    return to_wei(web3.hls.gasPrice + DEFAULT_GAS_PRICE_PREMIUM, 'gwei')
+
+
+class CachedGasPriceStrategy:
+    '''
+    A gas price strategy that keeps the network's minimum gas price for ``ttl``
+    seconds instead of asking the node before every block:
+
+        w3.hls.setGasPriceStrategy(CachedGasPriceStrategy(ttl=60))
+
+    Unlike other gas price strategies, once set it is also used by
+    prepare_and_sign_block instead of asking for hls_gasPrice before every block.
+    Any strategy with a true ``applies_to_blocks`` attribute is.
+
+    The price is the most recent entry of hls_getHistoricalGasPrice, or hls_gasPrice
+    if the node has no history, plus ``premium`` gwei, returned in wei. Once the price
+    is older than ``ttl``, the next call starts a refresh in a background thread and
+    keeps returning the cached price until the refresh is done. A price older than
+    ``max_age`` (three times ``ttl`` by default) is never used: the call waits for a
+    new one. With ``background=False`` every refresh is made by the calling thread.
+    '''
+    logger = logging.getLogger("helios_web3.gas_strategies.CachedGasPriceStrategy")
+    applies_to_blocks = True
+
+    def __init__(self,
+                 ttl=DEFAULT_GAS_PRICE_TTL,
+                 max_age=None,
+                 premium=DEFAULT_GAS_PRICE_PREMIUM,
+                 background=True):
+        self.ttl = ttl
+        self.max_age = max_age if max_age is not None else ttl * 3
+        self.premium = premium
+        self.background = background
+        # minimum gas price in gwei, and when it was fetched
+        self.min_gas_price = None
+        self.fetched_at = None
+        self.hits = 0
+        self.refreshes = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __call__(self, web3, transaction_params=None):
+        min_gas_price = self._cached_min_gas_price(web3)
+        return to_wei(min_gas_price + self.premium, 'gwei')
+
+    def _cached_min_gas_price(self, web3):
+        with self._lock:
+            age = None if self.fetched_at is None else time.monotonic() - self.fetched_at
+            if age is not None and age <= self.ttl:
+                self.hits += 1
+                return self.min_gas_price
+
+            use_stale = self.background and age is not None and age <= self.max_age
+            if use_stale:
+                self.hits += 1
+                min_gas_price = self.min_gas_price
+                start_refresh = not self._refreshing
+                self._refreshing = True
+
+        if not use_stale:
+            return self.refresh(web3)
+        if start_refresh:
+            threading.Thread(target=self._background_refresh, args=(web3,), daemon=True).start()
+        return min_gas_price
+
+    def _background_refresh(self, web3):
+        try:
+            self.refresh(web3)
+        except Exception:
+            # keep the cached price, the next call after ttl tries again
+            self.logger.warning("Could not refresh the minimum gas price", exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self, web3):
+        '''
+        Fetches the minimum gas price now, returning it in gwei.
+        '''
+        # one request at a time; callers that waited reuse what the first one got
+        with self._refresh_lock:
+            with self._lock:
+                if self.fetched_at is not None and time.monotonic() - self.fetched_at <= self.ttl:
+                    return self.min_gas_price
+
+            min_gas_price = self.fetch_min_gas_price(web3)
+
+            with self._lock:
+                self.min_gas_price = min_gas_price
+                self.fetched_at = time.monotonic()
+                self.refreshes += 1
+            return min_gas_price
+
+    @staticmethod
+    def fetch_min_gas_price(web3):
+        historical_gas_price = web3.hls.getHistoricalGasPrice()
+        if historical_gas_price:
+            # [timestamp, minimum gas price] pairs
+            return max(historical_gas_price, key=lambda entry: entry[0])[1]
+        return web3.hls.gasPrice
+
+    def invalidate(self):
+        '''
+        Drops the cached price, e.g. after a block is rejected for its gas price.
+        '''
+        with self._lock:
+            self.min_gas_price = None
+            self.fetched_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'min_gas_price': self.min_gas_price,
+                'hits': self.hits,
+                'refreshes': self.refreshes,
+            }
@@ -1,6 +1,14 @@
 from helios_web3.account import (
     Account,
 )
+from helios_web3.batch import (
+    BatchRequest,
+)
+import asyncio
+import inspect
+import math
+import time
+
 from eth_utils import (
     apply_to_return_value,
     is_checksum_address,
@@ -10,6 +18,9 @@ from eth_utils import (
 from web3.contract import (
     Contract,
 )
+from web3.exceptions import (
+    TimeExhausted,
+)
 from web3.iban import (
     Iban,
 )
@@ -35,6 +46,27 @@ from eth_utils.toolz import (
     assoc,
     merge,
 )
+from helios_web3.pythonic_middleware import (
+    to_integer_if_hex,
+)
+from helios_web3.utils.gas import (
+    DEFAULT_NODE_GAS_BUFFER,
+)
+from helios_web3.utils.blocks import (
+    MAX_NEWEST_BLOCKS_PAGE_SIZE,
+    async_follow_newest_blocks,
+    async_iter_newest_blocks,
+    follow_newest_blocks,
+    iter_newest_blocks,
+)
+from helios_web3.utils.transactions import (
+    TransactionReceiptResult,
+    is_mined_receipt,
+    next_poll_latency,
+    receipt_or_raise,
+    receipts_time_exhausted,
+    wait_for_transaction_receipts,
+)
 from web3._utils.transactions import (
     assert_valid_transaction_params,
     extract_valid_transaction_params,
@@ -51,6 +83,8 @@ class Hls(Module):
     defaultContractFactory = Contract
     iban = Iban
     gasPriceStrategy = None
+    gasEstimator = None
+    nonceManager = None
 
     def call(self, transaction, block_identifier=None):
         if block_identifier is None:
@@ -61,6 +95,13 @@ class Hls(Module):
             [transaction, block_identifier],
         )
     
+    def batch(self):
+        '''
+        Returns a BatchRequest that sends queued hls and personal calls as a single
+        JSON-RPC batch. See helios_web3.batch.BatchRequest.
+        '''
+        return BatchRequest(self.web3)
+
     def namereg(self):
         raise NotImplementedError()
 
@@ -233,6 +274,13 @@ class Hls(Module):
     def waitForTransactionReceipt(self, transaction_hash, timeout=120):
         return wait_for_transaction_receipt(self.web3, transaction_hash, timeout)
 
+    def waitForTransactionReceipts(self, transaction_hashes, timeout=120, poll_latency=0.1, max_poll_latency=2.0):
+        '''
+        Yields TransactionReceiptResult(transaction_hash, receipt, latency) as the
+        receipts arrive. See helios_web3.utils.transactions.wait_for_transaction_receipts.
+        '''
+        return wait_for_transaction_receipts(self.web3, transaction_hashes, timeout, poll_latency, max_poll_latency)
+
     def getTransactionReceipt(self, transaction_hash):
         return self.web3.manager.request_blocking(
             "hls_getTransactionReceipt",
@@ -287,16 +335,33 @@ class Hls(Module):
 
         # TODO: move gas estimation in middleware
         if 'gas' not in transaction:
-            transaction = assoc(
-                transaction,
-                'gas',
-                get_buffered_gas_estimate(self.web3, transaction),
+            gas = None
+            if self.gasEstimator is not None:
+                gas = self.gasEstimator.local_estimate(transaction)
+            if gas is None:
+                gas = get_buffered_gas_estimate(self.web3, transaction)
+            transaction = assoc(transaction, 'gas', gas)
+
+        nonce_manager = self.nonceManager
+        if nonce_manager is None or 'nonce' in transaction or 'from' not in transaction:
+            return self.web3.manager.request_blocking(
+                "hls_sendTransaction",
+                [transaction],
             )
 
-        return self.web3.manager.request_blocking(
-            "hls_sendTransaction",
-            [transaction],
-        )
+        nonce = nonce_manager.allocate(transaction['from'])
+        transaction = assoc(transaction, 'nonce', nonce)
+        try:
+            return self.web3.manager.request_blocking(
+                "hls_sendTransaction",
+                [transaction],
+            )
+        except Exception:
+            # we can't tell whether the node used the nonce, so ask it again next time
+            nonce_manager.invalidate(transaction['from'])
+            raise
+        finally:
+            nonce_manager.complete(transaction['from'], nonce)
 
     def sendRawBlock(self, raw_block):
         return self.web3.manager.request_blocking(
@@ -410,6 +475,21 @@ class Hls(Module):
     def setGasPriceStrategy(self, gas_price_strategy):
         self.gasPriceStrategy = gas_price_strategy
 
+    def setGasEstimator(self, gas_estimator):
+        '''
+        Sets what works out the gas of transactions sent without one, e.g. an
+        IntrinsicGasEstimator from helios_web3.utils.gas. None goes back to asking
+        the node.
+        '''
+        self.gasEstimator = gas_estimator
+
+    def setNonceManager(self, nonce_manager):
+        '''
+        Sets what hands out the nonces of transactions sent without one, e.g. a
+        NonceManager from helios_web3.utils.nonce. None leaves them to the node.
+        '''
+        self.nonceManager = nonce_manager
+
     def devAddValidNewBlock(self, version=1):
         return self.web3.manager.request_blocking("hls_devAddValidNewBlock", [version])
 
@@ -498,3 +578,174 @@ class Hls(Module):
             ],
         )
 
+    def iterNewestBlocks(self, page_size = MAX_NEWEST_BLOCKS_PAGE_SIZE, after_hash = '0x', chain_address = '0x', include_transactions: bool = False):
+        '''
+        Generator over all blocks from the newest backwards, fetched page by page.
+        See helios_web3.utils.blocks.iter_newest_blocks.
+        '''
+        return iter_newest_blocks(self.web3, page_size, after_hash, chain_address, include_transactions)
+
+    def followNewestBlocks(self, after_hash = None, poll_interval = 2.0, chain_address = '0x', include_transactions: bool = False):
+        '''
+        Generator that yields new blocks as they arrive.
+        See helios_web3.utils.blocks.follow_newest_blocks.
+        '''
+        return follow_newest_blocks(self.web3, after_hash, poll_interval, chain_address, include_transactions)
+
+
+class AsyncHls(Hls):
+    '''
+    Hls for AsyncHeliosWeb3. Every request method returns a coroutine. Methods that
+    need several dependent requests are reimplemented here, and iterNewestBlocks,
+    followNewestBlocks and waitForTransactionReceipts are async generators.
+
+    batch, filter and contract need a blocking web3 and raise NotImplementedError,
+    as do namereg and icapNamereg like on Hls.
+    '''
+
+    async def sendTransaction(self, transaction):
+        if 'from' not in transaction and is_checksum_address(self.defaultAccount):
+            transaction = assoc(transaction, 'from', self.defaultAccount)
+
+        if 'gas' not in transaction:
+            gas = None
+            if self.gasEstimator is not None:
+                # checking for code would block, so unchecked addresses get a node estimate
+                gas = self.gasEstimator.local_estimate(transaction, check_code=False)
+            if gas is None:
+                # hls_estimateGas results aren't formatted, so they may still be hex
+                gas = to_integer_if_hex(await self.estimateGas(transaction)) + DEFAULT_NODE_GAS_BUFFER
+            transaction = assoc(transaction, 'gas', gas)
+
+        nonce_manager = self.nonceManager
+        if nonce_manager is None or 'nonce' in transaction or 'from' not in transaction:
+            return await self.web3.manager.coro_request(
+                "hls_sendTransaction",
+                [transaction],
+            )
+
+        nonce = await nonce_manager.allocate_async(transaction['from'])
+        transaction = assoc(transaction, 'nonce', nonce)
+        try:
+            return await self.web3.manager.coro_request(
+                "hls_sendTransaction",
+                [transaction],
+            )
+        except Exception:
+            nonce_manager.invalidate(transaction['from'])
+            raise
+        finally:
+            nonce_manager.complete(transaction['from'], nonce)
+
+    async def waitForTransactionReceipt(self, transaction_hash, timeout=120, poll_latency=0.1):
+        deadline = time.monotonic() + timeout
+        while True:
+            txn_receipt = await self.getTransactionReceipt(transaction_hash)
+            if txn_receipt is not None and txn_receipt['blockHash'] is not None:
+                return txn_receipt
+            if time.monotonic() > deadline:
+                raise TimeExhausted(
+                    "Transaction {0} is not in the chain after {1} seconds".format(
+                        transaction_hash,
+                        timeout,
+                    )
+                )
+            await asyncio.sleep(poll_latency)
+
+    async def waitForTransactionReceipts(self, transaction_hashes, timeout=120, poll_latency=0.1, max_poll_latency=2.0):
+        started_at = time.monotonic()
+        initial_poll_latency = poll_latency
+        outstanding = list(dict.fromkeys(transaction_hashes))
+
+        while outstanding:
+            receipts = await asyncio.gather(
+                *(self.getTransactionReceipt(transaction_hash) for transaction_hash in outstanding),
+                return_exceptions=True,
+            )
+
+            still_outstanding = []
+            for transaction_hash, receipt in zip(outstanding, receipts):
+                receipt = receipt_or_raise(receipt)
+                if is_mined_receipt(receipt):
+                    yield TransactionReceiptResult(transaction_hash, receipt, time.monotonic() - started_at)
+                else:
+                    still_outstanding.append(transaction_hash)
+
+            found_any = len(still_outstanding) < len(outstanding)
+            outstanding = still_outstanding
+            if not outstanding:
+                return
+
+            remaining = timeout - (time.monotonic() - started_at)
+            if remaining <= 0:
+                raise receipts_time_exhausted(outstanding, timeout)
+
+            poll_latency = next_poll_latency(poll_latency, initial_poll_latency, max_poll_latency, found_any)
+            await asyncio.sleep(min(poll_latency, remaining))
+
+    async def replaceTransaction(self, transaction_hash, new_transaction):
+        current_transaction = await self._getRequiredTransaction(transaction_hash)
+        return await self._replaceTransaction(current_transaction, new_transaction)
+
+    async def modifyTransaction(self, transaction_hash, **transaction_params):
+        assert_valid_transaction_params(transaction_params)
+        current_transaction = await self._getRequiredTransaction(transaction_hash)
+        current_transaction_params = extract_valid_transaction_params(current_transaction)
+        new_transaction = merge(current_transaction_params, transaction_params)
+        return await self._replaceTransaction(current_transaction, new_transaction)
+
+    async def _getRequiredTransaction(self, transaction_hash):
+        current_transaction = await self.getTransaction(transaction_hash)
+        if not current_transaction:
+            raise ValueError('Supplied transaction with hash {} does not exist'
+                             .format(transaction_hash))
+        return current_transaction
+
+    async def _replaceTransaction(self, current_transaction, new_transaction):
+        # web3's prepare_replacement_transaction, with the gas price strategy awaited
+        if current_transaction['blockHash'] is not None:
+            raise ValueError('Supplied transaction with hash {} has already been mined'
+                             .format(current_transaction['hash']))
+        if 'nonce' in new_transaction and new_transaction['nonce'] != current_transaction['nonce']:
+            raise ValueError('Supplied nonce in new_transaction must match the pending transaction')
+
+        if 'nonce' not in new_transaction:
+            new_transaction = assoc(new_transaction, 'nonce', current_transaction['nonce'])
+
+        if 'gasPrice' in new_transaction:
+            if new_transaction['gasPrice'] <= current_transaction['gasPrice']:
+                raise ValueError('Supplied gas price must exceed existing transaction gas price')
+        else:
+            generated_gas_price = self.generateGasPrice(new_transaction)
+            if inspect.isawaitable(generated_gas_price):
+                generated_gas_price = await generated_gas_price
+            minimum_gas_price = int(math.ceil(current_transaction['gasPrice'] * 1.1))
+            if generated_gas_price and generated_gas_price > minimum_gas_price:
+                new_transaction = assoc(new_transaction, 'gasPrice', generated_gas_price)
+            else:
+                new_transaction = assoc(new_transaction, 'gasPrice', minimum_gas_price)
+
+        return await self.sendTransaction(new_transaction)
+
+    def iterNewestBlocks(self, page_size = MAX_NEWEST_BLOCKS_PAGE_SIZE, after_hash = '0x', chain_address = '0x', include_transactions: bool = False):
+        '''
+        Async generator over all blocks from the newest backwards, fetched page by page.
+        See helios_web3.utils.blocks.async_iter_newest_blocks.
+        '''
+        return async_iter_newest_blocks(self.web3, page_size, after_hash, chain_address, include_transactions)
+
+    def followNewestBlocks(self, after_hash = None, poll_interval = 2.0, chain_address = '0x', include_transactions: bool = False):
+        '''
+        Async generator that yields new blocks as they arrive.
+        See helios_web3.utils.blocks.async_follow_newest_blocks.
+        '''
+        return async_follow_newest_blocks(self.web3, after_hash, poll_interval, chain_address, include_transactions)
+
+    def batch(self):
+        raise NotImplementedError("Batch requests are not supported by the async client")
+
+    def filter(self, filter_params=None, filter_id=None):
+        raise NotImplementedError("Filters are not supported by the async client")
+
+    def contract(self, address=None, **kwargs):
+        raise NotImplementedError("Contracts are not supported by the async client")
@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket
+# takes everything slower.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float('inf'),
+)
+
+# the name the time spent in the provider itself is recorded under
+PROVIDER_LAYER = 'provider'
+
+
+def layer_name(name, middleware):
+    if isinstance(name, str):
+        return name
+    return getattr(middleware, '__name__', type(middleware).__name__)
+
+
+class MethodStats:
+    '''
+    What has been recorded for one RPC method.
+    '''
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # exclusive time spent in each middleware layer, and in the provider
+        self.layer_time = {}
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.calls if self.calls else 0.0,
+            'latency_histogram': list(zip(LATENCY_BUCKETS, self.histogram)),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'layer_time': dict(self.layer_time),
+        }
+
+
+class Instrumentation:
+    '''
+    Records, per RPC method, the number of calls and errors, a latency histogram,
+    the request and response sizes and the time spent in each middleware layer and
+    in the provider. Enabled with HeliosWeb3.enable_instrumentation:
+
+        instrumentation = w3.enable_instrumentation()
+        ...
+        instrumentation.snapshot()['hls_getBlockByHash']['layer_time']
+
+    Layer times are exclusive: the time in the pythonic layer doesn't include the
+    time in the layers inside it or in the provider. Sizes are only known for
+    providers that encode requests with ``encode_rpc_request`` and decode responses
+    with ``decode_rpc_response``, like HTTPProvider, and don't include batches.
+    Batched requests are counted with the latency of the whole batch, without layer
+    times.
+
+    When instrumentation isn't enabled none of this code runs.
+    '''
+    def __init__(self):
+        self._methods = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._instrumented_providers = []
+
+    def _method_stats(self, method):
+        stats = self._methods.get(method)
+        if stats is None:
+            with self._lock:
+                stats = self._methods.setdefault(method, MethodStats())
+        return stats
+
+    def _timed(self, name, make_request):
+        local = self._local
+
+        def timed_request(method, params):
+            # time spent in the layers inside this one, so the time recorded for
+            # this layer can leave it out
+            frames = local.__dict__.setdefault('frames', [])
+            frames.append(0.0)
+            start = time.perf_counter()
+            try:
+                return make_request(method, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                inner_time = frames.pop()
+                if frames:
+                    frames[-1] += elapsed
+                stats = self._method_stats(method)
+                with self._lock:
+                    stats.layer_time[name] = stats.layer_time.get(name, 0.0) + elapsed - inner_time
+        return timed_request
+
+    #
+    # Wrappers used by HeliosRequestManager when it builds the chain for a method
+    #
+    def wrap_middleware(self, name, middleware):
+        name = layer_name(name, middleware)
+
+        def timed_middleware(make_request, web3):
+            return self._timed(name, middleware(make_request, web3))
+        return timed_middleware
+
+    def wrap_provider_request(self, provider):
+        self.instrument_provider(provider)
+        return self._timed(PROVIDER_LAYER, provider.make_request)
+
+    def wrap_request_func(self, request_func):
+        local = self._local
+
+        def instrumented_request(method, params):
+            stats = self._method_stats(method)
+            outer_method = getattr(local, 'method', None)
+            local.method = method
+            start = time.perf_counter()
+            failed = True
+            try:
+                response = request_func(method, params)
+                failed = 'error' in response
+                return response
+            finally:
+                local.method = outer_method
+                self.record_call(method, time.perf_counter() - start, failed, stats)
+        return instrumented_request
+
+    def record_call(self, method, elapsed, failed, stats=None):
+        '''
+        Counts a call to method that took elapsed seconds. Used by batches, whose
+        requests don't go through the chain built by HeliosRequestManager.
+        '''
+        if stats is None:
+            stats = self._method_stats(method)
+        with self._lock:
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_time += elapsed
+            stats.histogram[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    #
+    # Payload sizes
+    #
+    def _add_bytes(self, field, size):
+        method = getattr(self._local, 'method', None)
+        if method is None:
+            return
+        stats = self._method_stats(method)
+        with self._lock:
+            setattr(stats, field, getattr(stats, field) + size)
+
+    def instrument_provider(self, provider):
+        '''
+        Measures the requests and responses of a JSON provider by wrapping its
+        encode_rpc_request and decode_rpc_response on the instance.
+        '''
+        if 'encode_rpc_request' in vars(provider) or not hasattr(provider, 'encode_rpc_request'):
+            return
+        encode_rpc_request = provider.encode_rpc_request
+        decode_rpc_response = provider.decode_rpc_response
+
+        def instrumented_encode_rpc_request(method, params):
+            request_data = encode_rpc_request(method, params)
+            self._add_bytes('request_bytes', len(request_data))
+            return request_data
+
+        def instrumented_decode_rpc_response(response):
+            self._add_bytes('response_bytes', len(response))
+            return decode_rpc_response(response)
+
+        provider.encode_rpc_request = instrumented_encode_rpc_request
+        provider.decode_rpc_response = instrumented_decode_rpc_response
+        self._instrumented_providers.append(provider)
+
+    def uninstrument_providers(self):
+        for provider in self._instrumented_providers:
+            vars(provider).pop('encode_rpc_request', None)
+            vars(provider).pop('decode_rpc_response', None)
+        self._instrumented_providers = []
+
+    #
+    # Results
+    #
+    def snapshot(self):
+        '''
+        A copy of everything recorded so far, as plain dicts keyed by RPC method.
+        '''
+        with self._lock:
+            return {method: stats.as_dict() for method, stats in self._methods.items()}
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
@@ -1,20 +1,42 @@
 from web3 import Web3
 from web3.eth import Eth
 from web3.net import Net
-from helios_web3.hls import Hls
-from helios_web3.admin import Admin
-from helios_web3.personal import Personal
+from helios_web3.hls import (
+    AsyncHls,
+    Hls,
+)
+from helios_web3.admin import (
+    Admin,
+    AsyncAdmin,
+)
+from helios_web3.personal import (
+    AsyncPersonal,
+    Personal,
+)
 from web3._utils.empty import empty
 from helios_web3.pythonic_middleware import pythonic_middleware
-from web3.middleware import (
+from helios_web3.middleware import (
     name_to_address_middleware,
     attrdict_middleware,
 )
 from helios_web3.abi import abi_middleware
+from helios_web3.async_middleware import (
+    async_abi_middleware,
+    async_attrdict_middleware,
+    async_pythonic_middleware,
+)
+from helios_web3.instrumentation import Instrumentation
+from helios_web3.manager import (
+    AsyncRequestManager,
+    HeliosRequestManager,
+)
+from helios_web3.providers import AsyncHTTPProvider
 
 
 
 class HeliosWeb3(Web3):
+    RequestManager = HeliosRequestManager
+
     def __init__(self, provider=empty, middlewares=None, modules=None, ens=empty):
         if modules is None:
             modules = {'hls': (Hls,),
@@ -38,3 +60,54 @@ class HeliosWeb3(Web3):
             ]
 
         super().__init__(provider=provider, middlewares=middlewares, modules=modules, ens=ens)
+
+    def enable_instrumentation(self):
+        '''
+        Starts recording per-method call counts, latencies, payload sizes and the
+        time spent in each middleware. Returns the Instrumentation to take snapshots
+        from. Calling it again starts over with a new one.
+        '''
+        instrumentation = Instrumentation()
+        self.manager.set_instrumentation(instrumentation)
+        return instrumentation
+
+    def disable_instrumentation(self):
+        self.manager.set_instrumentation(None)
+
+
+class AsyncHeliosWeb3(Web3):
+    '''
+    asyncio version of HeliosWeb3. Requests are made with AsyncHTTPProvider or
+    AsyncWebsocketProvider and every hls, personal and admin request method returns
+    a coroutine:
+
+        w3 = AsyncHeliosWeb3(AsyncHTTPProvider('http://127.0.0.1:30304'))
+        balance = await w3.hls.getBalance(address)
+
+    Requests and results are formatted with the same tables as HeliosWeb3.
+    ENS name resolution is not available.
+    '''
+    RequestManager = AsyncRequestManager
+
+    def __init__(self, provider=empty, middlewares=None, modules=None, ens=empty):
+        if provider is empty or provider is None:
+            provider = AsyncHTTPProvider()
+
+        if modules is None:
+            modules = {}
+        modules['hls'] = (AsyncHls,)
+        modules['eth'] = (AsyncHls,)
+        modules['personal'] = (AsyncPersonal,)
+        modules['admin'] = (AsyncAdmin,)
+
+        if middlewares is None:
+            middlewares = [
+                (async_attrdict_middleware, 'attrdict'),
+                (async_pythonic_middleware, 'pythonic'),
+                (async_abi_middleware, 'abi'),
+            ]
+
+        super().__init__(provider=provider, middlewares=middlewares, modules=modules, ens=ens)
+
+    async def isConnected(self):
+        return await self.provider.isConnected()
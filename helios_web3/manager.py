@@ -0,0 +1,165 @@
+import logging
+
+from web3.datastructures import (
+    NamedElementOnion,
+)
+from web3.manager import (
+    RequestManager,
+)
+from web3.middleware import (
+    combine_middlewares,
+)
+
+from helios_web3.async_middleware import (
+    async_abi_middleware,
+    async_attrdict_middleware,
+    async_pythonic_middleware,
+)
+
+
+def middleware_handles_method(middleware, method):
+    '''
+    Whether a middleware can do anything for requests to method. A middleware with
+    an ``rpc_methods`` attribute handles just those methods, one with a
+    ``skip_rpc_methods`` attribute all but those. Any other middleware handles every
+    method.
+    '''
+    rpc_methods = getattr(middleware, 'rpc_methods', None)
+    if rpc_methods is not None:
+        return method in rpc_methods
+    skip_rpc_methods = getattr(middleware, 'skip_rpc_methods', None)
+    if skip_rpc_methods is not None:
+        return method not in skip_rpc_methods
+    return True
+
+
+class VersionedNamedElementOnion(NamedElementOnion):
+    '''
+    A NamedElementOnion that counts its changes, so a cache built from it can tell
+    when it is out of date without walking the layers.
+    '''
+    version = 0
+
+    def add(self, element, name=None):
+        super().add(element, name)
+        self.version += 1
+
+    def inject(self, element, name=None, layer=None):
+        super().inject(element, name, layer)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def replace(self, old, new):
+        to_be_replaced = super().replace(old, new)
+        self.version += 1
+        return to_be_replaced
+
+    def remove(self, old):
+        super().remove(old)
+        self.version += 1
+
+    def named_layers(self):
+        '''
+        (name, middleware) pairs, outermost first.
+        '''
+        return list(reversed(self._queue.items()))
+
+
+class HeliosRequestManager(RequestManager):
+    '''
+    RequestManager that sends each RPC method through only the middleware layers
+    that do something for it. The chain for a method is built the first time the
+    method is used, and rebuilt after the middlewares or the provider change.
+    '''
+    logger = logging.getLogger("helios_web3.HeliosRequestManager")
+    instrumentation = None
+
+    def __init__(self, web3, provider=None, middlewares=None):
+        super().__init__(web3, provider, middlewares=[])
+        if middlewares is None:
+            middlewares = self.default_middlewares(web3)
+        self.middleware_onion = VersionedNamedElementOnion(middlewares)
+        self._request_funcs = {}
+        self._request_funcs_key = None
+
+    def set_instrumentation(self, instrumentation):
+        '''
+        Starts recording requests with an Instrumentation, or stops with None.
+        '''
+        if self.instrumentation is not None:
+            self.instrumentation.uninstrument_providers()
+        self.instrumentation = instrumentation
+
+    def _request_func(self, method):
+        onion = self.middleware_onion
+        provider = self.provider
+        provider_middlewares = tuple(provider.middlewares)
+        instrumentation = self.instrumentation
+        key = self._request_funcs_key
+        if (key is None or
+                key[0] is not onion or
+                key[1] != onion.version or
+                key[2] is not provider or
+                key[3] != provider_middlewares or
+                key[4] is not instrumentation):
+            self._request_funcs = {}
+            self._request_funcs_key = (onion, onion.version, provider, provider_middlewares, instrumentation)
+
+        request_funcs = self._request_funcs
+        if method not in request_funcs:
+            layers = [
+                (name, middleware)
+                for name, middleware in onion.named_layers()
+                if middleware_handles_method(middleware, method)
+            ]
+            layers.extend(
+                (None, middleware)
+                for middleware in provider_middlewares
+                if middleware_handles_method(middleware, method)
+            )
+
+            if instrumentation is None:
+                request_funcs[method] = combine_middlewares(
+                    middlewares=[middleware for _, middleware in layers],
+                    web3=self.web3,
+                    provider_request_fn=provider.make_request,
+                )
+            else:
+                request_funcs[method] = instrumentation.wrap_request_func(combine_middlewares(
+                    middlewares=[instrumentation.wrap_middleware(name, middleware) for name, middleware in layers],
+                    web3=self.web3,
+                    provider_request_fn=instrumentation.wrap_provider_request(provider),
+                ))
+        return request_funcs[method]
+
+    def _make_request(self, method, params):
+        request_func = self._request_func(method)
+        self.logger.debug("Making request. Method: %s", method)
+        return request_func(method, params)
+
+
+class AsyncRequestManager(RequestManager):
+    logger = logging.getLogger("helios_web3.AsyncRequestManager")
+
+    @staticmethod
+    def default_middlewares(web3):
+        return [
+            (async_attrdict_middleware, 'attrdict'),
+            (async_pythonic_middleware, 'pythonic'),
+            (async_abi_middleware, 'abi'),
+        ]
+
+    async def coro_request(self, method, params):
+        response = await self._coro_make_request(method, params)
+
+        if "error" in response:
+            raise ValueError(response["error"])
+
+        return response['result']
+
+    # The Hls, Personal and Admin methods return whatever request_blocking returns,
+    # so on this manager they hand back a coroutine for the caller to await.
+    request_blocking = coro_request
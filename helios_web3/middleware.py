@@ -0,0 +1,59 @@
+from web3._utils.rpc_abi import (
+    RPC_ABIS as WEB3_RPC_ABIS,
+)
+from web3.middleware import (
+    attrdict_middleware as web3_attrdict_middleware,
+    name_to_address_middleware as web3_name_to_address_middleware,
+)
+
+# Methods whose result is never a dict, so the attrdict layer has nothing to do.
+SCALAR_RESULT_RPC_METHODS = frozenset({
+    'hls_ping',
+    'hls_chainId',
+    'hls_protocolVersion',
+    'hls_coinbase',
+    'hls_mining',
+    'hls_hashrate',
+    'hls_gasPrice',
+    'hls_getGasPrice',
+    'hls_blockNumber',
+    'hls_getBlockNumber',
+    'hls_getBalance',
+    'hls_getStorageAt',
+    'hls_getCode',
+    'hls_getBlockTransactionCountByHash',
+    'hls_getBlockTransactionCountByNumber',
+    'hls_getTransactionCount',
+    'hls_sendTransaction',
+    'hls_sendRawBlock',
+    'hls_sign',
+    'hls_estimateGas',
+    'hls_call',
+    'hls_uninstallFilter',
+    'net_version',
+    'net_listening',
+    'net_peerCount',
+    'web3_clientVersion',
+    'personal_unlockAccount',
+})
+
+
+def attrdict_middleware(make_request, web3):
+    '''
+    web3's attrdict_middleware, marked so HeliosRequestManager skips it for methods
+    whose result is never a dict.
+    '''
+    return web3_attrdict_middleware(make_request, web3)
+
+
+attrdict_middleware.skip_rpc_methods = SCALAR_RESULT_RPC_METHODS
+
+
+def name_to_address_middleware(w3):
+    '''
+    web3's name_to_address_middleware, marked so HeliosRequestManager only runs it
+    for the methods with an ABI in web3, the only ones it resolves names for.
+    '''
+    middleware = web3_name_to_address_middleware(w3)
+    middleware.rpc_methods = frozenset(WEB3_RPC_ABIS)
+    return middleware
@@ -1,9 +1,17 @@
+from eth_utils.toolz import (
+    assoc,
+)
+
 from web3.geth import GethPersonal
 from web3.method import (
     Method,
     default_root_munger,
 )
 
+from helios_web3.utils.nonce import (
+    transactions_without_nonce,
+)
+
 def unlock_account_munger(module, wallet_address, password, duration = 300):
     return [wallet_address, password, duration]
 
@@ -15,11 +23,33 @@ class Personal(GethPersonal):
     Class to allow for overriding functions if necessary
     '''
 
-    sendTransactions = Method(
-        "personal_sendTransactions",
-        mungers=[default_root_munger],
-    )
+    def __init__(self, web3):
+        super().__init__(web3)
+        # ModuleV2 doesn't keep web3, sendTransactions needs it for the nonce manager
+        self.web3 = web3
 
+    def sendTransactions(self, transactions, *args):
+        nonce_manager = self.web3.hls.nonceManager
+        if nonce_manager is None:
+            return self.web3.manager.request_blocking("personal_sendTransactions", [transactions, *args])
+
+        transactions = list(transactions)
+        indexes_by_sender = transactions_without_nonce(transactions)
+        first_nonces = {}
+        for sender, indexes in indexes_by_sender.items():
+            nonce = first_nonces[sender] = nonce_manager.allocate(sender, len(indexes))
+            for offset, index in enumerate(indexes):
+                transactions[index] = assoc(transactions[index], 'nonce', nonce + offset)
+
+        try:
+            return self.web3.manager.request_blocking("personal_sendTransactions", [transactions, *args])
+        except Exception:
+            for sender in indexes_by_sender:
+                nonce_manager.invalidate(sender)
+            raise
+        finally:
+            for sender, nonce in first_nonces.items():
+                nonce_manager.complete(sender, nonce, len(indexes_by_sender[sender]))
 
     unlockAccount = Method(
         "personal_unlockAccount",
@@ -36,3 +66,29 @@ class Personal(GethPersonal):
         mungers=[get_accounts_with_receivable_transactions_munger],
     )
 
+
+class AsyncPersonal(Personal):
+    is_async = True
+
+    async def sendTransactions(self, transactions, *args):
+        nonce_manager = self.web3.hls.nonceManager
+        if nonce_manager is None:
+            return await self.web3.manager.coro_request("personal_sendTransactions", [transactions, *args])
+
+        transactions = list(transactions)
+        indexes_by_sender = transactions_without_nonce(transactions)
+        first_nonces = {}
+        for sender, indexes in indexes_by_sender.items():
+            nonce = first_nonces[sender] = await nonce_manager.allocate_async(sender, len(indexes))
+            for offset, index in enumerate(indexes):
+                transactions[index] = assoc(transactions[index], 'nonce', nonce + offset)
+
+        try:
+            return await self.web3.manager.coro_request("personal_sendTransactions", [transactions, *args])
+        except Exception:
+            for sender in indexes_by_sender:
+                nonce_manager.invalidate(sender)
+            raise
+        finally:
+            for sender, nonce in first_nonces.items():
+                nonce_manager.complete(sender, nonce, len(indexes_by_sender[sender]))
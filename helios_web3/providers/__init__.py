@@ -0,0 +1,16 @@
+from helios_web3.providers.async_rpc import (  # noqa: F401
+    AsyncHTTPProvider,
+)
+from helios_web3.providers.async_websocket import (  # noqa: F401
+    AsyncWebsocketProvider,
+)
+from helios_web3.providers.in_process import (  # noqa: F401
+    InProcessNodeProvider,
+)
+from helios_web3.providers.pooled import (  # noqa: F401
+    PooledHTTPProvider,
+)
+from helios_web3.providers.recording import (  # noqa: F401
+    RecordingProvider,
+    ReplayProvider,
+)
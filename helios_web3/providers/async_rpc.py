@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+from eth_utils import (
+    to_dict,
+)
+
+from web3._utils.http import (
+    construct_user_agent,
+)
+from web3.providers.base import (
+    JSONBaseProvider,
+)
+from web3.providers.rpc import (
+    get_default_endpoint,
+)
+
+DEFAULT_HTTP_TIMEOUT = 10
+DEFAULT_CONNECTION_LIMIT = 100
+
+
+class AsyncHTTPProvider(JSONBaseProvider):
+    '''
+    HTTP provider for AsyncHeliosWeb3. All requests share one aiohttp session, so a
+    single event loop can keep many requests in flight over keep-alive connections.
+
+    Requires the optional aiohttp dependency: pip install helios_web3[async]
+    '''
+    logger = logging.getLogger("helios_web3.providers.AsyncHTTPProvider")
+    endpoint_uri = None
+    _session = None
+
+    def __init__(self, endpoint_uri=None, request_kwargs=None, connection_limit=DEFAULT_CONNECTION_LIMIT):
+        if endpoint_uri is None:
+            self.endpoint_uri = get_default_endpoint()
+        else:
+            self.endpoint_uri = endpoint_uri
+        self._request_kwargs = request_kwargs or {}
+        self.connection_limit = connection_limit
+        super().__init__()
+
+    def __str__(self):
+        return "Async RPC connection {0}".format(self.endpoint_uri)
+
+    @to_dict
+    def get_request_kwargs(self):
+        if 'headers' not in self._request_kwargs:
+            yield 'headers', self.get_request_headers()
+        for key, value in self._request_kwargs.items():
+            yield key, value
+
+    def get_request_headers(self):
+        return {
+            'Content-Type': 'application/json',
+            'User-Agent': construct_user_agent(str(type(self))),
+        }
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError(
+                    "AsyncHTTPProvider requires aiohttp. Install it with "
+                    "`pip install helios_web3[async]`"
+                )
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                timeout=aiohttp.ClientTimeout(total=DEFAULT_HTTP_TIMEOUT),
+            )
+        return self._session
+
+    async def make_request(self, method, params):
+        self.logger.debug("Making request HTTP. URI: %s, Method: %s",
+                          self.endpoint_uri, method)
+        request_data = self.encode_rpc_request(method, params)
+        session = await self._get_session()
+        async with session.post(
+                self.endpoint_uri,
+                data=request_data,
+                **self.get_request_kwargs()) as raw_response:
+            raw_response.raise_for_status()
+            response = self.decode_rpc_response(await raw_response.read())
+        self.logger.debug("Getting response HTTP. URI: %s, "
+                          "Method: %s, Response: %s",
+                          self.endpoint_uri, method, response)
+        return response
+
+    async def isConnected(self):
+        try:
+            response = await self.make_request('web3_clientVersion', [])
+        except (IOError, asyncio.TimeoutError):
+            return False
+
+        assert response['jsonrpc'] == '2.0'
+        assert 'error' not in response
+
+        return True
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
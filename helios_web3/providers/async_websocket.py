@@ -0,0 +1,126 @@
+import asyncio
+import logging
+
+import websockets
+
+from web3._utils.encoding import (
+    FriendlyJsonSerde,
+)
+from web3.exceptions import (
+    ValidationError,
+)
+from web3.providers.base import (
+    JSONBaseProvider,
+)
+from web3.providers.websocket import (
+    DEFAULT_WEBSOCKET_TIMEOUT,
+    RESTRICTED_WEBSOCKET_KWARGS,
+    get_default_endpoint,
+)
+
+
+class AsyncWebsocketProvider(JSONBaseProvider):
+    '''
+    Websocket provider for AsyncHeliosWeb3. Requests are multiplexed over one
+    persistent connection and matched to their responses by id, so any number of
+    requests can be in flight at once.
+    '''
+    logger = logging.getLogger("helios_web3.providers.AsyncWebsocketProvider")
+
+    def __init__(
+            self,
+            endpoint_uri=None,
+            websocket_kwargs=None,
+            websocket_timeout=DEFAULT_WEBSOCKET_TIMEOUT
+    ):
+        self.endpoint_uri = endpoint_uri
+        self.websocket_timeout = websocket_timeout
+        if self.endpoint_uri is None:
+            self.endpoint_uri = get_default_endpoint()
+        if websocket_kwargs is None:
+            websocket_kwargs = {}
+        else:
+            found_restricted_keys = set(websocket_kwargs.keys()).intersection(
+                RESTRICTED_WEBSOCKET_KWARGS
+            )
+            if found_restricted_keys:
+                raise ValidationError(
+                    '{0} are not allowed in websocket_kwargs, '
+                    'found: {1}'.format(RESTRICTED_WEBSOCKET_KWARGS, found_restricted_keys)
+                )
+        self.websocket_kwargs = websocket_kwargs
+        self._ws = None
+        self._reader_task = None
+        self._pending = {}
+        self._connect_lock = None
+        super().__init__()
+
+    def __str__(self):
+        return "Async WS connection {0}".format(self.endpoint_uri)
+
+    async def _get_connection(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._ws is None:
+                self._ws = await websockets.connect(uri=self.endpoint_uri, **self.websocket_kwargs)
+                self._reader_task = asyncio.ensure_future(self._read_responses(self._ws))
+        return self._ws
+
+    async def _read_responses(self, ws):
+        try:
+            async for message in ws:
+                response = FriendlyJsonSerde().json_decode(message)
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            error = e
+        else:
+            error = ConnectionError("Websocket connection to {0} closed".format(self.endpoint_uri))
+
+        if self._ws is ws:
+            self._ws = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def make_request(self, method, params):
+        self.logger.debug("Making request WebSocket. URI: %s, "
+                          "Method: %s", self.endpoint_uri, method)
+        request_id = next(self.request_counter)
+        request_data = FriendlyJsonSerde().json_encode({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params or [],
+            "id": request_id,
+        })
+
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            ws = await self._get_connection()
+            await ws.send(request_data)
+            return await asyncio.wait_for(future, timeout=self.websocket_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def isConnected(self):
+        try:
+            response = await self.make_request('web3_clientVersion', [])
+        except (IOError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+            return False
+
+        assert response['jsonrpc'] == '2.0'
+        assert 'error' not in response
+
+        return True
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader_task is not None:
+            await self._reader_task
+            self._reader_task = None
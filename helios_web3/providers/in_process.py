@@ -0,0 +1,497 @@
+from collections import (
+    OrderedDict,
+)
+import itertools
+import threading
+import time
+
+from eth_utils import (
+    decode_hex,
+    encode_hex,
+    to_canonical_address,
+    to_wei,
+)
+
+from web3.providers.base import (
+    BaseProvider,
+)
+
+from helios_web3.account import (
+    vm,
+)
+
+# parent hash of the first block of every chain
+GENESIS_PARENT_HASH = b'\x00' * 32
+# in gwei, like hls_gasPrice
+DEFAULT_MIN_GAS_PRICE = 1
+EMPTY_LOGS_BLOOM = '0x' + '00' * 256
+
+RPC_ERROR_CODE = -32000
+METHOD_NOT_FOUND_CODE = -32601
+INVALID_PARAMS_CODE = -32602
+
+
+def to_bytes_if_hex(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return decode_hex(value)
+
+
+def decode_micro_block(raw_block):
+    '''
+    Decodes a block sent with hls_sendRawBlock, as a photon block or, failing that,
+    as a boson block.
+    '''
+    raw_block = to_bytes_if_hex(raw_block)
+    try:
+        return vm.rlp.decode(raw_block, sedes=vm.PhotonMicroBlock)
+    except Exception:
+        pass
+    try:
+        return vm.rlp.decode(raw_block, sedes=vm.BosonMicroBlock)
+    except Exception as e:
+        raise ValueError("Could not decode block: {0}".format(e)) from e
+
+
+def block_hash(micro_block):
+    # the hash the signer returns, which is the hash of the full header
+    return vm.BlockHeader.from_micro_header(micro_block.header).hash
+
+
+class InProcessChain:
+    '''
+    The state of one chain on an InProcessNodeProvider.
+    '''
+    def __init__(self, balance=0):
+        self.balance = balance
+        self.nonce = 0
+        self.block_hashes = []
+        # send transaction hash -> the receivable transaction, in arrival order
+        self.receivable = OrderedDict()
+
+    @property
+    def head_hash(self):
+        return self.block_hashes[-1] if self.block_hashes else GENESIS_PARENT_HASH
+
+
+def error_response(request_id, code, message):
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'error': {'code': code, 'message': message},
+    }
+
+
+class InProcessNodeProvider(BaseProvider):
+    '''
+    A stand-in for a Helios node that keeps its chains in memory, for load tests and
+    benchmarks that need a node without the network:
+
+        w3 = HeliosWeb3(InProcessNodeProvider(balances={address: to_wei(1000, 'ether')}))
+        signed_block, _, _ = prepare_and_sign_block(w3, private_key, transactions)
+        w3.hls.sendRawBlock(signed_block['rawBlock'])
+
+    Blocks sent with hls_sendRawBlock are decoded and imported if their block number,
+    parent hash, nonces, gas prices and balances are right. Value sent to a chain
+    becomes receivable there until a block of that chain receives it. Smart contract
+    transactions are rejected, signatures aren't checked and only the latest state
+    is kept, so block identifiers are ignored. Gas is charged at the intrinsic gas
+    of each transaction.
+
+    Answers hls_ping, hls_chainId, hls_gasPrice, hls_getGasPrice,
+    hls_getHistoricalGasPrice, hls_blockNumber, hls_getBlockNumber, hls_getBalance,
+    hls_getTransactionCount, hls_getBlockCreationParams, hls_sendRawBlock,
+    hls_getBlockByHash, hls_getBlockByNumber, hls_getNewestBlocks,
+    hls_getTransactionByHash, hls_getTransactionReceipt,
+    hls_getReceivableTransactions, hls_filterAddressesWithReceivableTransactions and
+    hls_getReceiveTransactionOfSendTransaction.
+    '''
+    def __init__(self, balances=None, chain_id=1, min_gas_price=DEFAULT_MIN_GAS_PRICE):
+        self.chain_id = chain_id
+        self.min_gas_price = min_gas_price
+        self._initial_balances = {
+            to_canonical_address(chain_address): balance
+            for chain_address, balance in (balances or {}).items()
+        }
+        self._request_counter = itertools.count()
+        self._lock = threading.Lock()
+        self._handlers = {
+            'hls_ping': self.ping,
+            'hls_chainId': self.get_chain_id,
+            'hls_gasPrice': self.get_gas_price,
+            'hls_getGasPrice': self.get_gas_price,
+            'hls_getHistoricalGasPrice': self.get_historical_gas_price,
+            'hls_blockNumber': self.get_block_number,
+            'hls_getBlockNumber': self.get_block_number,
+            'hls_getBalance': self.get_balance,
+            'hls_getTransactionCount': self.get_transaction_count,
+            'hls_getBlockCreationParams': self.get_block_creation_params,
+            'hls_sendRawBlock': self.send_raw_block,
+            'hls_getBlockByHash': self.get_block_by_hash,
+            'hls_getBlockByNumber': self.get_block_by_number,
+            'hls_getNewestBlocks': self.get_newest_blocks,
+            'hls_getTransactionByHash': self.get_transaction_by_hash,
+            'hls_getTransactionReceipt': self.get_transaction_receipt,
+            'hls_getReceivableTransactions': self.get_receivable_transactions,
+            'hls_filterAddressesWithReceivableTransactions': self.filter_addresses_with_receivable_transactions,
+            'hls_getReceiveTransactionOfSendTransaction': self.get_receive_transaction_of_send_transaction,
+        }
+        self.reset()
+
+    def reset(self):
+        '''
+        Forgets every block, going back to the balances the provider was made with.
+        '''
+        with self._lock:
+            self._chains = {
+                chain_address: InProcessChain(balance)
+                for chain_address, balance in self._initial_balances.items()
+            }
+            # block hash -> (block, send transaction hashes, receive transaction hashes)
+            self._blocks = {}
+            # in import order, newest last
+            self._block_order = []
+            self._transactions = {}
+            self._receipts = {}
+            self._receive_of_send = {}
+
+    def _chain(self, chain_address):
+        chain_address = to_canonical_address(chain_address)
+        chain = self._chains.get(chain_address)
+        if chain is None:
+            chain = self._chains[chain_address] = InProcessChain()
+        return chain
+
+    #
+    # Provider
+    #
+    def make_request(self, method, params):
+        request_id = next(self._request_counter)
+        handler = self._handlers.get(method)
+        if handler is None:
+            return error_response(
+                request_id,
+                METHOD_NOT_FOUND_CODE,
+                "The method {0} does not exist/is not available".format(method),
+            )
+        try:
+            with self._lock:
+                result = handler(*params)
+        except ValueError as e:
+            return error_response(request_id, RPC_ERROR_CODE, str(e))
+        except (TypeError, KeyError, IndexError) as e:
+            # the wrong number of params, a missing key or a param of the wrong type
+            return error_response(request_id, INVALID_PARAMS_CODE, "Invalid params for {0}: {1}".format(method, e))
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def isConnected(self):
+        return True
+
+    #
+    # Node info
+    #
+    def ping(self):
+        return True
+
+    def get_chain_id(self):
+        return hex(self.chain_id)
+
+    def get_gas_price(self):
+        return hex(self.min_gas_price)
+
+    def get_historical_gas_price(self):
+        return [[hex(int(time.time())), hex(self.min_gas_price)]]
+
+    #
+    # Accounts
+    #
+    def get_block_number(self, chain_address, block_identifier=None):
+        chain = self._chain(chain_address)
+        if not chain.block_hashes:
+            raise ValueError("No blocks on chain {0}".format(encode_hex(to_canonical_address(chain_address))))
+        return hex(len(chain.block_hashes) - 1)
+
+    def get_balance(self, chain_address, block_identifier=None):
+        return hex(self._chain(chain_address).balance)
+
+    def get_transaction_count(self, chain_address, block_identifier=None):
+        return hex(self._chain(chain_address).nonce)
+
+    def get_block_creation_params(self, chain_address):
+        chain = self._chain(chain_address)
+        receive_transactions = [
+            encode_hex(vm.rlp.encode(self._make_receive_transaction(receivable)))
+            for receivable in chain.receivable.values()
+        ]
+        return {
+            'block_number': hex(len(chain.block_hashes)),
+            'parent_hash': encode_hex(chain.head_hash),
+            'nonce': hex(chain.nonce),
+            'receive_transactions': receive_transactions,
+            'reward_bundle': encode_hex(vm.rlp.encode(vm.StakeRewardBundle())),
+        }
+
+    #
+    # Receivable transactions
+    #
+    @staticmethod
+    def _make_receive_transaction(receivable):
+        return vm.PhotonReceiveTransaction(
+            decode_hex(receivable['blockHash']),
+            decode_hex(receivable['hash']),
+            False,
+            0,
+        )
+
+    def get_receivable_transactions(self, chain_address):
+        chain = self._chain(chain_address)
+        receive_transactions = []
+        for receivable in chain.receivable.values():
+            receive_transaction = self._make_receive_transaction(receivable)
+            receive_transactions.append({
+                'hash': encode_hex(receive_transaction.hash),
+                'senderBlockHash': receivable['blockHash'],
+                'sendTransactionHash': receivable['hash'],
+                'isRefund': '0x0',
+                'remainingRefund': '0x0',
+                'from': receivable['from'],
+                'to': receivable['to'],
+                'value': receivable['value'],
+            })
+        return receive_transactions
+
+    def filter_addresses_with_receivable_transactions(self, chain_addresses, after_timestamp=0):
+        if isinstance(after_timestamp, str):
+            after_timestamp = int(after_timestamp, 16)
+        filtered = []
+        for chain_address in chain_addresses:
+            chain = self._chains.get(to_canonical_address(chain_address))
+            if chain is not None and any(receivable['timestamp'] >= after_timestamp for receivable in chain.receivable.values()):
+                filtered.append(encode_hex(to_canonical_address(chain_address)))
+        return filtered
+
+    def get_receive_transaction_of_send_transaction(self, transaction_hash):
+        receive_transaction_hash = self._receive_of_send.get(to_bytes_if_hex(transaction_hash))
+        if receive_transaction_hash is None:
+            return None
+        return self._transactions[receive_transaction_hash]
+
+    #
+    # Blocks
+    #
+    def send_raw_block(self, raw_block):
+        micro_block = decode_micro_block(raw_block)
+        header = micro_block.header
+        chain_address = header.chain_address
+        chain = self._chain(chain_address)
+
+        if header.block_number != len(chain.block_hashes):
+            raise ValueError("Block number {0} is not the next block of chain {1}, which is {2}".format(
+                header.block_number,
+                encode_hex(chain_address),
+                len(chain.block_hashes),
+            ))
+        if header.parent_hash != chain.head_hash:
+            raise ValueError("Block parent hash {0} is not the head of chain {1}".format(
+                encode_hex(header.parent_hash),
+                encode_hex(chain_address),
+            ))
+
+        new_block_hash = block_hash(micro_block)
+        if new_block_hash in self._blocks:
+            raise ValueError("Block {0} has already been imported".format(encode_hex(new_block_hash)))
+
+        # check everything before changing anything, so a bad block leaves no trace
+        balance = chain.balance
+        received = []
+        for receive_transaction in micro_block.receive_transactions:
+            receivable = chain.receivable.get(receive_transaction.send_transaction_hash)
+            if receivable is None:
+                raise ValueError("Transaction {0} is not receivable on chain {1}".format(
+                    encode_hex(receive_transaction.send_transaction_hash),
+                    encode_hex(chain_address),
+                ))
+            balance += int(receivable['value'], 16)
+            received.append(receivable)
+
+        min_gas_price = to_wei(self.min_gas_price, 'gwei')
+        gas_used = []
+        for index, transaction in enumerate(micro_block.transactions):
+            if transaction.nonce != chain.nonce + index:
+                raise ValueError("Transaction nonce {0} should be {1}".format(transaction.nonce, chain.nonce + index))
+            if transaction.is_create or getattr(transaction, 'code_address', b''):
+                raise ValueError("Smart contract transactions are not supported")
+            if transaction.gas_price < min_gas_price:
+                raise ValueError("Transaction gas price {0} is below the minimum of {1}".format(
+                    transaction.gas_price,
+                    min_gas_price,
+                ))
+            intrinsic_gas = transaction.get_intrinsic_gas()
+            if transaction.gas < intrinsic_gas:
+                raise ValueError("Transaction gas {0} is below the intrinsic gas of {1}".format(
+                    transaction.gas,
+                    intrinsic_gas,
+                ))
+            balance -= transaction.value + intrinsic_gas * transaction.gas_price
+            if balance < 0:
+                raise ValueError("Chain {0} doesn't have enough balance for transaction {1}".format(
+                    encode_hex(chain_address),
+                    encode_hex(transaction.hash),
+                ))
+            gas_used.append(intrinsic_gas)
+
+        self._import_block(micro_block, new_block_hash, chain, balance, received, gas_used)
+        return True
+
+    def _import_block(self, micro_block, new_block_hash, chain, balance, received, gas_used):
+        header = micro_block.header
+        encoded_block_hash = encode_hex(new_block_hash)
+        encoded_block_number = hex(header.block_number)
+        encoded_chain_address = encode_hex(header.chain_address)
+        cumulative_gas = [0]
+
+        def add_transaction(transaction_hash, index, transaction, gas):
+            transaction.update({
+                'hash': encode_hex(transaction_hash),
+                'blockHash': encoded_block_hash,
+                'blockNumber': encoded_block_number,
+                'transactionIndex': hex(index),
+            })
+            self._transactions[transaction_hash] = transaction
+            self._receipts[transaction_hash] = {
+                'blockHash': encoded_block_hash,
+                'blockNumber': encoded_block_number,
+                'transactionIndex': hex(index),
+                'transactionHash': encode_hex(transaction_hash),
+                'cumulativeGasUsed': hex(cumulative_gas[0] + gas),
+                'status': '0x1',
+                'gasUsed': hex(gas),
+                'contractAddress': None,
+                'logs': [],
+                'logsBloom': EMPTY_LOGS_BLOOM,
+            }
+            cumulative_gas[0] += gas
+
+        send_hashes = []
+        for index, (transaction, gas) in enumerate(zip(micro_block.transactions, gas_used)):
+            transaction_hash = transaction.hash
+            encoded_transaction = {
+                'nonce': hex(transaction.nonce),
+                'gas': hex(transaction.gas),
+                'gasPrice': hex(transaction.gas_price),
+                'value': hex(transaction.value),
+                'from': encoded_chain_address,
+                'to': encode_hex(transaction.to),
+                'data': encode_hex(transaction.data),
+                'v': hex(transaction.v),
+                'r': hex(transaction.r),
+                's': hex(transaction.s),
+            }
+            add_transaction(transaction_hash, index, encoded_transaction, gas)
+            send_hashes.append(transaction_hash)
+
+            recipient = self._chain(transaction.to)
+            recipient.receivable[transaction_hash] = {
+                'hash': encode_hex(transaction_hash),
+                'blockHash': encoded_block_hash,
+                'from': encoded_chain_address,
+                'to': encode_hex(transaction.to),
+                'value': hex(transaction.value),
+                'timestamp': header.timestamp,
+            }
+
+        receive_hashes = []
+        for offset, (receive_transaction, receivable) in enumerate(zip(micro_block.receive_transactions, received)):
+            transaction_hash = receive_transaction.hash
+            encoded_transaction = {
+                'senderBlockHash': receivable['blockHash'],
+                'sendTransactionHash': receivable['hash'],
+                'isRefund': '0x0',
+                'remainingRefund': '0x0',
+                'from': receivable['from'],
+                'to': encoded_chain_address,
+                'value': receivable['value'],
+            }
+            add_transaction(transaction_hash, len(send_hashes) + offset, encoded_transaction, 0)
+            receive_hashes.append(transaction_hash)
+            self._receive_of_send[receive_transaction.send_transaction_hash] = transaction_hash
+            del chain.receivable[receive_transaction.send_transaction_hash]
+
+        self._blocks[new_block_hash] = ({
+            'hash': encoded_block_hash,
+            'parentHash': encode_hex(header.parent_hash),
+            'number': encoded_block_number,
+            'chainAddress': encoded_chain_address,
+            'timestamp': hex(header.timestamp),
+            'extraData': encode_hex(header.extra_data),
+            'transactionsRoot': encode_hex(header.transaction_root),
+            'receiveTransactionsRoot': encode_hex(header.receive_transaction_root),
+            'gasUsed': hex(cumulative_gas[0]),
+            'logsBloom': EMPTY_LOGS_BLOOM,
+        }, send_hashes, receive_hashes)
+        self._block_order.append(new_block_hash)
+
+        chain.block_hashes.append(new_block_hash)
+        chain.balance = balance
+        chain.nonce += len(send_hashes)
+
+    def _block_result(self, stored_block_hash, include_transactions):
+        block, send_hashes, receive_hashes = self._blocks[stored_block_hash]
+        if include_transactions:
+            transactions = [self._transactions[transaction_hash] for transaction_hash in send_hashes]
+            receive_transactions = [self._transactions[transaction_hash] for transaction_hash in receive_hashes]
+        else:
+            transactions = [encode_hex(transaction_hash) for transaction_hash in send_hashes]
+            receive_transactions = [encode_hex(transaction_hash) for transaction_hash in receive_hashes]
+        return dict(block, transactions=transactions, receiveTransactions=receive_transactions)
+
+    def get_block_by_hash(self, requested_block_hash, include_transactions=False):
+        requested_block_hash = to_bytes_if_hex(requested_block_hash)
+        if requested_block_hash not in self._blocks:
+            return None
+        return self._block_result(requested_block_hash, include_transactions)
+
+    def get_block_by_number(self, block_number, chain_address, include_transactions=False):
+        chain = self._chain(chain_address)
+        if block_number == 'latest':
+            block_number = len(chain.block_hashes) - 1
+        elif block_number == 'earliest':
+            block_number = 0
+        elif isinstance(block_number, str):
+            block_number = int(block_number, 16)
+        if not 0 <= block_number < len(chain.block_hashes):
+            return None
+        return self._block_result(chain.block_hashes[block_number], include_transactions)
+
+    def get_newest_blocks(self,
+                          num_to_return='0xA',
+                          start_idx='0x0',
+                          after_hash='0x',
+                          chain_address='0x',
+                          include_transactions=False):
+        if isinstance(num_to_return, str):
+            num_to_return = int(num_to_return, 16)
+        if isinstance(start_idx, str):
+            start_idx = int(start_idx, 16)
+        after_hash = to_bytes_if_hex(after_hash)
+
+        if to_bytes_if_hex(chain_address):
+            block_hashes = self._chain(chain_address).block_hashes
+        else:
+            block_hashes = self._block_order
+
+        newest_blocks = []
+        for newest_block_hash in itertools.islice(reversed(block_hashes), start_idx, start_idx + num_to_return):
+            if newest_block_hash == after_hash:
+                break
+            newest_blocks.append(self._block_result(newest_block_hash, include_transactions))
+        return newest_blocks
+
+    #
+    # Transactions
+    #
+    def get_transaction_by_hash(self, transaction_hash):
+        return self._transactions.get(to_bytes_if_hex(transaction_hash))
+
+    def get_transaction_receipt(self, transaction_hash):
+        return self._receipts.get(to_bytes_if_hex(transaction_hash))
@@ -0,0 +1,452 @@
+from collections import (
+    deque,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import (
+    HTTPAdapter,
+)
+
+from eth_utils import (
+    to_dict,
+    to_text,
+)
+
+from web3._utils.encoding import (
+    FriendlyJsonSerde,
+)
+from web3._utils.http import (
+    construct_user_agent,
+)
+from web3.providers.base import (
+    JSONBaseProvider,
+)
+
+from helios_web3.batch import (
+    encode_batch_request,
+    match_batch_responses,
+)
+
+DEFAULT_HTTP_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 20
+# weight of the newest sample in the moving average of an endpoint's latency
+DEFAULT_LATENCY_ALPHA = 0.3
+# seconds an endpoint is avoided after a failed request, doubled for every further failure
+DEFAULT_FAILURE_BACKOFF = 5
+MAX_FAILURE_BACKOFF = 300
+# seconds after which an endpoint's latency is measured again, even if it's slower
+LATENCY_STALE_AFTER = 30
+# recent latencies kept per endpoint for the hedging delay
+LATENCY_SAMPLES = 200
+# answers needed from an endpoint before requests to it are hedged
+MIN_HEDGE_SAMPLES = 20
+DEFAULT_HEDGE_WORKERS = 16
+
+# Requests that change state go to a single node, so blocks from one chain arrive
+# at the same node in order.
+WRITE_RPC_METHODS = frozenset({
+    'hls_sendRawBlock',
+    'hls_sendTransaction',
+    'personal_sendTransaction',
+    'personal_sendTransactions',
+    'personal_receiveTransactions',
+})
+
+# Reads that are worth sending to a second node when the first is slow to answer.
+HEDGED_RPC_METHODS = frozenset({
+    'hls_getBalance',
+    'hls_getTransactionCount',
+    'hls_getCode',
+    'hls_getStorageAt',
+    'hls_call',
+    'hls_getTransactionReceipt',
+    'hls_getTransactionByHash',
+    'hls_getBlockByHash',
+    'hls_getBlockByNumber',
+    'hls_getBlockCreationParams',
+    'hls_getReceivableTransactions',
+})
+
+
+class Endpoint:
+    '''
+    One node of a PooledHTTPProvider: its keep-alive session and what we know about
+    how well it has been answering.
+    '''
+    def __init__(self, endpoint_uri, pool_size=DEFAULT_POOL_SIZE, latency=None):
+        self.endpoint_uri = endpoint_uri
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # moving average, in seconds. None until the first answer
+        self.latency = latency
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.measured_at = None
+        self.requests_sent = 0
+        self.failed_requests = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def record_success(self, latency, alpha):
+        self.requests_sent += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0
+        self.latencies.append(latency)
+        self.measured_at = time.monotonic()
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+
+    @property
+    def latency_is_stale(self):
+        return self.measured_at is None or time.monotonic() - self.measured_at > LATENCY_STALE_AFTER
+
+    def latency_percentile(self, percentile):
+        '''
+        The given percentile of the recent latencies, or None with too few samples.
+        '''
+        if len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        latencies = sorted(self.latencies)
+        index = min(int(len(latencies) * percentile / 100), len(latencies) - 1)
+        return latencies[index]
+
+    def record_failure(self, backoff):
+        self.requests_sent += 1
+        self.failed_requests += 1
+        self.consecutive_failures += 1
+        backoff = min(backoff * 2 ** (self.consecutive_failures - 1), MAX_FAILURE_BACKOFF)
+        self.unhealthy_until = time.monotonic() + backoff
+
+    def stats(self):
+        return {
+            'latency': self.latency,
+            'requests_sent': self.requests_sent,
+            'failed_requests': self.failed_requests,
+            'healthy': self.healthy,
+        }
+
+    def __repr__(self):
+        return "Endpoint({0!r}, latency={1!r}, healthy={2!r})".format(
+            self.endpoint_uri,
+            self.latency,
+            self.healthy,
+        )
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    '''
+    HTTP provider for several Helios nodes. Every node gets its own keep-alive
+    connection pool of ``pool_size`` connections, which should be at least the
+    number of threads making requests.
+
+    Reads go to the healthy node with the lowest moving average latency, and move
+    on to the next node if one fails. A node that fails is avoided for a while,
+    for longer after each further failure. Block and transaction submissions
+    (``write_methods``) all go to one node, which only changes when it fails.
+
+        provider = PooledHTTPProvider(['http://10.0.0.1:30304', 'http://10.0.0.2:30304'])
+        w3 = HeliosWeb3(provider)
+
+    With ``hedge_percentile`` set, reads in ``hedge_methods`` are hedged: if the
+    first node hasn't answered within that percentile of its recent latencies, the
+    request is also sent to the next node and whichever answer arrives first is
+    used. The other request is abandoned. At most ``hedge_workers`` hedged requests
+    are in flight at once; reads beyond that, and hedges that would go beyond it, are
+    sent without hedging rather than queued. ``hedge_stats`` counts how often hedges
+    are sent, how often they win and how often hedging was skipped.
+    '''
+    logger = logging.getLogger("helios_web3.providers.PooledHTTPProvider")
+
+    def __init__(self,
+                 endpoint_uris,
+                 request_kwargs=None,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 latency_alpha=DEFAULT_LATENCY_ALPHA,
+                 failure_backoff=DEFAULT_FAILURE_BACKOFF,
+                 write_methods=WRITE_RPC_METHODS,
+                 hedge_percentile=None,
+                 hedge_methods=HEDGED_RPC_METHODS,
+                 hedge_workers=DEFAULT_HEDGE_WORKERS):
+        self.endpoints = []
+        for endpoint_uri in endpoint_uris:
+            if isinstance(endpoint_uri, Endpoint):
+                self.endpoints.append(endpoint_uri)
+            else:
+                self.endpoints.append(Endpoint(endpoint_uri, pool_size))
+        if not self.endpoints:
+            raise ValueError("PooledHTTPProvider needs at least one endpoint")
+
+        self._request_kwargs = request_kwargs or {}
+        self.latency_alpha = latency_alpha
+        self.failure_backoff = failure_backoff
+        self.write_methods = frozenset(write_methods)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_methods = frozenset(hedge_methods)
+        self.hedge_workers = hedge_workers
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+        self._hedge_executor = None
+        self._hedge_jobs = 0
+        self._write_endpoint = None
+        self._lock = threading.Lock()
+        super().__init__()
+
+    @classmethod
+    def from_connected_nodes(cls, w3, rpc_port, scheme='http', max_failure_rate=0.5, include_current=True, **kwargs):
+        '''
+        Builds a provider from the nodes returned by ``hls_getConnectedNodes`` on w3,
+        assuming they all serve RPC on ``rpc_port``. Nodes are ordered by the
+        ``averageResponseTime`` the node reports for them, and nodes with more than
+        ``max_failure_rate`` of their requests failed are left out.
+        '''
+        endpoints = []
+        seen = set()
+
+        if include_current and getattr(w3.provider, 'endpoint_uri', None) is not None:
+            endpoints.append(Endpoint(w3.provider.endpoint_uri, kwargs.get('pool_size', DEFAULT_POOL_SIZE)))
+            seen.add(w3.provider.endpoint_uri)
+
+        nodes = sorted(w3.hls.getConnectedNodes(), key=lambda node: node['averageResponseTime'])
+        for node in nodes:
+            if node['requestsSent'] and node['failedRequests'] / node['requestsSent'] > max_failure_rate:
+                continue
+            endpoint_uri = "{0}://{1}:{2}".format(scheme, node['ipAddress'], rpc_port)
+            if endpoint_uri in seen:
+                continue
+            seen.add(endpoint_uri)
+            # the node reports response times in milliseconds
+            endpoints.append(Endpoint(
+                endpoint_uri,
+                kwargs.get('pool_size', DEFAULT_POOL_SIZE),
+                latency=node['averageResponseTime'] / 1000,
+            ))
+
+        return cls(endpoints, **kwargs)
+
+    def __str__(self):
+        return "Pooled RPC connection {0}".format(
+            ', '.join(endpoint.endpoint_uri for endpoint in self.endpoints)
+        )
+
+    @to_dict
+    def get_request_kwargs(self):
+        if 'headers' not in self._request_kwargs:
+            yield 'headers', self.get_request_headers()
+        if 'timeout' not in self._request_kwargs:
+            yield 'timeout', DEFAULT_HTTP_TIMEOUT
+        for key, value in self._request_kwargs.items():
+            yield key, value
+
+    def get_request_headers(self):
+        return {
+            'Content-Type': 'application/json',
+            'User-Agent': construct_user_agent(str(type(self))),
+        }
+
+    #
+    # Routing
+    #
+    def read_endpoints(self):
+        '''
+        The endpoints in the order reads try them: healthy ones by latency, then
+        unhealthy ones by how soon they may be tried again.
+        '''
+        with self._lock:
+            healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+            unhealthy = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+        # endpoints we haven't heard from lately go first, so a node that was slow
+        # once gets another chance
+        healthy.sort(key=lambda endpoint: -1 if endpoint.latency_is_stale else endpoint.latency)
+        unhealthy.sort(key=lambda endpoint: endpoint.unhealthy_until)
+        return healthy + unhealthy
+
+    @property
+    def write_endpoint(self):
+        with self._lock:
+            if self._write_endpoint is not None and self._write_endpoint.healthy:
+                return self._write_endpoint
+        endpoint = self.read_endpoints()[0]
+        with self._lock:
+            if self._write_endpoint is None or not self._write_endpoint.healthy:
+                self._write_endpoint = endpoint
+                self.logger.debug("Sending writes to %s", endpoint.endpoint_uri)
+            return self._write_endpoint
+
+    def _post(self, endpoint, request_data):
+        start = time.monotonic()
+        try:
+            response = endpoint.session.post(
+                endpoint.endpoint_uri,
+                data=request_data,
+                **self.get_request_kwargs()
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            with self._lock:
+                endpoint.record_failure(self.failure_backoff)
+            raise
+
+        with self._lock:
+            endpoint.record_success(time.monotonic() - start, self.latency_alpha)
+        return response.content
+
+    def _send(self, request_data, is_write, method=None):
+        if is_write:
+            # a write that may have reached the node isn't resent to another one
+            return self._post(self.write_endpoint, request_data)
+
+        endpoints = self.read_endpoints()
+        if self.hedge_percentile is not None and method in self.hedge_methods and len(endpoints) > 1:
+            return self._send_hedged(request_data, endpoints)
+        return self._send_in_order(request_data, endpoints)
+
+    def _send_in_order(self, request_data, endpoints, last_error=None):
+        for endpoint in endpoints:
+            try:
+                return self._post(endpoint, request_data)
+            except requests.RequestException as e:
+                self.logger.debug("Request to %s failed: %r", endpoint.endpoint_uri, e)
+                last_error = e
+        raise last_error
+
+    #
+    # Hedging
+    #
+    def _get_hedge_executor(self):
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=self.hedge_workers)
+            return self._hedge_executor
+
+    def _submit_hedge_job(self, endpoint, request_data, started=None):
+        # never queue: a job waiting for a worker would eat into the hedging delay
+        with self._lock:
+            if self._hedge_jobs >= self.hedge_workers:
+                self.hedges_skipped += 1
+                return None
+            self._hedge_jobs += 1
+        return self._get_hedge_executor().submit(self._run_hedge_job, endpoint, request_data, started)
+
+    def _run_hedge_job(self, endpoint, request_data, started):
+        try:
+            if started is not None:
+                started.set()
+            return self._post(endpoint, request_data)
+        finally:
+            with self._lock:
+                self._hedge_jobs -= 1
+
+    def _send_hedged(self, request_data, endpoints):
+        primary, secondary = endpoints[0], endpoints[1]
+        with self._lock:
+            delay = primary.latency_percentile(self.hedge_percentile)
+        if delay is None:
+            return self._send_in_order(request_data, endpoints)
+
+        started = threading.Event()
+        first = self._submit_hedge_job(primary, request_data, started)
+        if first is None:
+            return self._send_in_order(request_data, endpoints)
+
+        # the delay counts from when the request is sent, not from when it was submitted
+        started.wait()
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        except requests.RequestException as e:
+            return self._send_in_order(request_data, endpoints[1:], e)
+
+        second = self._submit_hedge_job(secondary, request_data)
+        if second is None:
+            try:
+                return first.result()
+            except requests.RequestException as e:
+                return self._send_in_order(request_data, endpoints[1:], e)
+
+        self.logger.debug("Hedging request to %s after %.3fs", secondary.endpoint_uri, delay)
+        with self._lock:
+            self.hedges_fired += 1
+
+        pending = {first, second}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    last_error = e
+                    continue
+                if future is second:
+                    with self._lock:
+                        self.hedges_won += 1
+                # the other request can't be interrupted once sent, its answer is ignored
+                return result
+
+        return self._send_in_order(request_data, endpoints[2:], last_error)
+
+    def hedge_stats(self):
+        with self._lock:
+            return {
+                'fired': self.hedges_fired,
+                'won': self.hedges_won,
+                'skipped': self.hedges_skipped,
+            }
+
+    #
+    # Provider API
+    #
+    def make_request(self, method, params):
+        self.logger.debug("Making request HTTP. Method: %s", method)
+        request_data = self.encode_rpc_request(method, params)
+        raw_response = self._send(request_data, method in self.write_methods, method)
+        response = self.decode_rpc_response(raw_response)
+        self.logger.debug("Getting response HTTP. Method: %s, Response: %s", method, response)
+        return response
+
+    def make_batch_request(self, requests):
+        request_ids, request_data = encode_batch_request(self, requests)
+        is_write = any(method in self.write_methods for method, _ in requests)
+        raw_response = self._send(request_data, is_write)
+        decoded = FriendlyJsonSerde().json_decode(to_text(raw_response))
+        return match_batch_responses(request_ids, decoded)
+
+    def isConnected(self):
+        try:
+            response = self.make_request('web3_clientVersion', [])
+        except IOError:
+            return False
+
+        assert response['jsonrpc'] == '2.0'
+        assert 'error' not in response
+
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {endpoint.endpoint_uri: endpoint.stats() for endpoint in self.endpoints}
+
+    def close(self):
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+        for endpoint in self.endpoints:
+            endpoint.session.close()
@@ -0,0 +1,287 @@
+from collections import (
+    defaultdict,
+    deque,
+)
+import gzip
+import importlib
+import json
+import threading
+import time
+
+from eth_utils import (
+    encode_hex,
+)
+
+from web3._utils.encoding import (
+    Web3JsonEncoder,
+)
+from web3.providers.base import (
+    BaseProvider,
+)
+
+from helios_web3.batch import (
+    make_batch_request,
+)
+
+
+# seconds between flushes of a recording, so a crash loses little of it
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# the only modules recorded exception types are looked up in when replaying, so a
+# log can't make ReplayProvider import anything
+REPLAYABLE_EXCEPTION_MODULES = (
+    'builtins',
+    'requests.exceptions',
+    'web3.exceptions',
+)
+
+
+class NoRecordedResponse(ValueError):
+    '''
+    Raised by ReplayProvider for a request that was never recorded.
+    '''
+    pass
+
+
+class RecordedProviderError(Exception):
+    '''
+    Replays a recorded provider exception whose type isn't one ReplayProvider
+    raises itself.
+    '''
+    pass
+
+
+class RecordingJsonEncoder(Web3JsonEncoder):
+    def default(self, obj):
+        if isinstance(obj, (bytes, bytearray)):
+            return encode_hex(obj)
+        return super().default(obj)
+
+
+def open_log(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def request_key(method, params):
+    return method, json.dumps(params, sort_keys=True, cls=RecordingJsonEncoder)
+
+
+def exception_entry(exception):
+    exception_type = type(exception)
+    return {
+        'type': "{0}:{1}".format(exception_type.__module__, exception_type.__qualname__),
+        'message': str(exception),
+    }
+
+
+def recorded_exception(entry):
+    '''
+    An exception like the one recorded by RecordingProvider, of the same type when
+    that type is from one of the REPLAYABLE_EXCEPTION_MODULES.
+    '''
+    module_name, _, qualname = entry['type'].partition(':')
+    exception_type = None
+    if module_name in REPLAYABLE_EXCEPTION_MODULES:
+        try:
+            exception_type = importlib.import_module(module_name)
+            for name in qualname.split('.'):
+                exception_type = getattr(exception_type, name)
+        except (ImportError, AttributeError):
+            exception_type = None
+    if isinstance(exception_type, type) and issubclass(exception_type, Exception):
+        try:
+            return exception_type(entry['message'])
+        except Exception:
+            pass
+    return RecordedProviderError("{0}: {1}".format(entry['type'], entry['message']))
+
+
+def iter_recorded(path):
+    '''
+    Yields the entries of a log written by RecordingProvider, in the order the
+    requests were made: dicts with the method, params, latency and either the
+    response or the exception the provider raised.
+    '''
+    with open_log(path, 'r') as log_file:
+        for line in log_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingProvider(BaseProvider):
+    '''
+    Wraps a provider and writes every request made through it, with the response and
+    how long it took, to a JSON lines log. The log is gzipped when the path ends in
+    ``.gz``:
+
+        provider = RecordingProvider(HTTPProvider('http://127.0.0.1:30304'), 'traffic.jsonl.gz')
+        w3 = HeliosWeb3(provider)
+        ...
+        provider.close()
+
+    The wrapped provider's own middlewares, like HTTPProvider's retries, keep running
+    in front of it, so every attempt they make is recorded. Requests in a batch are
+    recorded one by one, each with the latency of the whole batch. Exceptions raised
+    by the provider, like timeouts and connection errors, are recorded too and raised
+    again. The log is flushed at most every ``flush_interval`` seconds, and can be
+    served back with ReplayProvider.
+    '''
+    def __init__(self, provider, path, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.provider = provider
+        self.path = path
+        self.flush_interval = flush_interval
+        self._log_file = open_log(path, 'w')
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def middlewares(self):
+        return self.provider.middlewares
+
+    @middlewares.setter
+    def middlewares(self, values):
+        self.provider.middlewares = values
+
+    def _record(self, method, params, latency, response=None, exception=None):
+        entry = {
+            'method': method,
+            'params': params,
+            'latency': latency,
+        }
+        if exception is not None:
+            entry['exception'] = exception_entry(exception)
+        else:
+            entry['response'] = response
+        line = json.dumps(entry, cls=RecordingJsonEncoder, separators=(',', ':'))
+        with self._lock:
+            self._log_file.write(line + '\n')
+            if time.monotonic() - self._flushed_at >= self.flush_interval:
+                self._log_file.flush()
+                self._flushed_at = time.monotonic()
+
+    def make_request(self, method, params):
+        start = time.perf_counter()
+        try:
+            response = self.provider.make_request(method, params)
+        except Exception as e:
+            self._record(method, params, time.perf_counter() - start, exception=e)
+            raise
+        self._record(method, params, time.perf_counter() - start, response)
+        return response
+
+    def make_batch_request(self, requests):
+        start = time.perf_counter()
+        try:
+            responses = make_batch_request(self.provider, requests)
+        except Exception as e:
+            latency = time.perf_counter() - start
+            for method, params in requests:
+                self._record(method, params, latency, exception=e)
+            raise
+        latency = time.perf_counter() - start
+        for (method, params), response in zip(requests, responses):
+            self._record(method, params, latency, response)
+        return responses
+
+    def flush(self):
+        with self._lock:
+            self._log_file.flush()
+            self._flushed_at = time.monotonic()
+
+    def isConnected(self):
+        return self.provider.isConnected()
+
+    def close(self):
+        with self._lock:
+            self._log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ReplayProvider(BaseProvider):
+    '''
+    Answers requests with the responses recorded by RecordingProvider, so recorded
+    traffic can be run through the middlewares again without a node:
+
+        provider = ReplayProvider('traffic.jsonl.gz')
+        w3 = HeliosWeb3(provider)
+        for method, params in provider.recorded_requests():
+            w3.manager.request_blocking(method, params)
+
+    A request gets the responses recorded for the same method and params, in the
+    order they were recorded, starting over once they have all been used. Recorded
+    provider exceptions are raised again. A request that was never recorded raises
+    NoRecordedResponse, a ValueError.
+
+    ``latency`` adds a delay to every response: ``'recorded'`` sleeps for as long as
+    the recorded request took, a number sleeps for that many seconds and None, the
+    default, doesn't sleep. ``latency_scale`` multiplies the recorded latencies.
+    '''
+    def __init__(self, path, latency=None, latency_scale=1.0):
+        if latency is not None and latency != 'recorded' and not isinstance(latency, (int, float)):
+            raise ValueError("latency must be None, 'recorded' or a number of seconds")
+        self.path = path
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self._entries = list(iter_recorded(path))
+        self._lock = threading.Lock()
+        self.rewind()
+
+    def rewind(self):
+        '''
+        Goes back to the first recorded response of every request.
+        '''
+        responses = defaultdict(deque)
+        for entry in self._entries:
+            responses[request_key(entry['method'], entry['params'])].append(entry)
+        with self._lock:
+            self._responses = responses
+
+    def recorded_requests(self):
+        '''
+        The (method, params) of every recorded request, in the order they were made.
+        '''
+        return [(entry['method'], entry['params']) for entry in self._entries]
+
+    def _next_response(self, method, params):
+        key = request_key(method, params)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise NoRecordedResponse("No response recorded for {0} with params {1}".format(method, key[1]))
+            entry = responses[0]
+            # keep the responses in a loop, so replays can run longer than the recording
+            responses.rotate(-1)
+        return entry
+
+    def _sleep(self, recorded_latency):
+        if self.latency == 'recorded':
+            time.sleep(recorded_latency * self.latency_scale)
+        elif self.latency:
+            time.sleep(self.latency)
+
+    def make_request(self, method, params):
+        entry = self._next_response(method, params)
+        self._sleep(entry['latency'])
+        if 'exception' in entry:
+            raise recorded_exception(entry['exception'])
+        return entry['response']
+
+    def make_batch_request(self, requests):
+        entries = [self._next_response(method, params) for method, params in requests]
+        # recorded batches have the latency of the whole batch on every request
+        if entries:
+            self._sleep(entries[-1]['latency'])
+        for entry in entries:
+            if 'exception' in entry:
+                raise recorded_exception(entry['exception'])
+        return [entry['response'] for entry in entries]
+
+    def isConnected(self):
+        return True
@@ -1,4 +1,5 @@
 import codecs
+import functools
 import operator
 
 from eth_utils.curried import (
@@ -6,10 +7,10 @@ from eth_utils.curried import (
     is_address,
     is_bytes,
     is_integer,
-    is_null,
     is_string,
     remove_0x_prefix,
     text_if_str,
+    to_canonical_address,
     to_checksum_address,
 )
 from eth_utils.toolz import (
@@ -48,6 +49,15 @@ from web3.middleware.formatting import (
     construct_formatting_middleware,
 )
 
+from helios_web3.datastructures import (
+    Record,
+)
+from helios_web3.utils.formatters import (
+    compile_formatters,
+    compile_record_formatter,
+    is_not_null,
+)
+
 
 def bytes_to_ascii(value):
     return codecs.decode(value, 'ascii')
@@ -61,7 +71,6 @@ block_number_formatter = apply_formatter_if(is_integer, integer_to_hex)
 is_false = partial(operator.is_, False)
 
 is_not_false = complement(is_false)
-is_not_null = complement(is_null)
 
 
 @curry
@@ -84,6 +93,37 @@ def to_hexbytes(num_bytes, val, variable_length=False):
         )
 
 
+CHECKSUM_ADDRESS_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CHECKSUM_ADDRESS_CACHE_SIZE)
+def _cached_to_checksum_address(value):
+    return to_checksum_address(value)
+
+
+def cached_to_checksum_address(value):
+    '''
+    to_checksum_address, remembering the most recently seen addresses. A block
+    usually repeats the same few addresses many times, and each checksum costs a
+    keccak hash.
+    '''
+    if isinstance(value, (str, bytes)):
+        return _cached_to_checksum_address(value)
+    return to_checksum_address(value)
+
+
+def to_address_bytes(value):
+    '''
+    The raw 20 bytes of an address, for when checksummed strings aren't needed.
+    '''
+    if isinstance(value, str) and len(value) == 42 and value[:2] in ('0x', '0X'):
+        try:
+            return bytes.fromhex(value[2:])
+        except ValueError:
+            pass
+    return to_canonical_address(value)
+
+
 TRANSACTION_FORMATTERS = {
     'blockHash': apply_formatter_if(is_not_null, to_hexbytes(32)),
     'blockNumber': apply_formatter_if(is_not_null, to_integer_if_hex),
@@ -92,12 +132,12 @@ TRANSACTION_FORMATTERS = {
     'gas': to_integer_if_hex,
     'gasPrice': to_integer_if_hex,
     'value': to_integer_if_hex,
-    'from': to_checksum_address,
+    'from': cached_to_checksum_address,
     'publicKey': apply_formatter_if(is_not_null, to_hexbytes(64)),
     'r': to_hexbytes(32, variable_length=True),
     'raw': HexBytes,
     's': to_hexbytes(32, variable_length=True),
-    'to': apply_formatter_if(is_address, to_checksum_address),
+    'to': apply_formatter_if(is_address, cached_to_checksum_address),
     'hash': to_hexbytes(32),
     'v': apply_formatter_if(is_not_null, to_integer_if_hex),
     'standardV': apply_formatter_if(is_not_null, to_integer_if_hex),
@@ -107,6 +147,10 @@ TRANSACTION_FORMATTERS = {
 transaction_formatter = apply_formatters_to_dict(TRANSACTION_FORMATTERS)
 
 
+class TransactionRecord(Record):
+    __slots__ = tuple(TRANSACTION_FORMATTERS)
+
+
 SIGNED_TX_FORMATTER = {
     'raw': HexBytes,
     'tx': transaction_formatter,
@@ -135,7 +179,7 @@ LOG_ENTRY_FORMATTERS = {
     'transactionIndex': apply_formatter_if(is_not_null, to_integer_if_hex),
     'transactionHash': apply_formatter_if(is_not_null, to_hexbytes(32)),
     'logIndex': to_integer_if_hex,
-    'address': to_checksum_address,
+    'address': cached_to_checksum_address,
     'topics': apply_formatter_to_array(to_hexbytes(32)),
     'data': to_ascii_if_bytes,
 }
@@ -144,6 +188,10 @@ LOG_ENTRY_FORMATTERS = {
 log_entry_formatter = apply_formatters_to_dict(LOG_ENTRY_FORMATTERS)
 
 
+class LogEntryRecord(Record):
+    __slots__ = tuple(LOG_ENTRY_FORMATTERS)
+
+
 RECEIPT_FORMATTERS = {
     'blockHash': apply_formatter_if(is_not_null, to_hexbytes(32)),
     'blockNumber': apply_formatter_if(is_not_null, to_integer_if_hex),
@@ -152,7 +200,7 @@ RECEIPT_FORMATTERS = {
     'cumulativeGasUsed': to_integer_if_hex,
     'status': to_integer_if_hex,
     'gasUsed': to_integer_if_hex,
-    'contractAddress': apply_formatter_if(is_not_null, to_checksum_address),
+    'contractAddress': apply_formatter_if(is_not_null, cached_to_checksum_address),
     'logs': apply_formatter_to_array(log_entry_formatter),
     'logsBloom': to_hexbytes(256),
 }
@@ -160,6 +208,10 @@ RECEIPT_FORMATTERS = {
 
 receipt_formatter = apply_formatters_to_dict(RECEIPT_FORMATTERS)
 
+
+class ReceiptRecord(Record):
+    __slots__ = tuple(RECEIPT_FORMATTERS)
+
 BLOCK_FORMATTERS = {
     'extraData': to_hexbytes(32, variable_length=True),
     'gasLimit': to_integer_if_hex,
@@ -168,7 +220,7 @@ BLOCK_FORMATTERS = {
     'timestamp': to_integer_if_hex,
     'hash': apply_formatter_if(is_not_null, to_hexbytes(32)),
     'logsBloom': to_hexbytes(256),
-    'miner': apply_formatter_if(is_not_null, to_checksum_address),
+    'miner': apply_formatter_if(is_not_null, cached_to_checksum_address),
     'mixHash': to_hexbytes(32),
     'nonce': apply_formatter_if(is_not_null, to_hexbytes(8, variable_length=True)),
     'number': apply_formatter_if(is_not_null, to_integer_if_hex),
@@ -201,7 +253,7 @@ STORAGE_PROOF_FORMATTERS = {
 }
 
 ACCOUNT_PROOF_FORMATTERS = {
-    'address': to_checksum_address,
+    'address': cached_to_checksum_address,
     'accountProof': apply_formatter_to_array(HexBytes),
     'balance': to_integer_if_hex,
     'codeHash': to_hexbytes(32),
@@ -320,74 +372,126 @@ def to_hex_if_bytes(val):
     else:
         return val
 
-    
-pythonic_middleware = construct_formatting_middleware(
-    request_formatters={
-        # Hls
-        'hls_getBlockCreationParams': compose(
-            apply_formatter_at_index(to_hex_if_bytes, 0),
-        ),
-        'hls_getBalance': apply_formatter_at_index(block_number_formatter, 1),
-        'hls_getBlockTransactionCountByNumber': apply_formatter_at_index(
-            block_number_formatter,
-            0,
-        ),
-        'hls_getReceivableTransactions': apply_formatter_at_index(to_hex_if_bytes, 0),
-        'hls_getCode': apply_formatter_at_index(block_number_formatter, 1),
-        'hls_getStorageAt': apply_formatter_at_index(block_number_formatter, 2),
-        'hls_getTransactionCount': apply_formatter_at_index(block_number_formatter, 1),
-        'hls_getBlockByNumber': compose(
-            apply_formatter_at_index(block_number_formatter, 0),
-            apply_formatter_at_index(to_hex_if_bytes, 1),
-        ),
-        'hls_getTransactionReceipt': apply_formatter_at_index(to_hex_if_bytes, 0),
-        'hls_call': compose(
-            apply_formatter_at_index(transaction_param_formatter, 0),
-            apply_formatter_at_index(block_number_formatter, 1),
-        )
-        ,
-    },
-    result_formatters={
-        # Hls
-        'hls_blockNumber': to_integer_if_hex,
-        'hls_gasPrice': to_integer_if_hex,
-        'hls_getGasPrice': to_integer_if_hex,
-        'hls_getBalance': to_integer_if_hex,
-        'hls_getBlockTransactionCountByHash': to_integer_if_hex,
-        'hls_getBlockTransactionCountByNumber': to_integer_if_hex,
-        'hls_getCode': HexBytes,
-        'hls_getStorageAt': HexBytes,
-        'hls_getTransactionByBlockHashAndIndex': apply_formatter_if(
-            is_not_null,
-            transaction_formatter,
-        ),
-        'hls_getTransactionByBlockNumberAndIndex': apply_formatter_if(
-            is_not_null,
-            transaction_formatter,
-        ),
-        'hls_getTransactionReceipt': apply_formatter_if(
-            is_not_null,
-            receipt_formatter,
-        ),
-        'hls_getTransactionCount': to_integer_if_hex,
-        'hls_protocolVersion': compose(
-            apply_formatter_if(is_integer, str),
-            to_integer_if_hex,
-        ),
-        'hls_getTransactionByHash': apply_formatter_if(is_not_null, transaction_formatter),
-        'hls_getReceivableTransactions': apply_formatter_to_array(transaction_formatter),
-        'hls_filterAddressesWithReceivableTransactions': apply_formatter_to_array(HexBytes),
-        'hls_getReceiveTransactionOfSendTransaction': apply_formatter_if(is_not_null, transaction_formatter),
-        'hls_getHistoricalGasPrice': apply_formatter_to_array(min_gas_price_formatter),
-        'hls_getApproximateHistoricalNetworkTPCCapability': apply_formatter_to_array(min_gas_price_formatter),
-        'hls_getApproximateHistoricalTPC': apply_formatter_to_array(min_gas_price_formatter),
-        'hls_getBlockNumber':to_integer_if_hex,
-        'hls_getBlockCreationParams': block_creation_parameters_formatter,
-        'hls_getBlockByHash': apply_formatter_if(is_not_null, block_formatter),
-        'hls_getBlockByNumber': apply_formatter_if(is_not_null, block_formatter),
-        'hls_getConnectedNodes': apply_formatter_to_array(get_connected_nodes_formatter),
-        'hls_call':HexBytes,
-        # Net
-        'net_peerCount': to_integer_if_hex,
-    },
-)
+
+PYTHONIC_REQUEST_FORMATTERS = {
+    # Hls
+    'hls_getBlockCreationParams': compose(
+        apply_formatter_at_index(to_hex_if_bytes, 0),
+    ),
+    'hls_getBalance': apply_formatter_at_index(block_number_formatter, 1),
+    'hls_getBlockTransactionCountByNumber': apply_formatter_at_index(
+        block_number_formatter,
+        0,
+    ),
+    'hls_getReceivableTransactions': apply_formatter_at_index(to_hex_if_bytes, 0),
+    'hls_getCode': apply_formatter_at_index(block_number_formatter, 1),
+    'hls_getStorageAt': apply_formatter_at_index(block_number_formatter, 2),
+    'hls_getTransactionCount': apply_formatter_at_index(block_number_formatter, 1),
+    'hls_getBlockByNumber': compose(
+        apply_formatter_at_index(block_number_formatter, 0),
+        apply_formatter_at_index(to_hex_if_bytes, 1),
+    ),
+    'hls_getTransactionReceipt': apply_formatter_at_index(to_hex_if_bytes, 0),
+    'hls_call': compose(
+        apply_formatter_at_index(transaction_param_formatter, 0),
+        apply_formatter_at_index(block_number_formatter, 1),
+    ),
+}
+
+
+PYTHONIC_RESULT_FORMATTERS = {
+    # Hls
+    'hls_blockNumber': to_integer_if_hex,
+    'hls_gasPrice': to_integer_if_hex,
+    'hls_getGasPrice': to_integer_if_hex,
+    'hls_getBalance': to_integer_if_hex,
+    'hls_getBlockTransactionCountByHash': to_integer_if_hex,
+    'hls_getBlockTransactionCountByNumber': to_integer_if_hex,
+    'hls_getCode': HexBytes,
+    'hls_getStorageAt': HexBytes,
+    'hls_getTransactionByBlockHashAndIndex': apply_formatter_if(
+        is_not_null,
+        transaction_formatter,
+    ),
+    'hls_getTransactionByBlockNumberAndIndex': apply_formatter_if(
+        is_not_null,
+        transaction_formatter,
+    ),
+    'hls_getTransactionReceipt': apply_formatter_if(
+        is_not_null,
+        receipt_formatter,
+    ),
+    'hls_getTransactionCount': to_integer_if_hex,
+    'hls_protocolVersion': compose(
+        apply_formatter_if(is_integer, str),
+        to_integer_if_hex,
+    ),
+    'hls_getTransactionByHash': apply_formatter_if(is_not_null, transaction_formatter),
+    'hls_getReceivableTransactions': apply_formatter_to_array(transaction_formatter),
+    'hls_filterAddressesWithReceivableTransactions': apply_formatter_to_array(HexBytes),
+    'hls_getReceiveTransactionOfSendTransaction': apply_formatter_if(is_not_null, transaction_formatter),
+    'hls_getHistoricalGasPrice': apply_formatter_to_array(min_gas_price_formatter),
+    'hls_getApproximateHistoricalNetworkTPCCapability': apply_formatter_to_array(min_gas_price_formatter),
+    'hls_getApproximateHistoricalTPC': apply_formatter_to_array(min_gas_price_formatter),
+    'hls_getBlockNumber':to_integer_if_hex,
+    'hls_getBlockCreationParams': block_creation_parameters_formatter,
+    'hls_getBlockByHash': apply_formatter_if(is_not_null, block_formatter),
+    'hls_getBlockByNumber': apply_formatter_if(is_not_null, block_formatter),
+    'hls_getConnectedNodes': apply_formatter_to_array(get_connected_nodes_formatter),
+    'hls_call':HexBytes,
+    # Net
+    'net_peerCount': to_integer_if_hex,
+}
+
+
+def construct_pythonic_middleware(compiled=False, checksum_addresses=True, lazy=False, slotted=False):
+    '''
+    Builds the pythonic middleware. With ``compiled=True`` the formatter tables are
+    flattened by compile_formatters once, up front, which gives the same results with
+    much less per-field overhead on large responses like blocks with many transactions.
+
+        w3.middleware_onion.replace('pythonic', compiled_pythonic_middleware)
+
+    With ``checksum_addresses=False`` addresses in results are returned as their raw
+    20 bytes instead of checksummed strings.
+
+    With ``lazy=True`` dict results like blocks, transactions and receipts come back
+    as LazyAttributeDicts, which keep the raw JSON and only format the fields that
+    are actually read.
+
+    With ``slotted=True`` transactions, receipts and log entries come back as the
+    compact TransactionRecord, ReceiptRecord and LogEntryRecord, for keeping large
+    numbers of them in memory. Records aren't Mappings: use ``dict(record)`` where
+    a dict is needed.
+
+    All three options imply ``compiled=True``.
+    '''
+    request_formatters = PYTHONIC_REQUEST_FORMATTERS
+    result_formatters = PYTHONIC_RESULT_FORMATTERS
+    # HeliosRequestManager skips the middleware for other methods
+    rpc_methods = frozenset(request_formatters).union(result_formatters)
+    if compiled or lazy or slotted or not checksum_addresses:
+        substitutions = []
+        if not checksum_addresses:
+            substitutions.append((cached_to_checksum_address, to_address_bytes))
+        if slotted:
+            # logs first, receipts are formatted with the log entry formatter
+            substitutions.append((log_entry_formatter, compile_record_formatter(
+                LOG_ENTRY_FORMATTERS, LogEntryRecord, substitutions)))
+            substitutions.append((receipt_formatter, compile_record_formatter(
+                RECEIPT_FORMATTERS, ReceiptRecord, substitutions)))
+            substitutions.append((transaction_formatter, compile_record_formatter(
+                TRANSACTION_FORMATTERS, TransactionRecord, substitutions)))
+        request_formatters = compile_formatters(request_formatters)
+        result_formatters = compile_formatters(result_formatters, substitutions, lazy)
+
+    middleware = construct_formatting_middleware(
+        request_formatters=request_formatters,
+        result_formatters=result_formatters,
+    )
+    middleware.rpc_methods = rpc_methods
+    return middleware
+
+
+pythonic_middleware = construct_pythonic_middleware()
+compiled_pythonic_middleware = construct_pythonic_middleware(compiled=True)
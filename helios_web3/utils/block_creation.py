@@ -1,31 +1,255 @@
-
+import threading
+import time
 from typing import (
     Tuple,
     List,
     Dict, Any)
 
-from eth_utils import to_wei
-from hvm.constants import GAS_TX
+from eth_utils import (
+    to_canonical_address,
+    to_checksum_address,
+)
 from eth_keys.datatypes import PrivateKey
 
-def prepare_and_sign_block(w3, private_key: PrivateKey, transactions: List[Dict[str, Any]] = [], receivable_transactions: List[Dict[str, Any]] = []):
-    block_creation_parameters = w3.hls.getBlockCreationParams(private_key.public_key.to_canonical_address())
+from helios_web3.gas_strategies import (
+    DEFAULT_GAS_PRICE_TTL,
+    CachedGasPriceStrategy,
+    rpc_gas_price_strategy,
+)
+
+from helios_web3.utils.lazy_imports import LazyImports
+
+vm = LazyImports({
+    'GAS_TX': 'hvm.constants:GAS_TX',
+})
+
+
+class ChainHead:
+    '''
+    What we know about the next block to build on one chain.
+    '''
+    def __init__(self, block_number: int, parent_hash: bytes, nonce: int):
+        self.block_number = block_number
+        self.parent_hash = parent_hash
+        self.nonce = nonce
+        self.synced_at = time.monotonic()
+        # blocks signed on top of the last node sync
+        self.pending_blocks = 0
+
+    def __repr__(self):
+        return "ChainHead(block_number={0}, nonce={1}, pending_blocks={2})".format(
+            self.block_number,
+            self.nonce,
+            self.pending_blocks,
+        )
+
+
+class ChainHeadTracker:
+    '''
+    Keeps the block number, parent hash and nonce of the next block for each chain,
+    advancing them locally from the blocks we sign. This lets prepare_and_sign_block
+    build several blocks for a chain back to back without asking the node for the
+    block creation parameters every time.
+
+        tracker = ChainHeadTracker(w3)
+        signed_block, _, _ = prepare_and_sign_block(w3, private_key, transactions, head_tracker=tracker)
+        try:
+            w3.hls.sendRawBlock(signed_block['rawBlock'])
+        except ValueError:
+            tracker.invalidate(chain_address)
+
+    The node is only asked again after ``invalidate`` (e.g. when a block is rejected)
+    or, if ``resync_interval`` is set, to check for drift once a head is that many
+    seconds old. On a drift check the node's head is adopted when it is ahead of ours,
+    when it disagrees with us about the same block, or when more than
+    ``max_pending_blocks`` of our blocks are still not on the node.
+
+    Unless a gas price strategy that applies to blocks, like CachedGasPriceStrategy,
+    is set on ``w3.hls``, the tracker keeps the gas price of the blocks in its own
+    CachedGasPriceStrategy for ``gas_price_ttl`` seconds, so tracked blocks don't ask
+    the node for it either.
+    '''
+    def __init__(self, w3, resync_interval: float = None, max_pending_blocks: int = None, gas_price_ttl: float = DEFAULT_GAS_PRICE_TTL):
+        self.w3 = w3
+        self.resync_interval = resync_interval
+        self.max_pending_blocks = max_pending_blocks
+        self._heads = {}
+        self._chain_locks = {}
+        self.gas_price_strategy = CachedGasPriceStrategy(ttl=gas_price_ttl, background=False)
+        self._lock = threading.Lock()
+
+    def chain_lock(self, chain_address) -> threading.RLock:
+        chain_address = to_canonical_address(chain_address)
+        with self._lock:
+            if chain_address not in self._chain_locks:
+                self._chain_locks[chain_address] = threading.RLock()
+            return self._chain_locks[chain_address]
+
+    def has_head(self, chain_address) -> bool:
+        return to_canonical_address(chain_address) in self._heads
+
+    def get_head(self, chain_address) -> ChainHead:
+        chain_address = to_canonical_address(chain_address)
+        head = self._heads.get(chain_address)
+
+        if head is None:
+            return self.update(chain_address, self.w3.hls.getBlockCreationParams(chain_address))
+
+        if self.resync_interval is not None and time.monotonic() - head.synced_at > self.resync_interval:
+            return self._check_drift(chain_address, head)
+
+        return head
+
+    def update(self, chain_address, block_creation_parameters) -> ChainHead:
+        '''
+        Sets the head of a chain from a hls_getBlockCreationParams result. Can be used
+        to prime the tracker with parameters fetched in a batch.
+        '''
+        chain_address = to_canonical_address(chain_address)
+        head = ChainHead(block_creation_parameters['block_number'],
+                         bytes(block_creation_parameters['parent_hash']),
+                         block_creation_parameters['nonce'])
+        self._heads[chain_address] = head
+        return head
+
+    def advance(self, chain_address, block_hash: bytes, num_send_transactions: int) -> ChainHead:
+        '''
+        Moves the head of a chain past a block we just signed.
+        '''
+        head = self._heads[to_canonical_address(chain_address)]
+        head.block_number += 1
+        head.parent_hash = bytes(block_hash)
+        head.nonce += num_send_transactions
+        head.pending_blocks += 1
+        return head
+
+    def gas_price(self) -> int:
+        '''
+        The gas price of the transactions in our blocks, in wei, fetched again once it
+        is older than ``gas_price_ttl``.
+        '''
+        return self.gas_price_strategy(self.w3)
+
+    def invalidate(self, chain_address=None):
+        '''
+        Forgets the head of a chain, or of all chains, so it is fetched from the node
+        the next time it is needed. Forgetting all chains forgets the gas price too.
+        '''
+        if chain_address is None:
+            self._heads.clear()
+            self.gas_price_strategy.invalidate()
+        else:
+            self._heads.pop(to_canonical_address(chain_address), None)
+
+    def _check_drift(self, chain_address, head):
+        params = self.w3.hls.getBlockCreationParams(chain_address)
+        node_block_number = params['block_number']
+        blocks_ahead_of_node = head.block_number - node_block_number
+
+        if blocks_ahead_of_node < 0:
+            drifted = True
+        elif blocks_ahead_of_node == 0:
+            drifted = bytes(params['parent_hash']) != head.parent_hash
+        else:
+            drifted = self.max_pending_blocks is not None and blocks_ahead_of_node > self.max_pending_blocks
+
+        if drifted:
+            return self.update(chain_address, params)
+
+        head.synced_at = time.monotonic()
+        head.pending_blocks = blocks_ahead_of_node
+        return head
+
+
+def prepare_and_sign_block(w3, private_key: PrivateKey, transactions: List[Dict[str, Any]] = [], receivable_transactions: List[Dict[str, Any]] = [], head_tracker: ChainHeadTracker = None):
+    chain_address = private_key.public_key.to_canonical_address()
+
+    if head_tracker is None:
+        block_creation_parameters = w3.hls.getBlockCreationParams(chain_address)
+        return _prepare_and_sign_block_with_nonce_manager(w3,
+                                                          private_key,
+                                                          block_creation_parameters['block_number'],
+                                                          block_creation_parameters['parent_hash'],
+                                                          block_creation_parameters['nonce'],
+                                                          True,
+                                                          _block_gas_price(w3, transactions),
+                                                          transactions,
+                                                          receivable_transactions)
+
+    gas_price = _block_gas_price(w3, transactions, head_tracker)
+    with head_tracker.chain_lock(chain_address):
+        head = head_tracker.get_head(chain_address)
+        # without blocks of ours the node hasn't got, the head's nonce is the node's
+        nonce_is_current = head.pending_blocks == 0
+        signed_block, header_dict, transactions = _prepare_and_sign_block_with_nonce_manager(w3,
+                                                                                             private_key,
+                                                                                             head.block_number,
+                                                                                             head.parent_hash,
+                                                                                             head.nonce,
+                                                                                             nonce_is_current,
+                                                                                             gas_price,
+                                                                                             transactions,
+                                                                                             receivable_transactions)
+        head_tracker.advance(chain_address, signed_block['hash'], len(transactions))
+
+    return signed_block, header_dict, transactions
+
+
+def _block_gas_price(w3, transactions: List[Dict[str, Any]], head_tracker: ChainHeadTracker = None) -> int:
+    if not transactions:
+        # blocks that only receive don't need one
+        return None
+    # other strategies were never used for blocks, so they still aren't
+    if getattr(w3.hls.gasPriceStrategy, 'applies_to_blocks', False):
+        return w3.hls.generateGasPrice()
+    if head_tracker is not None:
+        return head_tracker.gas_price()
+    return rpc_gas_price_strategy(w3)
+
+
+def _prepare_and_sign_block_with_nonce_manager(w3, private_key: PrivateKey, block_number: int, parent_hash: bytes, nonce: int, nonce_is_current: bool, gas_price: int, transactions: List[Dict[str, Any]], receivable_transactions: List[Dict[str, Any]]):
+    nonce_manager = w3.hls.nonceManager
+    if nonce_manager is None or not transactions:
+        return _prepare_and_sign_block(w3, private_key, block_number, parent_hash, nonce, gas_price, transactions, receivable_transactions)
+
+    chain_address = private_key.public_key.to_canonical_address()
+    # the nonce of the block creation parameters is what the node has, so if a block
+    # of ours was rejected or never sent the nonce manager goes back to it
+    nonce_manager.sync(chain_address, nonce, current=nonce_is_current)
+    nonce = nonce_manager.allocate(chain_address, len(transactions))
+    try:
+        signed_block = _prepare_and_sign_block(w3, private_key, block_number, parent_hash, nonce, gas_price, transactions, receivable_transactions)
+    except Exception:
+        nonce_manager.release(chain_address, nonce, len(transactions))
+        raise
+    # sending the block is up to the caller
+    nonce_manager.complete(chain_address, nonce, len(transactions))
+    return signed_block
+
 
-    header_dict = {'blockNumber': block_creation_parameters['block_number'],
-                   'parentHash': block_creation_parameters['parent_hash']}
+def _prepare_and_sign_block(w3, private_key: PrivateKey, block_number: int, parent_hash: bytes, nonce: int, gas_price: int, transactions: List[Dict[str, Any]], receivable_transactions: List[Dict[str, Any]]):
+    header_dict = {'blockNumber': block_number,
+                   'parentHash': parent_hash}
 
     #
     # Prepare transactions
     #
 
-    nonce = block_creation_parameters['nonce']
-    min_gas_price = w3.hls.gasPrice
-    min_gas_price = min_gas_price + 1
-    gas_price = to_wei(min_gas_price, 'gwei')
+    gas_estimator = w3.hls.gasEstimator
+    if gas_estimator is not None:
+        chain_address = to_checksum_address(private_key.public_key.to_canonical_address())
+        without_gas = [transaction for transaction in transactions if 'gas' not in transaction]
+        if without_gas:
+            estimates = gas_estimator.estimate_many([
+                transaction if 'from' in transaction else dict(transaction, **{'from': chain_address})
+                for transaction in without_gas
+            ])
+            for transaction, gas in zip(without_gas, estimates):
+                transaction['gas'] = gas
 
     for i in range(len(transactions)):
         if 'gas' not in transactions[i]:
-            transactions[i]['gas'] = GAS_TX
+            transactions[i]['gas'] = vm.GAS_TX
         transactions[i]['nonce'] = nonce
         transactions[i]['gasPrice'] = gas_price
 
@@ -36,4 +260,4 @@ def prepare_and_sign_block(w3, private_key: PrivateKey, transactions: List[Dict[
                                             header_dict=header_dict,
                                             private_key=str(private_key))
 
-    return signed_block, header_dict, transactions
\ No newline at end of file
+    return signed_block, header_dict, transactions
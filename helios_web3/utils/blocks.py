@@ -0,0 +1,222 @@
+import asyncio
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+
+from eth_utils import (
+    to_hex,
+)
+
+# hls_getNewestBlocks returns at most this many blocks per call
+MAX_NEWEST_BLOCKS_PAGE_SIZE = 10
+
+
+def _fetch_newest_blocks_page(web3, page_size, start_idx, after_hash, chain_address, include_transactions):
+    return web3.hls.getNewestBlocks(
+        to_hex(page_size),
+        to_hex(start_idx),
+        after_hash,
+        chain_address,
+        include_transactions,
+    )
+
+
+def _boundary_index(page, last_hash):
+    for index, block in enumerate(page):
+        if block['hash'] == last_hash:
+            return index
+    return None
+
+
+def _newest_blocks_walk_params(page_size, after_hash, chain_address):
+    if page_size > MAX_NEWEST_BLOCKS_PAGE_SIZE:
+        raise ValueError("page_size can't be more than {0}".format(MAX_NEWEST_BLOCKS_PAGE_SIZE))
+    if page_size < 2:
+        # pages overlap by one block
+        raise ValueError("page_size can't be less than 2")
+
+    if not isinstance(after_hash, str):
+        after_hash = to_hex(after_hash)
+    if not isinstance(chain_address, str):
+        chain_address = to_hex(chain_address)
+    return after_hash, chain_address
+
+
+def iter_newest_blocks(web3,
+                       page_size=MAX_NEWEST_BLOCKS_PAGE_SIZE,
+                       after_hash='0x',
+                       chain_address='0x',
+                       include_transactions=False,
+                       prefetch=True):
+    '''
+    Walks hls_getNewestBlocks page by page, from the newest block backwards, until the
+    oldest block is reached or, if after_hash is given, until that block is reached.
+
+    While the blocks of one page are being consumed the next page is fetched in the
+    background. Each page after the first starts at the last block yielded, and the
+    blocks up to it are skipped. Blocks added to the head during the walk push that
+    block further back; if it isn't in the page at all the walk moves on a page until
+    it is found. Only the current and the next page of blocks are held in memory,
+    however far the walk goes.
+    '''
+    after_hash, chain_address = _newest_blocks_walk_params(page_size, after_hash, chain_address)
+
+    def fetch(start_idx):
+        return _fetch_newest_blocks_page(web3, page_size, start_idx, after_hash, chain_address, include_transactions)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        start_idx = 0
+        page = fetch(start_idx)
+        last_hash = None
+        while page:
+            is_last_page = len(page) < page_size
+            # where the next page starts if the last block of this one is still there
+            next_start_idx = start_idx + len(page) - 1
+            if executor is not None and not is_last_page:
+                next_page = executor.submit(fetch, next_start_idx)
+            else:
+                next_page = None
+
+            if last_hash is None:
+                new_blocks = page
+            else:
+                boundary_index = _boundary_index(page, last_hash)
+                if boundary_index is None:
+                    if is_last_page:
+                        return
+                    # all of these are newer than the last block yielded
+                    start_idx += len(page)
+                    if next_page is not None:
+                        next_page.cancel()
+                    page = fetch(start_idx)
+                    continue
+                new_blocks = page[boundary_index + 1:]
+
+            for block in new_blocks:
+                yield block
+            last_hash = page[-1]['hash']
+
+            if is_last_page:
+                return
+            start_idx = next_start_idx
+            page = next_page.result() if next_page is not None else fetch(start_idx)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def follow_newest_blocks(web3,
+                         after_hash=None,
+                         poll_interval=2.0,
+                         chain_address='0x',
+                         include_transactions=False):
+    '''
+    Tails the network: yields every new block as it is imported by the node. Without
+    after_hash it starts from the current newest block. Each poll streams the blocks
+    imported since the last one newest first, without holding them all in memory.
+    '''
+    if after_hash is None:
+        newest = _fetch_newest_blocks_page(web3, 1, 0, '0x', chain_address, include_transactions)
+        after_hash = newest[0]['hash'] if newest else '0x'
+
+    while True:
+        new_blocks = iter_newest_blocks(web3,
+                                        after_hash=after_hash,
+                                        chain_address=chain_address,
+                                        include_transactions=include_transactions,
+                                        prefetch=False)
+        newest = next(new_blocks, None)
+        if newest is None:
+            time.sleep(poll_interval)
+            continue
+        # the next poll stops at the newest block of this one, however far it gets
+        after_hash = newest['hash']
+        yield newest
+        yield from new_blocks
+
+
+async def async_iter_newest_blocks(web3,
+                                   page_size=MAX_NEWEST_BLOCKS_PAGE_SIZE,
+                                   after_hash='0x',
+                                   chain_address='0x',
+                                   include_transactions=False,
+                                   prefetch=True):
+    '''
+    iter_newest_blocks for AsyncHeliosWeb3, as an async generator. The next page is
+    fetched by a task while the blocks of the current one are consumed.
+    '''
+    after_hash, chain_address = _newest_blocks_walk_params(page_size, after_hash, chain_address)
+
+    def fetch(start_idx):
+        return _fetch_newest_blocks_page(web3, page_size, start_idx, after_hash, chain_address, include_transactions)
+
+    next_page = None
+    try:
+        start_idx = 0
+        page = await fetch(start_idx)
+        last_hash = None
+        while page:
+            is_last_page = len(page) < page_size
+            next_start_idx = start_idx + len(page) - 1
+            if prefetch and not is_last_page:
+                next_page = asyncio.ensure_future(fetch(next_start_idx))
+            else:
+                next_page = None
+
+            if last_hash is None:
+                new_blocks = page
+            else:
+                boundary_index = _boundary_index(page, last_hash)
+                if boundary_index is None:
+                    if is_last_page:
+                        return
+                    start_idx += len(page)
+                    if next_page is not None:
+                        next_page.cancel()
+                    page = await fetch(start_idx)
+                    continue
+                new_blocks = page[boundary_index + 1:]
+
+            for block in new_blocks:
+                yield block
+            last_hash = page[-1]['hash']
+
+            if is_last_page:
+                return
+            start_idx = next_start_idx
+            page = await next_page if next_page is not None else await fetch(start_idx)
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+async def async_follow_newest_blocks(web3,
+                                     after_hash=None,
+                                     poll_interval=2.0,
+                                     chain_address='0x',
+                                     include_transactions=False):
+    '''
+    follow_newest_blocks for AsyncHeliosWeb3, as an async generator.
+    '''
+    if after_hash is None:
+        newest = await _fetch_newest_blocks_page(web3, 1, 0, '0x', chain_address, include_transactions)
+        after_hash = newest[0]['hash'] if newest else '0x'
+
+    while True:
+        new_blocks = async_iter_newest_blocks(web3,
+                                              after_hash=after_hash,
+                                              chain_address=chain_address,
+                                              include_transactions=include_transactions,
+                                              prefetch=False)
+        next_after_hash = None
+        async for block in new_blocks:
+            if next_after_hash is None:
+                # the next poll stops at the newest block of this one
+                next_after_hash = block['hash']
+            yield block
+        if next_after_hash is None:
+            await asyncio.sleep(poll_interval)
+        else:
+            after_hash = next_after_hash
@@ -0,0 +1,198 @@
+import functools
+
+from eth_utils import (
+    is_integer,
+    is_null,
+    is_string,
+)
+from eth_utils.toolz import (
+    complement,
+    compose,
+    curry,
+)
+
+from web3._utils.formatters import (
+    apply_formatter_at_index,
+    apply_formatter_if,
+    apply_formatter_to_array,
+    apply_formatters_to_dict,
+    apply_one_of_formatters,
+    hex_to_integer,
+)
+
+from helios_web3.datastructures import (
+    LazyAttributeDict,
+)
+
+is_not_null = complement(is_null)
+
+_Compose = type(compose(abs, abs))
+
+
+def _is_curry_of(formatter, curried_function):
+    return isinstance(formatter, curry) and formatter.func is curried_function.func
+
+
+def compile_formatter(formatter, substitutions=None, lazy=False):
+    '''
+    Turns a formatter built from the curried web3 combinators (apply_formatter_if,
+    apply_formatters_to_dict, apply_formatter_to_array, ...) into plain nested
+    closures that give the same result without the curry, to_dict and to_list
+    wrappers being invoked on every value.
+
+    ``substitutions`` is a sequence of (formatter, replacement) pairs, so a formatter
+    table can be compiled with e.g. a different address formatter.
+
+    With ``lazy=True`` dicts are formatted into LazyAttributeDicts, which format each
+    field the first time it is read.
+    '''
+    if substitutions:
+        # curried formatters holding dicts aren't hashable, so this isn't a dict
+        for original, replacement in substitutions:
+            if formatter is original:
+                return replacement
+
+    if _is_curry_of(formatter, apply_formatter_if) and len(formatter.args) == 2:
+        condition, inner = formatter.args
+        return _compile_formatter_if(condition, compile_formatter(inner, substitutions, lazy))
+
+    if _is_curry_of(formatter, apply_formatters_to_dict) and len(formatter.args) == 1:
+        return compile_dict_formatter(formatter.args[0], substitutions, lazy)
+
+    if _is_curry_of(formatter, apply_formatter_to_array) and len(formatter.args) == 1:
+        return _compile_array_formatter(compile_formatter(formatter.args[0], substitutions, lazy))
+
+    if _is_curry_of(formatter, apply_one_of_formatters) and len(formatter.args) == 1:
+        return _compile_one_of_formatters(tuple(
+            (compile_formatter(inner, substitutions, lazy), condition)
+            for inner, condition in formatter.args[0]
+        ))
+
+    if _is_curry_of(formatter, apply_formatter_at_index) and len(formatter.args) == 2:
+        inner, at_index = formatter.args
+        return _compile_formatter_at_index(compile_formatter(inner, substitutions, lazy), at_index)
+
+    if isinstance(formatter, _Compose):
+        # compose applies the functions right to left; first is the rightmost
+        funcs = tuple(
+            compile_formatter(inner, substitutions, lazy)
+            for inner in (formatter.first,) + tuple(formatter.funcs)
+        )
+        return _compile_pipeline(funcs)
+
+    if isinstance(formatter, curry):
+        return functools.partial(formatter.func, *formatter.args, **(formatter.keywords or {}))
+
+    return formatter
+
+
+def compile_dict_formatter(formatters, substitutions=None, lazy=False):
+    compiled = {
+        key: compile_formatter(formatter, substitutions, lazy)
+        for key, formatter in formatters.items()
+    }
+    if lazy:
+        return functools.partial(LazyAttributeDict, formatters=compiled)
+
+    get_formatter = compiled.get
+
+    def formatter(value):
+        result = {}
+        for key, item in value.items():
+            field_formatter = get_formatter(key)
+            if field_formatter is None:
+                result[key] = item
+            else:
+                try:
+                    result[key] = field_formatter(item)
+                except (TypeError, ValueError) as exc:
+                    raise type(exc)("Could not format value %r as field %r" % (item, key)) from exc
+        return result
+    return formatter
+
+
+def compile_record_formatter(formatters, record_type, substitutions=None):
+    '''
+    Like compile_dict_formatter, but gives a record_type (a Record subclass) instead
+    of a dict.
+    '''
+    dict_formatter = compile_dict_formatter(formatters, substitutions)
+
+    def formatter(value):
+        return record_type(dict_formatter(value))
+    return formatter
+
+
+def compile_formatters(formatters_by_method, substitutions=None, lazy=False):
+    '''
+    Compiles a per-method table of formatters, as used by the formatting middlewares.
+    '''
+    return {
+        method: compile_formatter(formatter, substitutions, lazy)
+        for method, formatter in formatters_by_method.items()
+    }
+
+
+def _compile_formatter_if(condition, inner):
+    if condition is is_not_null:
+        def formatter(value):
+            if value is None:
+                return value
+            return inner(value)
+    elif condition is is_string and inner is hex_to_integer:
+        string_types = (bytes, str, bytearray)
+
+        def formatter(value):
+            if isinstance(value, string_types):
+                return int(value, 16)
+            return value
+    elif condition is is_integer:
+        def formatter(value):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return inner(value)
+            return value
+    else:
+        def formatter(value):
+            if condition(value):
+                return inner(value)
+            return value
+    return formatter
+
+
+def _compile_array_formatter(inner):
+    def formatter(value):
+        return [inner(item) for item in value]
+    return formatter
+
+
+def _compile_one_of_formatters(formatter_condition_pairs):
+    def formatter(value):
+        for inner, condition in formatter_condition_pairs:
+            if condition(value):
+                return inner(value)
+        raise ValueError("The provided value did not satisfy any of the formatter conditions")
+    return formatter
+
+
+def _compile_formatter_at_index(inner, at_index):
+    def formatter(value):
+        if at_index + 1 > len(value):
+            raise IndexError(
+                "Not enough values in iterable to apply formatter.  Got: {0}. "
+                "Need: {1}".format(len(value), at_index + 1)
+            )
+        result = list(value)
+        result[at_index] = inner(result[at_index])
+        return result
+    return formatter
+
+
+def _compile_pipeline(funcs):
+    if len(funcs) == 1:
+        return funcs[0]
+
+    def formatter(value):
+        for func in funcs:
+            value = func(value)
+        return value
+    return formatter
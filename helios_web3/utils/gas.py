@@ -0,0 +1,218 @@
+import threading
+import time
+
+import lru
+
+from eth_utils import (
+    is_bytes,
+    to_bytes,
+    to_canonical_address,
+)
+
+from helios_web3.pythonic_middleware import (
+    to_integer_if_hex,
+)
+from helios_web3.utils.lazy_imports import LazyImports
+
+vm = LazyImports({
+    'GAS_TX': 'hvm.constants:GAS_TX',
+    'GAS_TXDATAZERO': 'hvm.constants:GAS_TXDATAZERO',
+    'GAS_TXDATANONZERO': 'hvm.constants:GAS_TXDATANONZERO',
+})
+
+# added to the node's estimate when the node has to be asked, like AsyncHls does
+DEFAULT_NODE_GAS_BUFFER = 100000
+# how many addresses IntrinsicGasEstimator remembers the code check of
+DEFAULT_CODE_CACHE_SIZE = 10000
+# seconds an address without code is remembered, a contract may be deployed there
+DEFAULT_NO_CODE_TTL = 60
+
+
+def transaction_data(transaction):
+    data = transaction.get('data') or b''
+    if not is_bytes(data):
+        data = to_bytes(hexstr=data)
+    return data
+
+
+def is_contract_transaction(transaction):
+    '''
+    Whether sending the transaction certainly runs contract code: contract
+    creations, transactions with a code address and transactions executed on send.
+    A transaction with data may still call a contract at its ``to`` address.
+    '''
+    return (
+        transaction.get('to') in (None, '', b'', '0x')
+        or bool(transaction.get('codeAddress'))
+        or bool(transaction.get('executeOnSend'))
+    )
+
+
+def intrinsic_gas(transaction):
+    '''
+    The gas of a value transfer or a data-only send, from the same formula as
+    _get_photon_intrinsic_gas: the base transaction gas plus the cost of each zero
+    and non-zero byte of data.
+    '''
+    data = transaction_data(transaction)
+    num_zero_bytes = data.count(b'\x00')
+    num_non_zero_bytes = len(data) - num_zero_bytes
+    return (
+        vm.GAS_TX +
+        num_zero_bytes * vm.GAS_TXDATAZERO +
+        num_non_zero_bytes * vm.GAS_TXDATANONZERO
+    )
+
+
+class IntrinsicGasEstimator:
+    '''
+    Works out the gas of transactions locally when it is just their intrinsic gas,
+    and only asks the node with hls_estimateGas when contract code may run.
+
+        estimator = IntrinsicGasEstimator(w3)
+        w3.hls.setGasEstimator(estimator)
+
+    A transaction is estimated locally when it doesn't create or execute a contract
+    and either has no data or is sent to an address without code. Whether an address
+    has code is asked with hls_getCode and remembered for the last ``code_cache_size``
+    addresses; addresses without code are asked again after ``no_code_ttl`` seconds.
+
+    Once set, ``Hls.sendTransaction`` and ``prepare_and_sign_block`` use it for
+    transactions without a gas value. ``estimate_many`` estimates a list of
+    transactions, sending the code checks and the node estimates each in a single
+    batch. ``stats`` counts the RPCs saved.
+    '''
+    def __init__(self,
+                 web3,
+                 node_gas_buffer=DEFAULT_NODE_GAS_BUFFER,
+                 code_cache_size=DEFAULT_CODE_CACHE_SIZE,
+                 no_code_ttl=DEFAULT_NO_CODE_TTL):
+        self.web3 = web3
+        self.node_gas_buffer = node_gas_buffer
+        self.no_code_ttl = no_code_ttl
+        self.local_estimates = 0
+        self.node_estimates = 0
+        self.code_checks = 0
+        self.batched_requests = 0
+        # canonical address -> (has code, when it was checked)
+        self._has_code = lru.LRU(code_cache_size)
+        self._lock = threading.Lock()
+
+    def _count(self, local_estimates=0, node_estimates=0, code_checks=0, batched_requests=0):
+        with self._lock:
+            self.local_estimates += local_estimates
+            self.node_estimates += node_estimates
+            self.code_checks += code_checks
+            self.batched_requests += batched_requests
+
+    def _node_gas(self, estimate):
+        # hls_estimateGas results aren't formatted, so they may still be hex
+        return to_integer_if_hex(estimate) + self.node_gas_buffer
+
+    def _batch(self, make_request, params):
+        '''
+        The results of make_request(batch, param) for each param, in one batch.
+        '''
+        with self.web3.hls.batch() as batch:
+            items = [make_request(batch, param) for param in params]
+        for item in items:
+            if item.error is not None:
+                raise item.error
+        self._count(batched_requests=len(items) - 1)
+        return [item.result for item in items]
+
+    def _code_address(self, transaction):
+        '''
+        The address whose code decides whether the transaction can be estimated
+        locally, or None when it doesn't matter.
+        '''
+        if is_contract_transaction(transaction) or not transaction_data(transaction):
+            return None
+        return transaction['to']
+
+    def _cached_has_code(self, address):
+        '''
+        Whether the address has code, or None if it has to be asked.
+        '''
+        with self._lock:
+            checked = self._has_code.get(to_canonical_address(address))
+        if checked is None:
+            return None
+        has_code, checked_at = checked
+        # code can't go away, but it can be deployed to an address
+        if not has_code and time.monotonic() - checked_at > self.no_code_ttl:
+            return None
+        return has_code
+
+    def _remember_code(self, addresses, codes):
+        checked_at = time.monotonic()
+        with self._lock:
+            for address, code in zip(addresses, codes):
+                self._has_code[to_canonical_address(address)] = (len(code) > 0, checked_at)
+
+    def local_estimate(self, transaction, check_code=True):
+        '''
+        The intrinsic gas of the transaction if no contract code can run when it is
+        sent, otherwise None. Without ``check_code``, an address that hasn't been
+        checked yet is treated as having code instead of asking the node.
+        '''
+        if is_contract_transaction(transaction):
+            return None
+        address = self._code_address(transaction)
+        if address is not None:
+            has_code = self._cached_has_code(address)
+            if has_code is None:
+                if not check_code:
+                    return None
+                code = self.web3.hls.getCode(address)
+                self._remember_code([address], [code])
+                self._count(code_checks=1)
+                has_code = len(code) > 0
+            if has_code:
+                return None
+        self._count(local_estimates=1)
+        return intrinsic_gas(transaction)
+
+    def estimate(self, transaction):
+        gas = self.local_estimate(transaction)
+        if gas is not None:
+            return gas
+        self._count(node_estimates=1)
+        return self._node_gas(self.web3.hls.estimateGas(transaction))
+
+    def estimate_many(self, transactions):
+        '''
+        The gas of each transaction, in order.
+        '''
+        unchecked_by_key = {}
+        for address in map(self._code_address, transactions):
+            if address is not None and self._cached_has_code(address) is None:
+                unchecked_by_key.setdefault(to_canonical_address(address), address)
+        unchecked = list(unchecked_by_key.values())
+        if len(unchecked) > 1:
+            self._remember_code(unchecked, self._batch(lambda batch, address: batch.hls.getCode(address), unchecked))
+            self._count(code_checks=len(unchecked))
+
+        gas = [self.local_estimate(transaction) for transaction in transactions]
+        node_indexes = [index for index, transaction_gas in enumerate(gas) if transaction_gas is None]
+        if len(node_indexes) == 1:
+            index = node_indexes[0]
+            gas[index] = self._node_gas(self.web3.hls.estimateGas(transactions[index]))
+        elif node_indexes:
+            estimates = self._batch(lambda batch, index: batch.hls.estimateGas(transactions[index]), node_indexes)
+            for index, estimate in zip(node_indexes, estimates):
+                gas[index] = self._node_gas(estimate)
+
+        self._count(node_estimates=len(node_indexes))
+        return gas
+
+    def stats(self):
+        with self._lock:
+            return {
+                'local_estimates': self.local_estimates,
+                'node_estimates': self.node_estimates,
+                'code_checks': self.code_checks,
+                # every local estimate saves an hls_estimateGas, every request
+                # sent in a batch after the first saves a round trip
+                'rpcs_saved': self.local_estimates - self.code_checks + self.batched_requests,
+            }
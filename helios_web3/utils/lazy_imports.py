@@ -0,0 +1,63 @@
+import importlib
+import threading
+
+
+class LazyImports:
+    '''
+    Names from modules that are only imported the first time one of the names is
+    used, so the heavy VM and signing dependencies don't slow down
+    ``import helios_web3`` for code that never signs anything.
+
+        vm = LazyImports({
+            'rlp': 'rlp_cython',
+            'GAS_TX': 'hvm.constants:GAS_TX',
+            'PhotonTransaction': ('hvm.vm.forks.photon:PhotonTransaction',
+                                  'helios_web3.temp_fork_files.photon:PhotonTransaction'),
+        })
+        vm.GAS_TX
+
+    Each name is a module, ``module:attribute``, or a tuple of those to try in order
+    while the modules don't exist. Once loaded, a name is a plain attribute.
+    '''
+    def __init__(self, names):
+        self._names = names
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # only called for names that haven't been loaded yet
+        try:
+            targets = self._names[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        if isinstance(targets, str):
+            targets = (targets,)
+
+        with self._lock:
+            if name in self.__dict__:
+                return self.__dict__[name]
+            value = _import_first(targets)
+            setattr(self, name, value)
+        return value
+
+    def load_all(self):
+        '''
+        Imports every name now and returns them as a dict.
+        '''
+        return {name: getattr(self, name) for name in self._names}
+
+
+def _import_first(targets):
+    for target in targets[:-1]:
+        try:
+            return _import(target)
+        except ModuleNotFoundError:
+            pass
+    return _import(targets[-1])
+
+
+def _import(target):
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    if attribute:
+        return getattr(module, attribute)
+    return module
@@ -0,0 +1,235 @@
+import asyncio
+import bisect
+import threading
+import time
+
+from eth_utils import (
+    to_canonical_address,
+    to_checksum_address,
+)
+
+
+def transactions_without_nonce(transactions):
+    '''
+    The indexes of the transactions that have a sender but no nonce, by sender.
+    '''
+    indexes_by_sender = {}
+    for index, transaction in enumerate(transactions):
+        if 'from' in transaction and 'nonce' not in transaction:
+            indexes_by_sender.setdefault(transaction['from'], []).append(index)
+    return indexes_by_sender
+
+
+class AccountNonces:
+    '''
+    The nonces of one account: the next one never handed out, the ones below it that
+    were handed out and then released, and the ones handed out whose transactions
+    haven't been sent yet.
+    '''
+    def __init__(self, next_nonce: int):
+        self.next_nonce = next_nonce
+        self.released = []
+        self.in_flight = set()
+        self.synced_at = time.monotonic()
+        # set by invalidate, the node is asked again before the next allocation
+        self.stale = False
+
+    def __repr__(self):
+        return "AccountNonces(next_nonce={0}, released={1}, in_flight={2}, stale={3})".format(
+            self.next_nonce,
+            self.released,
+            sorted(self.in_flight),
+            self.stale,
+        )
+
+
+class NonceManager:
+    '''
+    Hands out the nonces of each account locally, so threads and coroutines sending
+    from the same account don't ask the node for the transaction count every time
+    and don't end up with the same nonce.
+
+        nonce_manager = NonceManager(w3)
+        w3.hls.setNonceManager(nonce_manager)
+
+    Once set, ``Hls.sendTransaction``, ``Personal.sendTransactions`` and
+    ``prepare_and_sign_block`` take the nonces of transactions without one from it.
+
+    Allocated nonces are in flight until they are given back with ``complete``, once
+    their transaction was sent or failed, or with ``release`` if it never was. The
+    node is asked with hls_getTransactionCount the first time an account is used,
+    after ``invalidate`` (e.g. when the node rejects a transaction) and, if
+    ``resync_interval`` is set, once an account was last synced that many seconds
+    ago. After ``invalidate`` the node's count is adopted, but never below a nonce
+    still in flight; a periodic resync never moves an account's nonce back.
+
+    Released nonces leave a gap. Single nonces are handed out from the released ones
+    first, lowest first, so the gap is filled before the node notices it.
+
+    ``allocate`` can be used from any thread. ``allocate_async`` is for a
+    NonceManager made with an AsyncHeliosWeb3, from a single event loop.
+    '''
+    def __init__(self, web3, resync_interval: float = None):
+        self.web3 = web3
+        self.resync_interval = resync_interval
+        self.allocations = 0
+        self.reused = 0
+        self.syncs = 0
+        self._accounts = {}
+        self._account_locks = {}
+        self._async_syncs = {}
+        self._lock = threading.Lock()
+
+    def _account_lock(self, address) -> threading.Lock:
+        with self._lock:
+            if address not in self._account_locks:
+                self._account_locks[address] = threading.Lock()
+            return self._account_locks[address]
+
+    def _needs_sync(self, address) -> bool:
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None or account.stale:
+                return True
+            return self.resync_interval is not None and time.monotonic() - account.synced_at > self.resync_interval
+
+    def allocate(self, address, count: int = 1) -> int:
+        '''
+        Reserves ``count`` consecutive nonces for an account and returns the first one.
+        '''
+        address = to_canonical_address(address)
+        while True:
+            if self._needs_sync(address):
+                # one thread asks the node, the others wait for its answer
+                with self._account_lock(address):
+                    if self._needs_sync(address):
+                        self.sync(address, self.web3.hls.getTransactionCount(to_checksum_address(address)))
+            nonce = self._take(address, count)
+            if nonce is not None:
+                return nonce
+
+    async def allocate_async(self, address, count: int = 1) -> int:
+        '''
+        ``allocate`` for coroutines. Coroutines that need the same account synced
+        wait for a single request.
+        '''
+        address = to_canonical_address(address)
+        while True:
+            if self._needs_sync(address):
+                sync = self._async_syncs.get(address)
+                if sync is None:
+                    sync = asyncio.ensure_future(self._sync_async(address))
+                    self._async_syncs[address] = sync
+                # a cancelled waiter mustn't cancel the request the others wait for
+                await asyncio.shield(sync)
+            nonce = self._take(address, count)
+            if nonce is not None:
+                return nonce
+
+    async def _sync_async(self, address):
+        try:
+            self.sync(address, await self.web3.hls.getTransactionCount(to_checksum_address(address)))
+        finally:
+            del self._async_syncs[address]
+
+    def _take(self, address, count):
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None or account.stale:
+                # invalidated since it was synced
+                return None
+            self.allocations += count
+            if count == 1 and account.released:
+                self.reused += 1
+                nonce = account.released.pop(0)
+            else:
+                nonce = account.next_nonce
+                account.next_nonce += count
+            account.in_flight.update(range(nonce, nonce + count))
+            return nonce
+
+    def sync(self, address, node_nonce: int, current: bool = False):
+        '''
+        Merges the node's nonce for an account. ``current`` says it is what the node
+        has right now, like the nonce of freshly fetched block creation parameters,
+        so it is adopted even if it is lower than ours, as long as no nonces are in
+        flight. Otherwise it only moves the account forward, unless the account was
+        invalidated.
+        '''
+        address = to_canonical_address(address)
+        with self._lock:
+            self.syncs += 1
+            account = self._accounts.get(address)
+            if account is None:
+                self._accounts[address] = AccountNonces(node_nonce)
+                return
+
+            if account.in_flight:
+                # nonces in flight may not have reached the node yet
+                in_flight_next_nonce = max(account.in_flight) + 1
+            else:
+                in_flight_next_nonce = 0
+
+            if current or account.stale:
+                account.next_nonce = max(node_nonce, in_flight_next_nonce)
+            else:
+                account.next_nonce = max(node_nonce, account.next_nonce)
+            account.released = [
+                nonce for nonce in account.released
+                if node_nonce <= nonce < account.next_nonce
+            ]
+            account.stale = False
+            account.synced_at = time.monotonic()
+
+    def complete(self, address, nonce: int, count: int = 1):
+        '''
+        Marks ``count`` nonces from ``nonce`` as no longer in flight, once their
+        transaction was sent, whether the node took it or not.
+        '''
+        address = to_canonical_address(address)
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is not None:
+                account.in_flight.difference_update(range(nonce, nonce + count))
+
+    def release(self, address, nonce: int, count: int = 1):
+        '''
+        Gives back ``count`` nonces from ``nonce`` that were allocated but never sent.
+        '''
+        address = to_canonical_address(address)
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None:
+                return
+            for released_nonce in range(nonce, nonce + count):
+                account.in_flight.discard(released_nonce)
+                if released_nonce < account.next_nonce:
+                    bisect.insort(account.released, released_nonce)
+            # released nonces at the top are just not handed out yet
+            while account.released and account.released[-1] == account.next_nonce - 1:
+                account.released.pop()
+                account.next_nonce -= 1
+
+    def invalidate(self, address=None):
+        '''
+        Makes the nonces of an account, or of all accounts, be fetched from the node
+        the next time they are needed. Nonces still in flight are kept and aren't
+        handed out again.
+        '''
+        with self._lock:
+            if address is None:
+                accounts = self._accounts.values()
+            else:
+                account = self._accounts.get(to_canonical_address(address))
+                accounts = [account] if account is not None else []
+            for account in accounts:
+                account.stale = True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'reused': self.reused,
+                'syncs': self.syncs,
+                'in_flight': sum(len(account.in_flight) for account in self._accounts.values()),
+            }
@@ -0,0 +1,153 @@
+import time
+from collections import (
+    deque,
+    namedtuple,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+
+from eth_utils import (
+    to_canonical_address,
+    to_hex,
+)
+
+from helios_web3.account import (
+    BlockSigner,
+)
+from helios_web3.utils.block_creation import (
+    ChainHeadTracker,
+)
+
+SweepResult = namedtuple('SweepResult', ['chain_address', 'block_hash', 'num_received', 'error'])
+
+
+def chunks(sequence, chunk_size):
+    for start in range(0, len(sequence), chunk_size):
+        yield sequence[start:start + chunk_size]
+
+
+class ReceivableSweeper:
+    '''
+    Collects the receivable transactions of a large set of accounts. Addresses are
+    filtered in chunks with ``hls_filterAddressesWithReceivableTransactions``, the
+    receivable transactions and block creation parameters of each chunk are fetched
+    in a single batch, and the receive blocks are signed and sent by a pool of worker
+    threads while the next chunk is being fetched.
+
+        sweeper = ReceivableSweeper(w3, private_keys)
+        for result in sweeper.sweep():
+            if result.error is not None:
+                ...
+
+    ``sweep`` can be run repeatedly. Each run only asks about transactions that
+    arrived since the previous run started (less ``timestamp_margin`` seconds to
+    allow for clock differences), and retries the addresses that failed last time.
+    '''
+    def __init__(self,
+                 w3,
+                 private_keys,
+                 chain_id: int = 1,
+                 chunk_size: int = 1000,
+                 max_workers: int = 8,
+                 max_pending: int = None,
+                 after_timestamp: int = 0,
+                 timestamp_margin: int = 60,
+                 head_tracker: ChainHeadTracker = None):
+        self.w3 = w3
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.max_pending = max_pending if max_pending is not None else max_workers * 4
+        self.after_timestamp = after_timestamp
+        self.timestamp_margin = timestamp_margin
+        self.head_tracker = head_tracker if head_tracker is not None else ChainHeadTracker(w3)
+
+        self._signers = {}
+        for private_key in private_keys:
+            signer = BlockSigner(private_key, chain_id)
+            self._signers[to_canonical_address(signer.address)] = signer
+        self._addresses = list(self._signers)
+        self._retry_addresses = set()
+
+    def sweep(self):
+        '''
+        Runs one sweep over all the accounts, yielding a SweepResult for each account
+        that had receivable transactions, or whose receivable transactions couldn't be
+        fetched. The results of the latter have the error and a num_received of 0.
+        '''
+        started_at = int(time.time())
+        retry_addresses, self._retry_addresses = self._retry_addresses, set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for chunk in chunks(self._addresses, self.chunk_size):
+                for chain_address, receivable_transactions, error in self._fetch_chunk(chunk, retry_addresses):
+                    if error is not None:
+                        result = SweepResult(chain_address, None, 0, error)
+                        self._record(result)
+                        yield result
+                        continue
+                    pending.append(executor.submit(self._receive, chain_address, receivable_transactions))
+                    while len(pending) > self.max_pending:
+                        result = pending.popleft().result()
+                        self._record(result)
+                        yield result
+
+            while pending:
+                result = pending.popleft().result()
+                self._record(result)
+                yield result
+
+        # failed addresses are retried regardless of the timestamp
+        self.after_timestamp = max(started_at - self.timestamp_margin, 0)
+
+    def _fetch_chunk(self, chunk, retry_addresses):
+        receivable_addresses = self.w3.hls.filterAddressesWithReceivableTransactions(
+            [to_hex(chain_address) for chain_address in chunk],
+            self.after_timestamp,
+        )
+        to_fetch = {to_canonical_address(chain_address) for chain_address in receivable_addresses}
+        to_fetch.update(retry_addresses.intersection(chunk))
+        if not to_fetch:
+            return
+
+        to_fetch = sorted(to_fetch)
+        with self.w3.hls.batch() as batch:
+            receivable = [batch.hls.getReceivableTransactions(chain_address) for chain_address in to_fetch]
+            creation_params = {
+                chain_address: batch.hls.getBlockCreationParams(chain_address)
+                for chain_address in to_fetch
+                if not self.head_tracker.has_head(chain_address)
+            }
+
+        for chain_address, item in zip(to_fetch, receivable):
+            if item.error is not None:
+                yield chain_address, None, item.error
+                continue
+            if chain_address in creation_params and creation_params[chain_address].error is None:
+                self.head_tracker.update(chain_address, creation_params[chain_address].result)
+            if item.result:
+                yield chain_address, item.result, None
+
+    def _receive(self, chain_address, receivable_transactions):
+        signer = self._signers[chain_address]
+        receive_transaction_dicts = [dict(transaction) for transaction in receivable_transactions]
+
+        try:
+            with self.head_tracker.chain_lock(chain_address):
+                head = self.head_tracker.get_head(chain_address)
+                header_dict = {'blockNumber': head.block_number,
+                               'parentHash': head.parent_hash}
+                signed_block = signer.signBlock(header_dict, [], receive_transaction_dicts)
+                self.head_tracker.advance(chain_address, signed_block['hash'], 0)
+
+            self.w3.hls.sendRawBlock(signed_block['rawBlock'])
+        except Exception as e:
+            self.head_tracker.invalidate(chain_address)
+            return SweepResult(chain_address, None, len(receive_transaction_dicts), e)
+
+        return SweepResult(chain_address, signed_block['hash'], len(receive_transaction_dicts), None)
+
+    def _record(self, result):
+        if result.error is not None:
+            self._retry_addresses.add(result.chain_address)
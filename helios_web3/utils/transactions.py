@@ -0,0 +1,94 @@
+import time
+from collections import (
+    namedtuple,
+)
+
+from web3.exceptions import (
+    TimeExhausted,
+)
+
+TransactionReceiptResult = namedtuple('TransactionReceiptResult', ['transaction_hash', 'receipt', 'latency'])
+
+
+def is_mined_receipt(receipt):
+    return receipt is not None and receipt['blockHash'] is not None
+
+
+def is_transaction_not_found_error(error):
+    '''
+    Whether an error from hls_getTransactionReceipt is the node saying it doesn't
+    know the transaction yet, rather than a real failure.
+    '''
+    if not isinstance(error, ValueError) or not error.args:
+        return False
+    rpc_error = error.args[0]
+    message = rpc_error.get('message', '') if isinstance(rpc_error, dict) else str(rpc_error)
+    return 'not found' in message.lower()
+
+
+def receipt_or_raise(receipt):
+    '''
+    The receipt, or None while the transaction isn't known yet. Other errors are raised.
+    '''
+    if isinstance(receipt, Exception):
+        if is_transaction_not_found_error(receipt):
+            return None
+        raise receipt
+    return receipt
+
+
+def next_poll_latency(poll_latency, initial_poll_latency, max_poll_latency, found_any):
+    # poll quickly while receipts keep arriving, back off while nothing changes
+    if found_any:
+        return initial_poll_latency
+    return min(poll_latency * 2, max_poll_latency)
+
+
+def receipts_time_exhausted(outstanding, timeout):
+    return TimeExhausted(
+        "{0} transactions are not in the chain after {1} seconds: {2}".format(
+            len(outstanding),
+            timeout,
+            outstanding,
+        )
+    )
+
+
+def wait_for_transaction_receipts(web3, transaction_hashes, timeout=120, poll_latency=0.1, max_poll_latency=2.0):
+    '''
+    Waits for the receipts of many transactions at once. Each poll only asks for the
+    transactions that are still outstanding, all in a single batch request. Receipts
+    are yielded as soon as they are found as TransactionReceiptResult tuples, where
+    latency is the number of seconds since the wait started.
+
+    Raises TimeExhausted if some receipts are still missing after timeout seconds.
+    Errors other than the node not knowing a transaction yet are raised straight away.
+    '''
+    started_at = time.monotonic()
+    initial_poll_latency = poll_latency
+    outstanding = list(dict.fromkeys(transaction_hashes))
+
+    while outstanding:
+        batch = web3.hls.batch()
+        items = [batch.hls.getTransactionReceipt(transaction_hash) for transaction_hash in outstanding]
+        batch.execute()
+
+        still_outstanding = []
+        for transaction_hash, item in zip(outstanding, items):
+            receipt = receipt_or_raise(item.error if item.error is not None else item.result)
+            if is_mined_receipt(receipt):
+                yield TransactionReceiptResult(transaction_hash, receipt, time.monotonic() - started_at)
+            else:
+                still_outstanding.append(transaction_hash)
+
+        found_any = len(still_outstanding) < len(outstanding)
+        outstanding = still_outstanding
+        if not outstanding:
+            return
+
+        remaining = timeout - (time.monotonic() - started_at)
+        if remaining <= 0:
+            raise receipts_time_exhausted(outstanding, timeout)
+
+        poll_latency = next_poll_latency(poll_latency, initial_poll_latency, max_poll_latency, found_any)
+        time.sleep(min(poll_latency, remaining))
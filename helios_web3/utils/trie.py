@@ -0,0 +1,140 @@
+from eth_utils import (
+    keccak,
+)
+
+from helios_web3.utils.lazy_imports import LazyImports
+
+vm = LazyImports({
+    'rlp': 'rlp_cython',
+})
+
+# root hash of a trie with nothing in it, keccak(rlp.encode(b''))
+BLANK_ROOT_HASH = keccak(b'\x80')
+
+BLANK_NODE = b'\x80'
+
+
+def make_trie_root(items):
+    '''
+    The root hash ``make_trie_root_and_nodes`` returns for a list of rlp objects,
+    like the transactions of a block, without the trie nodes.
+
+    The items are keyed by the rlp encoding of their index, as in
+    ``make_trie_root_and_nodes``. Rather than inserting them one by one into a
+    HexaryTrie, the nodes are built bottom up from the keys in trie order and only
+    encoded and hashed once each.
+    '''
+    return make_trie_root_from_encoded([vm.rlp.encode(item) for item in items])
+
+
+def make_trie_root_from_encoded(encoded_items):
+    if not encoded_items:
+        return BLANK_ROOT_HASH
+
+    indexes = sequential_key_order(len(encoded_items))
+    keys = [_to_nibbles(_encode_index(index)) for index in indexes]
+    values = [encoded_items[index] for index in indexes]
+    return keccak(_encode_node(keys, values, 0, len(keys), 0))
+
+
+def sequential_key_order(count):
+    '''
+    The indexes 0 to count - 1 in the order of their rlp encoded keys: the single
+    byte keys of 1 to 127, then 0, which is encoded as 0x80, then everything from
+    128 up, whose keys start with their length and are big endian after that.
+    '''
+    indexes = list(range(1, min(count, 128)))
+    indexes.append(0)
+    indexes.extend(range(128, count))
+    return indexes
+
+
+def _encode_index(index):
+    if index == 0:
+        return b'\x80'
+    if index < 128:
+        return bytes((index,))
+    index_bytes = index.to_bytes((index.bit_length() + 7) // 8, 'big')
+    return bytes((0x80 + len(index_bytes),)) + index_bytes
+
+
+def _to_nibbles(key):
+    nibbles = []
+    for byte in key:
+        nibbles.append(byte >> 4)
+        nibbles.append(byte & 0x0f)
+    return tuple(nibbles)
+
+
+def _hex_prefix(nibbles, is_leaf):
+    flag = 2 if is_leaf else 0
+    if len(nibbles) % 2:
+        nibbles = (flag + 1,) + nibbles
+    else:
+        nibbles = (flag, 0) + nibbles
+    return bytes(nibbles[i] << 4 | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+
+
+def _encode_length(length, offset):
+    if length < 56:
+        return bytes((offset + length,))
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((offset + 55 + len(length_bytes),)) + length_bytes
+
+
+def _encode_bytes(value):
+    if len(value) == 1 and value[0] < 0x80:
+        return value
+    return _encode_length(len(value), 0x80) + value
+
+
+def _encode_list(encoded_items):
+    payload = b''.join(encoded_items)
+    return _encode_length(len(payload), 0xc0) + payload
+
+
+def _reference(encoded_node):
+    # nodes shorter than a hash are embedded in their parent
+    if len(encoded_node) < 32:
+        return encoded_node
+    return b'\xa0' + keccak(encoded_node)
+
+
+def _encode_node(keys, values, start, end, depth):
+    '''
+    The rlp encoding of the node holding keys[start:end], which are sorted and the
+    same up to depth.
+    '''
+    first_key = keys[start]
+    if end - start == 1:
+        return _encode_list([
+            _encode_bytes(_hex_prefix(first_key[depth:], True)),
+            _encode_bytes(values[start]),
+        ])
+
+    # the keys are sorted, so what the first and last share all of them share
+    last_key = keys[end - 1]
+    prefix_end = depth
+    shortest = min(len(first_key), len(last_key))
+    while prefix_end < shortest and first_key[prefix_end] == last_key[prefix_end]:
+        prefix_end += 1
+
+    if prefix_end > depth:
+        return _encode_list([
+            _encode_bytes(_hex_prefix(first_key[depth:prefix_end], False)),
+            _reference(_encode_node(keys, values, start, end, prefix_end)),
+        ])
+
+    branch = [BLANK_NODE] * 17
+    index = start
+    if len(first_key) == depth:
+        branch[16] = _encode_bytes(values[start])
+        index += 1
+    while index < end:
+        nibble = keys[index][depth]
+        group_end = index + 1
+        while group_end < end and keys[group_end][depth] == nibble:
+            group_end += 1
+        branch[nibble] = _reference(_encode_node(keys, values, index, group_end, depth + 1))
+        index = group_end
+    return _encode_list(branch)
@@ -28,12 +28,17 @@ setup(
         "pypiwin32>=223;platform_system=='Windows'",
         "py-helios-node>=0.2.0-alpha.33"
     ],
+    extras_require={
+        'async': [
+            "aiohttp>=3.5.0,<4",
+        ],
+    },
     setup_requires=['setuptools-markdown'],
     python_requires='>=3.6,<4',
     license="MIT",
     zip_safe=False,
     keywords='ethereum, helios protocol',
-    packages=find_packages(exclude=["tests", "tests.*"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*"]),
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',